@@ -5,6 +5,7 @@ Package:
 Module:  __main__
 Version: 2.0
 Usage: GamBible main module, adds fonts, creates GamBible window and runs the app.
+With arguments, runs a headless command instead (see cli).
 
 Author: BoxBoxJason
 Date: 01/10/2023
@@ -16,36 +17,45 @@ import logging
 from os.path import join,dirname
 from os import environ
 import sys
-from PyQt6.QtWidgets import QApplication
 root_dir_path = dirname(dirname(__file__))
 environ['GAMBIBLE'] = root_dir_path
 
-from resources.PathEnum import getStyleSheet
-from interface.GamBible import GamBible,addFonts
-from ranking.ELO import optimizeHyperparametersBayesian
 
+def startApplication():
+    """
+    Creates the GamBible window and runs the app. Qt and the interface modules are imported here, so that only
+    graphical sessions load them.
+    """
+    from PyQt6.QtWidgets import QApplication
+    from resources.PathEnum import getStyleSheet
+    from interface.GamBible import GamBible,addFonts
 
-##----------Logging setup----------##
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [%(levelname)s] %(message)s",
-    handlers=[
-        logging.FileHandler(join(root_dir_path,"logging.log")),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
+    ##----------Logging setup----------##
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        handlers=[
+            logging.FileHandler(join(root_dir_path,"logging.log")),
+            logging.StreamHandler(sys.stdout)
+        ]
+    )
 
-optimizeHyperparametersBayesian('Tennis','Men')
-exit()
+    logging.info('Starting GamBible V2.0')
 
-logging.info('Starting GamBible V2.0')
+    app = QApplication(sys.argv)
+    addFonts()
+    app.setStyleSheet(getStyleSheet())
+    gambible = GamBible()
+    gambible.show()
 
-app = QApplication(sys.argv)
-addFonts()
-app.setStyleSheet(getStyleSheet())
-gambible = GamBible()
-gambible.show()
+    app.exec()
 
-app.exec()
+    logging.info('Closing GamBible V2.0, See you later !')
 
-logging.info('Closing GamBible V2.0, See you later !')
+
+# Commands run headless (see cli), the window is only opened without arguments
+if len(sys.argv) > 1:
+    from cli import main
+    sys.exit(main(sys.argv[1:]))
+
+startApplication()
@@ -0,0 +1,68 @@
+# -*- coding: utf-8 -*-
+'''
+Project : GamBible
+Package: benchmarks
+Module:  __main__
+Version: 2.0
+Usage: Benchmarks command line, run from the src folder:
+    python -m benchmarks run [--preset small|medium|large] [--tennis N ...] [--ffa N ...] [--output results.json]
+    python -m benchmarks compare baseline.json results.json [--tolerance 0.1]
+
+Author: BoxBoxJason
+Date: 17/10/2026
+'''
+import argparse
+import logging
+import sys
+from os import environ
+from os.path import dirname,abspath
+environ.setdefault('GAMBIBLE',dirname(dirname(dirname(abspath(__file__)))))
+
+import optuna
+from resources.PathEnum import getJsonObject
+from benchmarks.runner import PRESETS,runBenchmarks,compareResults
+
+
+def main(arguments=None):
+    """
+    Benchmarks command line entry point.
+
+    :param list[str] arguments: Command line arguments (defaults to sys.argv).
+
+    :return: int - Exit status, 1 if a compared metric regressed.
+    """
+    parser = argparse.ArgumentParser(prog='benchmarks',description='GamBible ranking engines benchmarks')
+    subparsers = parser.add_subparsers(dest='command',required=True)
+
+    run_parser = subparsers.add_parser('run',help='Run the benchmarks suite')
+    run_parser.add_argument('--preset',choices=sorted(PRESETS),default='small',help='Benchmarks sizes')
+    run_parser.add_argument('--tennis',type=int,nargs='+',help='Tennis games counts (overrides the preset)')
+    run_parser.add_argument('--ffa',type=int,nargs='+',help='Free-for-all races counts (overrides the preset)')
+    run_parser.add_argument('--seed',type=int,default=0,help='Synthetic databases seed')
+    run_parser.add_argument('--output',help='JSON results file')
+
+    compare_parser = subparsers.add_parser('compare',help='Compare two results files')
+    compare_parser.add_argument('baseline',help='Baseline JSON results file')
+    compare_parser.add_argument('results',help='Compared JSON results file')
+    compare_parser.add_argument('--tolerance',type=float,default=0.1,help='Accepted relative degradation')
+
+    arguments = parser.parse_args(arguments)
+    logging.basicConfig(level=logging.WARNING)
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+
+    if arguments.command == 'run':
+        results = runBenchmarks(arguments.preset,arguments.seed,arguments.tennis,arguments.ffa,arguments.output)
+        for name,metrics in results['BENCHMARKS'].items():
+            print(f"{name:<40} " + ' '.join(f"{metric}={value:.6g}" for metric,value in metrics.items()))
+        return 0
+
+    comparisons = compareResults(getJsonObject(arguments.baseline),getJsonObject(arguments.results),arguments.tolerance)
+    for comparison in comparisons:
+        flag = 'REGRESSION' if comparison['REGRESSION'] else ''
+        print(f"{comparison['BENCHMARK']:<40} {comparison['METRIC']:<18} {comparison['BASELINE']:>14.6g} -> "
+              f"{comparison['VALUE']:<14.6g} x{comparison['RATIO']:.3f} {flag}")
+    return int(any(comparison['REGRESSION'] for comparison in comparisons))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
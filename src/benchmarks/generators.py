@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+'''
+Project : GamBible
+Package: benchmarks
+Module:  generators
+Version: 2.0
+Usage: Synthetic databases generators mimicking the results folder shapes (1v1 ELO and free-for-all MMR databases).
+Generation is fully determined by the seed, so that benchmarks of different commits process the same games.
+
+Author: BoxBoxJason
+Date: 17/10/2026
+'''
+from datetime import datetime,timedelta
+import numpy as np
+from ranking import ELO,MMR
+
+# Tennis courts surfaces
+TERRAINS = ('clay','grass','hard','carpet')
+# First synthetic game date
+START_DATE = datetime(2000,1,1)
+# Strength spread of synthetic players, in ELO points
+STRENGTH_DEVIATION = 300
+
+def generateTennisDatabase(games_count,players_count=None,seed=0):
+    """
+    Generates a 1v1 tennis-like ELO database: every game opposes two random players and is won by the stronger one
+    with the ELO win probability of their hidden strengths.
+
+    :param int games_count: Number of games.
+    :param int players_count: Number of players (defaults to one player per 50 games, 64 at least).
+    :param int seed: Random generator seed.
+
+    :return: dict - Database with GAMES and PLAYERS tables, all games unprocessed.
+    """
+    if players_count is None:
+        players_count = max(64,games_count // 50)
+    generator = np.random.default_rng(seed)
+    strengths = generator.normal(0,STRENGTH_DEVIATION,players_count)
+
+    first_players = generator.integers(0,players_count,games_count)
+    # Second player is shifted by a non zero offset, a player never faces himself
+    second_players = (first_players + generator.integers(1,players_count,games_count)) % players_count
+    first_win_probabilities = 1 / (1 + 10 ** ((strengths[second_players] - strengths[first_players]) / 400))
+    first_wins = generator.random(games_count) < first_win_probabilities
+    terrains = generator.integers(0,len(TERRAINS),games_count)
+
+    players_ids = [f"player-{player_index}" for player_index in range(players_count)]
+    players_table = {}
+    for player_id in players_ids:
+        ELO.createPlayer(players_table,player_id)
+
+    games_table = {}
+    for game_index,(first_player,second_player,first_win,terrain) in enumerate(zip(first_players.tolist(),second_players.tolist(),
+                                                                                  first_wins.tolist(),terrains.tolist())):
+        winner,loser = (first_player,second_player) if first_win else (second_player,first_player)
+        game_id = f"game-{game_index}"
+        games_table[game_id] = {
+        'ID':game_id,
+        'DATE':getGameDate(game_index),
+        'WINNER_ID':players_ids[winner],
+        'LOSER_ID':players_ids[loser],
+        'PROCESSED':False,
+        'TERRAIN':TERRAINS[terrain]
+        }
+
+    return {'GAMES':games_table,'PLAYERS':players_table}
+
+
+def generateFreeForAllDatabase(races_count,min_players=20,max_players=40,players_count=None,seed=0):
+    """
+    Generates a free-for-all MMR database: every race gathers a random field ranked by noisy hidden strengths.
+
+    :param int races_count: Number of races.
+    :param int min_players: Minimum number of players per race.
+    :param int max_players: Maximum number of players per race.
+    :param int players_count: Number of players (defaults to one player per 20 races, twice max_players at least).
+    :param int seed: Random generator seed.
+
+    :return: dict - Database with GAMES and PLAYERS tables, all games unprocessed.
+    """
+    if players_count is None:
+        players_count = max(2 * max_players,races_count // 20)
+    generator = np.random.default_rng(seed)
+    strengths = generator.normal(0,STRENGTH_DEVIATION,players_count)
+
+    players_ids = [f"player-{player_index}" for player_index in range(players_count)]
+    players_table = {}
+    for player_id in players_ids:
+        MMR.createPlayer(players_table,player_id)
+
+    games_table = {}
+    for race_index,field_size in enumerate(generator.integers(min_players,max_players + 1,races_count).tolist()):
+        field = generator.choice(players_count,field_size,replace=False)
+        performances = strengths[field] + generator.normal(0,STRENGTH_DEVIATION,field_size)
+        # Best performance first
+        ranking = [players_ids[player_index] for player_index in field[np.argsort(-performances)].tolist()]
+        MMR.createGame(games_table,players_table,f"race-{race_index}",getGameDate(race_index),ranking)
+
+    return {'GAMES':games_table,'PLAYERS':players_table}
+
+
+def getGameDate(game_index):
+    """
+    Returns the date of a synthetic game, games are one hour apart.
+    Dates are zero padded so that their string order is their chronological order.
+
+    :param int game_index: Game index.
+
+    :return: str - Game date (YYYY-MM-DD HH:MM).
+    """
+    return (START_DATE + timedelta(hours=game_index)).strftime('%Y-%m-%d %H:%M')
@@ -0,0 +1,510 @@
+# -*- coding: utf-8 -*-
+'''
+Project : GamBible
+Package: benchmarks
+Module:  runner
+Version: 2.0
+Usage: Ranking engines benchmarks: replay throughput, per-game latency percentiles, peak memory, root finders,
+matchups predictions, optimizer trials, modules cold start and prediction server latency. Results are JSON objects that can be compared between commits.
+
+Author: BoxBoxJason
+Date: 17/10/2026
+'''
+import os
+import sys
+import time
+import platform
+import subprocess
+import tracemalloc
+import tempfile
+from datetime import datetime
+from itertools import combinations
+from math import sqrt,pi,tanh
+import numpy as np
+import optuna
+from resources.PathEnum import dumpJsonObject
+from resources.utils import findZeroBisection
+from resources.solvers import findZeroNewton
+from ranking.general import orderGamesTable
+from ranking.DatasetCache import clearDatasets
+from ranking import ELO,MMR
+from ranking.PlayerState import ELOPlayer,MMRPlayer,getPlayersStates
+from service.PredictionServer import PredictionServer,PredictionService,LATENCY_TARGET_P99_MS
+from service.PredictionClient import PredictionClient
+from benchmarks.generators import generateTennisDatabase,generateFreeForAllDatabase
+
+# Benchmarked configurations, the ones used by the games widgets
+ELO_CONFIGURATION = (28.163265306122447,3.33265306122449,1)
+MMR_CONFIGURATION = (20,1,1)
+# Benchmarks sizes: tennis games counts, free-for-all races counts, root finder solves, optimizer trials
+PRESETS = {
+    'small':{'TENNIS':[10_000],'FFA':[1_000],'SOLVES':1_000,'TRIALS':3},
+    'medium':{'TENNIS':[10_000,100_000],'FFA':[1_000,10_000],'SOLVES':10_000,'TRIALS':10},
+    'large':{'TENNIS':[10_000,100_000,1_000_000],'FFA':[1_000,10_000,100_000],'SOLVES':100_000,'TRIALS':20}
+}
+# Tournament draw size of the matchups predictions benchmark
+DRAW_SIZE = 128
+# Number of predictions runs, the fastest one is kept
+PREDICTIONS_REPEATS = 20
+# Number of requests of each prediction server benchmark
+SERVER_REQUESTS = 2000
+# Modules imported by the entry points: headless replays and predictions, then the graphical interface
+STARTUP_MODULES = ('ranking.ELO','ranking.MMR','ranking.GameJournal','ranking.Simulation','interface.GamBible')
+# Dependencies only some commands need, an entry point module must not import them
+HEAVY_MODULES = ('optuna','matplotlib','PyQt6')
+# Import time budget of an entry point module, in seconds (cold interpreter start included)
+STARTUP_BUDGET_SECONDS = 0.5
+# Number of cold starts of each module, the fastest one is kept
+STARTUP_REPEATS = 5
+# Compared metrics: (results key, True if higher is better)
+COMPARED_METRICS = (
+    ('GAMES_PER_SECOND',True),
+    ('SOLVES_PER_SECOND',True),
+    ('TRIALS_PER_SECOND',True),
+    ('PREDICTIONS_PER_SECOND',True),
+    ('STARTUP_SECONDS',False),
+    ('REQUESTS_PER_SECOND',True),
+    ('LATENCY_P50_US',False),
+    ('LATENCY_P99_US',False),
+    ('PEAK_MEMORY_MB',False)
+)
+
+def runBenchmarks(preset='small',seed=0,tennis_sizes=None,ffa_sizes=None,output_path=None):
+    """
+    Runs the benchmarks suite.
+
+    :param str preset: Benchmarks sizes preset ('small', 'medium' or 'large').
+    :param int seed: Synthetic databases seed.
+    :param list[int] tennis_sizes: Tennis games counts, overrides the preset ones.
+    :param list[int] ffa_sizes: Free-for-all races counts, overrides the preset ones.
+    :param path output_path: Absolute path to the JSON results file (not written if None).
+
+    :return: dict - Results object with METADATA and BENCHMARKS (name -> metrics dict).
+    """
+    sizes = PRESETS[preset]
+    benchmarks = {}
+    for games_count in tennis_sizes or sizes['TENNIS']:
+        benchmarks[f"ELO.processGames tennis {games_count}"] = benchmarkELOReplay(games_count,seed)
+    for races_count in ffa_sizes or sizes['FFA']:
+        benchmarks[f"MMR.processGames ffa {races_count}"] = benchmarkMMRReplay(races_count,seed)
+    benchmarks.update(benchmarkRootFinders(sizes['SOLVES'],seed))
+    benchmarks.update(benchmarkPredictions(DRAW_SIZE,seed))
+    benchmarks.update(benchmarkOptimizerTrials(sizes['TRIALS'],seed))
+    benchmarks.update(benchmarkStartup())
+    benchmarks.update(benchmarkPredictionServer(SERVER_REQUESTS,seed))
+
+    results = {'METADATA':getMetadata(preset,seed),'BENCHMARKS':benchmarks}
+    if output_path is not None:
+        dumpJsonObject(results,output_path)
+    return results
+
+
+def benchmarkELOReplay(games_count,seed=0):
+    """
+    Benchmarks ELO.processGames on a synthetic tennis database.
+
+    :param int games_count: Number of games.
+    :param int seed: Synthetic database seed.
+
+    :return: dict - Replay metrics.
+    """
+    def processGames(games_table,players_table):
+        return ELO.processGames(None,games_table,players_table,*ELO_CONFIGURATION)
+
+    def processGame(games_table,players_states,game_id):
+        ELO.processGame(games_table[game_id],players_states,*ELO_CONFIGURATION)
+
+    return measureReplay(lambda: generateTennisDatabase(games_count,seed=seed),processGames,processGame,ELOPlayer)
+
+
+def benchmarkMMRReplay(races_count,seed=0):
+    """
+    Benchmarks MMR.processGames on a synthetic free-for-all database.
+
+    :param int races_count: Number of races.
+    :param int seed: Synthetic database seed.
+
+    :return: dict - Replay metrics.
+    """
+    def processGames(games_table,players_table):
+        return MMR.processGames(None,games_table,players_table,*MMR_CONFIGURATION)
+
+    def processGame(games_table,players_states,game_id):
+        MMR.processGame(players_states,games_table[game_id],*MMR_CONFIGURATION)
+
+    return measureReplay(lambda: generateFreeForAllDatabase(races_count,seed=seed),processGames,processGame,MMRPlayer)
+
+
+def measureReplay(generate,process_games,process_game,player_class):
+    """
+    Measures a replay on fresh databases: whole replay throughput, per-game latencies and replay peak memory
+    (allocations made during the replay, the database itself excluded). Each measure runs on its own database so
+    that the latency timers and tracemalloc do not slow the throughput measure down.
+
+    :param function generate: () -> dict, generates a fresh database.
+    :param function process_games: (games_table,players_table) -> float, processes every game, returns the success rate.
+    :param function process_game: (games_table,players_states,game_id) -> None, processes a single game.
+    :param type player_class: Player state class of the ranking algorithm (ELOPlayer or MMRPlayer).
+
+    :return: dict - Replay metrics.
+    """
+    database = generate()
+    games_count = len(database['GAMES'])
+    start_time = time.perf_counter()
+    success_rate = process_games(database['GAMES'],database['PLAYERS'])
+    elapsed_time = time.perf_counter() - start_time
+
+    database = generate()
+    players_states = getPlayersStates(database['PLAYERS'],player_class)
+    latencies = []
+    for game_id in orderGamesTable(database['GAMES']):
+        game_start_time = time.perf_counter()
+        process_game(database['GAMES'],players_states,game_id)
+        latencies.append(time.perf_counter() - game_start_time)
+
+    database = generate()
+    tracemalloc.start()
+    process_games(database['GAMES'],database['PLAYERS'])
+    _,peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    metrics = {
+        'GAMES':games_count,
+        'SECONDS':elapsed_time,
+        'GAMES_PER_SECOND':games_count / elapsed_time if elapsed_time > 0 else 0,
+        'SUCCESS_RATE':success_rate,
+        'PEAK_MEMORY_MB':peak_memory / 2**20
+    }
+    metrics.update(getLatencyPercentiles(latencies))
+    return metrics
+
+
+def benchmarkRootFinders(solves_count,seed=0):
+    """
+    Benchmarks findZeroBisection and findZeroNewton on MMR performance equations of random free-for-all fields.
+
+    :param int solves_count: Number of equations solved by each root finder.
+    :param int seed: Random generator seed.
+
+    :return: dict - Metrics by benchmark name.
+    """
+    generator = np.random.default_rng(seed)
+    equations = []
+    for _ in range(solves_count):
+        field_size = int(generator.integers(20,41))
+        skills = generator.normal(MMR.START_SKILL,300,field_size).tolist()
+        deviations = generator.uniform(50,MMR.START_DEVIATION,field_size).tolist()
+        selected_index = int(generator.integers(0,field_size))
+        equations.append((getPerfEquation(skills,deviations,selected_index),skills[selected_index]))
+
+    latencies = []
+    start_time = time.perf_counter()
+    for equation,_ in equations:
+        solve_start_time = time.perf_counter()
+        findZeroBisection(lambda x: equation(x)[0])
+        latencies.append(time.perf_counter() - solve_start_time)
+    bisection_metrics = getSolverMetrics(solves_count,time.perf_counter() - start_time,latencies)
+
+    latencies = []
+    start_time = time.perf_counter()
+    for equation,warm_start in equations:
+        solve_start_time = time.perf_counter()
+        findZeroNewton(equation,warm_start)
+        latencies.append(time.perf_counter() - solve_start_time)
+    newton_metrics = getSolverMetrics(solves_count,time.perf_counter() - start_time,latencies)
+
+    return {f"findZeroBisection {solves_count}":bisection_metrics,f"findZeroNewton {solves_count}":newton_metrics}
+
+
+def getPerfEquation(skills,deviations,selected_index):
+    """
+    Returns the MMR performance equation of a player in a race (see MMR.getPerfEstimation).
+
+    :param list[float] skills: Players skills, ordered by race outcome.
+    :param list[float] deviations: Players skills deviations, ordered by race outcome.
+    :param int selected_index: Index of the player whose performance is estimated.
+
+    :return: function - R -> (R,R) equation returning its value and derivative.
+    """
+    terms = [(skill,1 / deviation,2 * sqrt(3) / pi * deviation) for skill,deviation in zip(skills,deviations)]
+
+    def equation(x):
+        value = 0
+        derivative = 0
+        for index,(skill,inverse_deviation,scale) in enumerate(terms):
+            t = tanh((x - skill) / scale)
+            slope = inverse_deviation / scale * (1 - t * t)
+            if index <= selected_index:
+                value += inverse_deviation * (t - 1)
+                derivative += slope
+            if index >= selected_index:
+                value += inverse_deviation * (t + 1)
+                derivative += slope
+        return value,derivative
+
+    return equation
+
+
+def getSolverMetrics(solves_count,elapsed_time,latencies):
+    """
+    :param int solves_count: Number of solved equations.
+    :param float elapsed_time: Total solving time in seconds.
+    :param list[float] latencies: Solving time of each equation in seconds.
+
+    :return: dict - Root finder metrics.
+    """
+    metrics = {
+        'SOLVES':solves_count,
+        'SECONDS':elapsed_time,
+        'SOLVES_PER_SECOND':solves_count / elapsed_time if elapsed_time > 0 else 0
+    }
+    metrics.update(getLatencyPercentiles(latencies))
+    return metrics
+
+
+def benchmarkPredictions(draw_size,seed=0):
+    """
+    Benchmarks ELO predictions of every possible pairing of a tournament draw, one determineWinProbability call per
+    pairing against a single predictMatchups call.
+
+    :param int draw_size: Number of players in the draw.
+    :param int seed: Synthetic database seed.
+
+    :return: dict - Metrics by benchmark name.
+    """
+    database = generateTennisDatabase(50 * draw_size,players_count=draw_size,seed=seed)
+    players_table = database['PLAYERS']
+    ELO.processGames(None,database['GAMES'],players_table,*ELO_CONFIGURATION)
+    pairs = list(combinations(players_table,2))
+
+    def predictPairs():
+        return [ELO.determineWinProbability(players_table[player1_id]['ELO'],players_table[player2_id]['ELO'])
+                for player1_id,player2_id in pairs]
+
+    def predictMatchups():
+        return ELO.predictMatchups(players_table,pairs)
+
+    benchmarks = {}
+    for name,predict in ((f"ELO.determineWinProbability draw {draw_size}",predictPairs),
+                         (f"ELO.predictMatchups draw {draw_size}",predictMatchups)):
+        elapsed_time = float('inf')
+        for _ in range(PREDICTIONS_REPEATS):
+            start_time = time.perf_counter()
+            predict()
+            elapsed_time = min(elapsed_time,time.perf_counter() - start_time)
+        benchmarks[name] = {
+            'PREDICTIONS':len(pairs),
+            'SECONDS':elapsed_time,
+            'PREDICTIONS_PER_SECOND':len(pairs) / elapsed_time if elapsed_time > 0 else 0
+        }
+    return benchmarks
+
+
+def benchmarkOptimizerTrials(n_trials,seed=0):
+    """
+    Benchmarks full optimizer trials (ELO.runTrials and MMR.runTrials) on synthetic databases written to a temporary
+    folder. Parsing the database is timed apart, as it only happens once per optimization.
+
+    :param int n_trials: Number of trials of each algorithm.
+    :param int seed: Synthetic databases and sampler seed.
+
+    :return: dict - Metrics by benchmark name.
+    """
+    benchmarks = {}
+    with tempfile.TemporaryDirectory() as temporary_directory:
+        for name,run_trials,database in (('ELO.runTrials tennis 10000',ELO.runTrials,generateTennisDatabase(10_000,seed=seed)),
+                                        ('MMR.runTrials ffa 1000',MMR.runTrials,generateFreeForAllDatabase(1_000,seed=seed))):
+            db_path = os.path.join(temporary_directory,f"{name.split('.')[0]}.json")
+            dumpJsonObject(database,db_path)
+            # Trials are never pruned, each one is a full replay
+            study = optuna.create_study(direction='maximize',sampler=optuna.samplers.TPESampler(seed=seed),
+                                        pruner=optuna.pruners.NopPruner())
+
+            start_time = time.perf_counter()
+            run_trials(study,1,db_path)
+            setup_time = time.perf_counter() - start_time
+            start_time = time.perf_counter()
+            run_trials(study,n_trials,db_path)
+            elapsed_time = time.perf_counter() - start_time
+
+            benchmarks[name] = {
+                'TRIALS':n_trials,
+                'SECONDS':elapsed_time,
+                'TRIALS_PER_SECOND':n_trials / elapsed_time if elapsed_time > 0 else 0,
+                'FIRST_TRIAL_SECONDS':setup_time
+            }
+        clearDatasets()
+
+    return benchmarks
+
+
+def benchmarkPredictionServer(requests_count,seed=0):
+    """
+    Benchmarks the prediction server round-trips from a local client (persistent connection, loopback interface):
+    single matchups, draw matchups batches and leaderboard slices, against the published p99 latency target.
+
+    :param int requests_count: Number of requests of each kind.
+    :param int seed: Synthetic databases seed.
+
+    :return: dict - Metrics by benchmark name.
+    """
+    database = generateTennisDatabase(50 * DRAW_SIZE,players_count=DRAW_SIZE,seed=seed)
+    players_table = database['PLAYERS']
+    ELO.processGames(None,database['GAMES'],players_table,*ELO_CONFIGURATION)
+    players_ids = list(players_table)
+    generator = np.random.default_rng(seed)
+    pairs = [tuple(generator.choice(players_ids,2,replace=False).tolist()) for _ in range(requests_count)]
+    draw_pairs = list(combinations(players_ids[:32],2))
+
+    server = PredictionServer(PredictionService(players_table,{},MMR_CONFIGURATION[1]),port=0)
+    server.startInBackground()
+    benchmarks = {}
+    try:
+        with PredictionClient(port=server.server_address[1]) as client:
+            for name,request,predictions_count in (("server matchup",lambda index: client.predictMatchups([pairs[index]]),1),
+                                                   ("server matchups draw 32",lambda _: client.predictMatchups(draw_pairs),len(draw_pairs)),
+                                                   ("server leaderboard",lambda index: client.getLeaderboard('elo',index % DRAW_SIZE),0)):
+                request(0)
+                latencies = []
+                start_time = time.perf_counter()
+                for index in range(requests_count):
+                    request_start_time = time.perf_counter()
+                    request(index)
+                    latencies.append(time.perf_counter() - request_start_time)
+                elapsed_time = time.perf_counter() - start_time
+                metrics = {
+                    'REQUESTS':requests_count,
+                    'SECONDS':elapsed_time,
+                    'REQUESTS_PER_SECOND':requests_count / elapsed_time if elapsed_time > 0 else 0
+                }
+                if predictions_count:
+                    metrics['PREDICTIONS_PER_SECOND'] = requests_count * predictions_count / elapsed_time if elapsed_time > 0 else 0
+                metrics.update(getLatencyPercentiles(latencies))
+                metrics['WITHIN_TARGET'] = int(metrics['LATENCY_P99_US'] <= LATENCY_TARGET_P99_MS * 1000)
+                benchmarks[name] = metrics
+    finally:
+        server.shutdown()
+        server.server_close()
+    return benchmarks
+
+
+def benchmarkStartup(modules=STARTUP_MODULES,repeats=STARTUP_REPEATS):
+    """
+    Benchmarks modules cold start: a fresh interpreter is started for every import, so that nothing is cached.
+    Modules that cannot be imported in this environment (missing optional dependency) are skipped.
+
+    :param tuple[str] modules: Imported modules names.
+    :param int repeats: Number of cold starts of each module.
+
+    :return: dict - Metrics by benchmark name.
+    """
+    benchmarks = {}
+    # The interpreter start alone, subtracted from the imports times
+    interpreter_time = min(timeColdStart('pass')[0] for _ in range(repeats))
+    for module in modules:
+        code = f"import sys; import {module}; print(sum(module in sys.modules for module in {HEAVY_MODULES!r}))"
+        starts = [timeColdStart(code) for _ in range(repeats)]
+        if any(output is None for _,output in starts):
+            continue
+        startup_time = min(elapsed_time for elapsed_time,_ in starts)
+        benchmarks[f"import {module}"] = {
+            'STARTUP_SECONDS':startup_time,
+            'IMPORT_SECONDS':max(0,startup_time - interpreter_time),
+            'HEAVY_MODULES':int(starts[0][1]),
+            'WITHIN_BUDGET':int(startup_time <= STARTUP_BUDGET_SECONDS)
+        }
+    return benchmarks
+
+
+def timeColdStart(code):
+    """
+    Runs python code in a fresh interpreter, from the src folder.
+
+    :param str code: Python code.
+
+    :return: tuple[float,str] - Elapsed time in seconds and standard output (None if the code failed).
+    """
+    source_directory = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    environment = dict(os.environ,GAMBIBLE=os.environ.get('GAMBIBLE',os.path.dirname(source_directory)))
+    start_time = time.perf_counter()
+    process = subprocess.run([sys.executable,'-c',code],capture_output=True,text=True,cwd=source_directory,env=environment)
+    elapsed_time = time.perf_counter() - start_time
+    return elapsed_time,process.stdout.strip() if process.returncode == 0 else None
+
+
+def getLatencyPercentiles(latencies):
+    """
+    :param list[float] latencies: Latencies in seconds.
+
+    :return: dict - 50th, 90th, 99th percentiles and maximum latencies in microseconds.
+    """
+    if not latencies:
+        return {}
+    percentiles = np.percentile(np.array(latencies) * 1e6,[50,90,99,100]).tolist()
+    return dict(zip(('LATENCY_P50_US','LATENCY_P90_US','LATENCY_P99_US','LATENCY_MAX_US'),percentiles))
+
+
+def getMetadata(preset,seed):
+    """
+    :param str preset: Benchmarks sizes preset.
+    :param int seed: Synthetic databases seed.
+
+    :return: dict - Benchmarks environment description.
+    """
+    return {
+        'DATE':datetime.now().isoformat(timespec='seconds'),
+        'COMMIT':getCommit(),
+        'PRESET':preset,
+        'SEED':seed,
+        'PYTHON':sys.version.split()[0],
+        'NUMPY':np.__version__,
+        'PLATFORM':platform.platform(),
+        'PROCESSOR':platform.processor() or platform.machine()
+    }
+
+
+def getCommit():
+    """
+    :return: str - Current git commit hash (None outside of a git repository).
+    """
+    try:
+        return subprocess.run(['git','rev-parse','HEAD'],capture_output=True,text=True,check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError,subprocess.CalledProcessError):
+        return None
+
+
+def compareResults(baseline_results,results,tolerance=0.1):
+    """
+    Compares two benchmarks results, metrics worse than the baseline by more than tolerance are regressions.
+
+    :param dict baseline_results: Baseline results object.
+    :param dict results: Compared results object.
+    :param float tolerance: Accepted relative degradation.
+
+    :return: list[dict] - Comparison of every metric of the common benchmarks (BENCHMARK, METRIC, BASELINE, VALUE,
+        RATIO (higher is better) and REGRESSION).
+    """
+    comparisons = []
+    for name,baseline_metrics in baseline_results['BENCHMARKS'].items():
+        metrics = results['BENCHMARKS'].get(name)
+        if metrics is None:
+            continue
+        for metric,higher_is_better in COMPARED_METRICS:
+            if metric not in baseline_metrics or metric not in metrics:
+                continue
+            baseline_value = baseline_metrics[metric]
+            value = metrics[metric]
+            if higher_is_better:
+                ratio = value / baseline_value if baseline_value else float('inf')
+            else:
+                ratio = baseline_value / value if value else float('inf')
+            comparisons.append({
+                'BENCHMARK':name,
+                'METRIC':metric,
+                'BASELINE':baseline_value,
+                'VALUE':value,
+                'RATIO':ratio,
+                'REGRESSION':ratio < 1 - tolerance
+            })
+    return comparisons
@@ -0,0 +1,274 @@
+# -*- coding: utf-8 -*-
+'''
+Project : GamBible
+Package:
+Module:  cli
+Version: 2.0
+Usage: Headless command line, never imports Qt. Run from the src folder (or through the GamBible entry point with
+arguments):
+    python -m cli replay SPORT CATEGORY [--algorithm elo|mmr] [--parameters P1 P2 P3] [--commit]
+    python -m cli optimize SPORT CATEGORY [--algorithm elo|mmr] [--trials N] [--workers K] [--batch-size B (ELO only)]
+    python -m cli predict SPORT CATEGORY MATCHUPS_FILE [--algorithm elo|mmr] [--output predictions.csv]
+    python -m cli serve SPORT CATEGORY [--host 127.0.0.1] [--port 8765]
+The database commands accept --database to use a database file instead of the sport and category default one, and
+--stats to print the instrumentation timers and counters.
+
+Author: BoxBoxJason
+Date: 17/10/2026
+'''
+import argparse
+import csv
+import logging
+import sys
+import time
+from json import dumps
+from os import environ
+from os.path import dirname,abspath,exists
+environ.setdefault('GAMBIBLE',dirname(dirname(abspath(__file__))))
+
+from resources import instrumentation
+from resources.PathEnum import getDBPath
+from resources.ColumnarDB import getDatabaseObject
+from ranking import ELO,MMR
+from ranking.GamesIndex import getGamesIndex
+
+# Default database file of each algorithm, in the sport and category results folder
+DEFAULT_DATABASES = {'elo':'defaultELO.json','mmr':'defaultMMR-FFA.json'}
+# Default configuration of each algorithm, the one used by the games widgets
+DEFAULT_PARAMETERS = {'elo':ELO.DEFAULT_PARAMETERS,'mmr':MMR.DEFAULT_PARAMETERS}
+# Configuration parameters names, in command line order
+PARAMETERS_NAMES = {'elo':('BASE_POINTS','BEGINNER_MULTIPLIER','LOW_ELO_MULTIPLIER'),'mmr':('γ','β','ρ')}
+# Number of simulated races of a free-for-all prediction
+RACE_SIMULATIONS_COUNT = 100_000
+
+
+def main(arguments=None):
+    """
+    Command line entry point.
+
+    :param list[str] arguments: Command line arguments (defaults to sys.argv).
+
+    :return: int - Exit status.
+    """
+    parser = argparse.ArgumentParser(prog='gambible',description='GamBible headless commands')
+    parser.add_argument('--stats',action='store_true',help='Print the instrumentation timers and counters')
+    parser.add_argument('--verbose',action='store_true',help='Log informations on standard error')
+    subparsers = parser.add_subparsers(dest='command',required=True)
+
+    replay_parser = subparsers.add_parser('replay',help='Process the database new games')
+    addDatabaseArguments(replay_parser)
+    replay_parser.add_argument('--parameters',type=float,nargs=3,metavar='P',
+                               help='ELO (base points, beginner multiplier, low ELO multiplier) or MMR (γ, β, ρ) '
+                                    'configuration, defaults to the widgets one')
+    replay_parser.add_argument('--commit',action='store_true',help='Write the ratings to the database')
+
+    optimize_parser = subparsers.add_parser('optimize',help='Run a hyperparameters optimization')
+    optimize_parser.add_argument('sport',help='Sport name')
+    optimize_parser.add_argument('category',help='Sport category')
+    optimize_parser.add_argument('--algorithm',choices=sorted(DEFAULT_DATABASES),default='elo',help='Ranking algorithm')
+    optimize_parser.add_argument('--trials',type=int,default=1000,help='Number of evaluated configurations')
+    optimize_parser.add_argument('--workers',type=int,default=1,help='Number of worker processes')
+    optimize_parser.add_argument('--batch-size',type=int,default=1,help='Configurations evaluated by a single replay (ELO only)')
+    optimize_parser.add_argument('--journal',action='store_true',help='Store the study in a journal file')
+    optimize_parser.add_argument('--no-pruning',action='store_true',help='Never abandon unpromising configurations')
+    # Optimizations always run on the sport and category default database
+    optimize_parser.set_defaults(database=None)
+
+    predict_parser = subparsers.add_parser('predict',help='Predict games from a matchups file')
+    addDatabaseArguments(predict_parser)
+    predict_parser.add_argument('matchups',help="CSV file, one game per line (players ids), '-' for standard input")
+    predict_parser.add_argument('--output',help='CSV predictions file (defaults to standard output)')
+    predict_parser.add_argument('--seed',type=int,help='Free-for-all simulations seed')
+
+    serve_parser = subparsers.add_parser('serve',help='Serve predictions over local HTTP (see service.PredictionServer)')
+    serve_parser.add_argument('sport',help='Sport name')
+    serve_parser.add_argument('category',help='Sport category')
+    serve_parser.add_argument('--host',default='127.0.0.1',help='Listening address')
+    serve_parser.add_argument('--port',type=int,default=8765,help='Listening port')
+    serve_parser.add_argument('--elo-database',help='1v1 games database (overrides the sport and category default one)')
+    serve_parser.add_argument('--mmr-database',help='Free-for-all games database (overrides the sport and category default one)')
+
+    arguments = parser.parse_args(arguments)
+    logging.basicConfig(level=logging.INFO if arguments.verbose else logging.WARNING,
+                        format="%(asctime)s [%(levelname)s] %(message)s",stream=sys.stderr)
+    if arguments.stats:
+        instrumentation.enableInstrumentation()
+
+    if arguments.command == 'replay':
+        replayDatabase(arguments)
+    elif arguments.command == 'optimize':
+        optimizeConfiguration(arguments)
+    elif arguments.command == 'predict':
+        predictMatchups(arguments)
+    else:
+        servePredictions(arguments)
+
+    if arguments.stats:
+        print(dumps(instrumentation.getInstrumentationSummary(),indent=2,sort_keys=True),file=sys.stderr)
+    return 0
+
+
+def addDatabaseArguments(parser):
+    """
+    Adds the arguments selecting a database and its ranking algorithm.
+
+    :param argparse.ArgumentParser parser: Command parser.
+    """
+    parser.add_argument('sport',help='Sport name')
+    parser.add_argument('category',help='Sport category')
+    parser.add_argument('--algorithm',choices=sorted(DEFAULT_DATABASES),default='elo',help='Ranking algorithm')
+    parser.add_argument('--database',help='Database file (overrides the sport and category default one)')
+
+
+def getDatabasePath(arguments):
+    """
+    :param argparse.Namespace arguments: Parsed command arguments.
+
+    :return: path - Absolute path to the command database, exits if there is no database there.
+    """
+    if arguments.database:
+        db_path = abspath(arguments.database)
+    else:
+        db_path = getDBPath(arguments.sport,arguments.category,DEFAULT_DATABASES[arguments.algorithm],False)
+    if not exists(db_path):
+        raise SystemExit(f"No database at {db_path}")
+    return db_path
+
+
+def replayDatabase(arguments):
+    """
+    Processes the new games of a database with the requested configuration and prints the replay statistics. Nothing
+    is written (ratings nor games index) unless --commit is given.
+
+    :param argparse.Namespace arguments: Parsed command arguments.
+    """
+    db_path = getDatabasePath(arguments)
+    parameters = arguments.parameters or DEFAULT_PARAMETERS[arguments.algorithm]
+
+    start_time = time.perf_counter()
+    database = getDatabaseObject(db_path)
+    games_table = database['GAMES']
+    games_ordered_ids = getGamesIndex(db_path,games_table,arguments.commit).games_ids
+    load_time = time.perf_counter() - start_time
+    games_count = sum(not game_dict['PROCESSED'] for game_dict in games_table.values())
+
+    start_time = time.perf_counter()
+    algorithm = ELO if arguments.algorithm == 'elo' else MMR
+    success_rate = algorithm.processGames(db_path,games_table,database['PLAYERS'],*parameters,arguments.commit,games_ordered_ids)
+    replay_time = time.perf_counter() - start_time
+
+    print(f"Configuration: {', '.join(f'{name}={value:g}' for name,value in zip(PARAMETERS_NAMES[arguments.algorithm],parameters))}")
+    print(f"Processed games: {games_count} ({len(database['PLAYERS'])} players)")
+    print(f"Success rate: {success_rate:.4f}")
+    print(f"Load time: {load_time:.3f}s")
+    print(f"Replay time: {replay_time:.3f}s ({games_count / replay_time if replay_time > 0 else 0:.0f} games/s)")
+    if arguments.commit:
+        print(f"Ratings written to {db_path}")
+
+
+def optimizeConfiguration(arguments):
+    """
+    Runs a hyperparameters optimization and prints its throughput.
+
+    :param argparse.Namespace arguments: Parsed command arguments.
+    """
+    if arguments.algorithm != 'elo' and arguments.batch_size != 1:
+        raise SystemExit('--batch-size only applies to ELO optimizations')
+    # Checked here, the optimization would create an empty database
+    getDatabasePath(arguments)
+
+    import optuna
+    if not arguments.verbose:
+        optuna.logging.set_verbosity(optuna.logging.WARNING)
+
+    if arguments.algorithm == 'elo':
+        throughput = ELO.optimizeHyperparametersBayesian(arguments.sport,arguments.category,arguments.trials,arguments.batch_size,
+                                                         arguments.workers,arguments.journal,not arguments.no_pruning)
+    else:
+        throughput = MMR.optimizeHyperparametersBayesian(arguments.sport,arguments.category,arguments.trials,arguments.workers,
+                                                         arguments.journal,not arguments.no_pruning)
+    print(f"Evaluated configurations: {arguments.trials} ({throughput:.2f} trials/s)")
+
+
+def predictMatchups(arguments):
+    """
+    Predicts every game of a matchups file: ELO win probabilities of 1v1 games, MMR simulated win probabilities of
+    free-for-all games. Each output line gives the players ids followed by their win probability.
+
+    :param argparse.Namespace arguments: Parsed command arguments.
+    """
+    players_table = getDatabaseObject(getDatabasePath(arguments))['PLAYERS']
+    matchups = readMatchups(arguments.matchups)
+    unknown_players_ids = {player_id for players_ids in matchups for player_id in players_ids if player_id not in players_table}
+    if unknown_players_ids:
+        logging.warning(f"Unknown players, rated like new players: {', '.join(sorted(unknown_players_ids))}")
+
+    start_time = time.perf_counter()
+    if arguments.algorithm == 'elo':
+        if any(len(players_ids) != 2 for players_ids in matchups):
+            raise SystemExit('ELO predictions need exactly two players per line')
+        win_probabilities = ELO.predictMatchups(players_table,matchups).tolist()
+        predictions = [(probability,1 - probability) for probability in win_probabilities]
+    else:
+        from ranking.Simulation import simulateRace
+        predictions = [simulateRace(players_table,players_ids,DEFAULT_PARAMETERS['mmr'][1],RACE_SIMULATIONS_COUNT,
+                                    seed=arguments.seed)[:,0].tolist() for players_ids in matchups]
+    elapsed_time = time.perf_counter() - start_time
+
+    output_file = open(arguments.output,'w',newline='',encoding='utf-8') if arguments.output else sys.stdout
+    try:
+        writer = csv.writer(output_file)
+        for players_ids,probabilities in zip(matchups,predictions):
+            writer.writerow([value for player_id,probability in zip(players_ids,probabilities)
+                             for value in (player_id,f"{probability:.4f}")])
+    finally:
+        if output_file is not sys.stdout:
+            output_file.close()
+    print(f"Predicted games: {len(matchups)} in {elapsed_time:.4f}s "
+          f"({len(matchups) / elapsed_time if elapsed_time > 0 else 0:.0f} games/s)",file=sys.stderr)
+
+
+def servePredictions(arguments):
+    """
+    Loads the sport category ratings and serves predictions until interrupted.
+
+    :param argparse.Namespace arguments: Parsed command arguments.
+    """
+    from service.PredictionServer import PredictionServer,loadPredictionService
+
+    databases_paths = {algorithm:abspath(database) if database else getDBPath(arguments.sport,arguments.category,DEFAULT_DATABASES[algorithm],False)
+                       for algorithm,database in (('elo',arguments.elo_database),('mmr',arguments.mmr_database))}
+    start_time = time.perf_counter()
+    service = loadPredictionService(databases_paths['elo'],databases_paths['mmr'],DEFAULT_PARAMETERS['elo'],DEFAULT_PARAMETERS['mmr'])
+    print(f"Loaded {len(service.elo_players_table)} ELO and {len(service.mmr_players_table)} MMR players "
+          f"in {time.perf_counter() - start_time:.3f}s",flush=True)
+
+    server = PredictionServer(service,arguments.host,arguments.port)
+    print(f"Serving predictions on http://{arguments.host}:{server.server_address[1]}",flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def readMatchups(matchups_path):
+    """
+    Reads a matchups file, blank lines are skipped.
+
+    :param path matchups_path: CSV file path, '-' for standard input.
+
+    :return: list[tuple[str]] - Players ids of each game.
+    """
+    matchups_file = sys.stdin if matchups_path == '-' else open(matchups_path,newline='',encoding='utf-8')
+    try:
+        return [tuple(player_id.strip() for player_id in row) for row in csv.reader(matchups_file)
+                if any(player_id.strip() for player_id in row)]
+    finally:
+        if matchups_file is not sys.stdin:
+            matchups_file.close()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
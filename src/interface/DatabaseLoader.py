@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+'''
+Project : GamBible
+Package: interface
+Module:  DatabaseLoader
+Version: 2.0
+Usage: Background database loading for the GamBible pages. The database is parsed, its new games processed, the
+result committed and its players lookup built in a QThreadPool worker, the page is populated from the finished signal
+on the main thread.
+
+Author: BoxBoxJason
+Date: 17/10/2026
+'''
+import logging
+import os
+import threading
+from PyQt6.QtCore import QObject,QRunnable,pyqtSignal
+from resources.ColumnarDB import getDatabaseObject
+from ranking.PlayerLookup import PlayerLookup
+
+# Loaders of a same database run one at a time: a loader only reads the database once the previous one (even a
+# cancelled one) is done committing it
+_DATABASES_LOCKS = {}
+_DATABASES_LOCKS_LOCK = threading.Lock()
+
+class LoadingCancelled(Exception):
+    """
+    Raised in the worker thread to stop a cancelled loading.
+    """
+
+
+class DatabaseLoaderSignals(QObject):
+    """
+    DatabaseLoader signals, emitted from the worker thread and received on the main thread.
+
+    :cvar pyqtSignal progress: (processed_games,total_games) emitted at the processing checkpoints.
+    :cvar pyqtSignal loaded: (database,players_lookup) emitted once the database and its players lookup are ready.
+    :cvar pyqtSignal failed: (error_message) emitted if the loading raised an error.
+    """
+    progress = pyqtSignal(int,int)
+    loaded = pyqtSignal(object,object)
+    failed = pyqtSignal(str)
+
+
+class DatabaseLoader(QRunnable):
+    """
+    Loads a database and processes its new games in a worker thread.
+    A cancelled loading stops at the next processing checkpoint, before anything is committed, and emits no signal.
+    Loadings of a same database are serialized, a loading waits for the previous ones to finish.
+
+    :ivar path database_path: Absolute path to the database file.
+    :ivar function process_database: (database_path,database,checkpoint_callback) -> None, processes the games (None to only load).
+    :ivar DatabaseLoaderSignals signals: Loading signals.
+    """
+    def __init__(self,database_path,process_database=None):
+        """
+        Constructor for DatabaseLoader.
+
+        :param path database_path: Absolute path to the database file.
+        :param function process_database: (database_path,database,checkpoint_callback) -> None, processes the games
+        and commits them, checkpoint_callback must be passed to processGames.
+        """
+        super().__init__()
+        self.database_path = database_path
+        self.process_database = process_database
+        self.signals = DatabaseLoaderSignals()
+        self.__cancelled = threading.Event()
+
+
+    def cancel(self):
+        """
+        Requests the loading to stop, can be called from any thread.
+        """
+        self.__cancelled.set()
+
+
+    def isCancelled(self):
+        """
+        :return: bool - States if the loading was cancelled.
+        """
+        return self.__cancelled.is_set()
+
+
+    def run(self):
+        """
+        Worker thread entry point.
+        """
+        try:
+            with _getDatabaseLock(self.database_path):
+                self.__checkCancelled()
+                database = getDatabaseObject(self.database_path)
+                self.__checkCancelled()
+                if self.process_database is not None:
+                    total_games = sum(not game_dict['PROCESSED'] for game_dict in database.get('GAMES',{}).values())
+                    self.signals.progress.emit(0,total_games)
+
+                    def checkpointCallback(processed_games,_):
+                        self.__checkCancelled()
+                        self.signals.progress.emit(processed_games,total_games)
+
+                    self.process_database(self.database_path,database,checkpointCallback)
+            self.__checkCancelled()
+            players_lookup = PlayerLookup(database.get('PLAYERS',{}))
+        except LoadingCancelled:
+            logging.debug(f"Loading of {self.database_path} cancelled")
+            return
+        except Exception as error:
+            logging.exception(f"Loading of {self.database_path} failed")
+            self.signals.failed.emit(str(error))
+            return
+
+        self.signals.loaded.emit(database,players_lookup)
+
+
+    def __checkCancelled(self):
+        """
+        Stops the loading if it was cancelled.
+        """
+        if self.__cancelled.is_set():
+            raise LoadingCancelled()
+
+
+def _getDatabaseLock(database_path):
+    """
+    :param path database_path: Absolute path to the database file.
+
+    :return: threading.Lock - Lock held by the loaders of the database.
+    """
+    with _DATABASES_LOCKS_LOCK:
+        return _DATABASES_LOCKS.setdefault(os.path.normpath(database_path),threading.Lock())
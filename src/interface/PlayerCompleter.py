@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+'''
+Project : GamBible
+Package: interface
+Module:  PlayerCompleter
+Version: 2.0
+Usage: Players ids search bar completer. Suggestions are queried from the database PlayerLookup as the user types,
+the completer model only holds the displayed suggestions.
+
+Author: BoxBoxJason
+Date: 17/10/2026
+'''
+from PyQt6.QtWidgets import QCompleter
+from PyQt6.QtCore import QStringListModel
+from ranking.PlayerLookup import PlayerLookup,SUGGESTIONS_LIMIT
+
+class PlayerCompleter(QCompleter):
+    """
+    Search bar completer suggesting players ids (prefix matches first, then accent insensitive fuzzy matches).
+
+    :ivar PlayerLookup players_lookup: Suggested players index.
+    :ivar QLineEdit __search_bar: Completed search bar.
+    :ivar QStringListModel __suggestions_model: Displayed suggestions.
+    """
+    def __init__(self,search_bar):
+        """
+        Constructor for PlayerCompleter, installs the completer on the search bar.
+
+        :param QLineEdit search_bar: Completed search bar.
+        """
+        super().__init__(search_bar)
+        self.players_lookup = PlayerLookup(())
+        self.__search_bar = search_bar
+        self.__suggestions_model = QStringListModel(self)
+        self.setModel(self.__suggestions_model)
+        # Suggestions are already filtered by the lookup
+        self.setCompletionMode(QCompleter.CompletionMode.UnfilteredPopupCompletion)
+        self.setMaxVisibleItems(SUGGESTIONS_LIMIT)
+        search_bar.setCompleter(self)
+        search_bar.textEdited.connect(self.__updateSuggestions)
+
+
+    def setPlayersLookup(self,players_lookup):
+        """
+        Changes the suggested players.
+
+        :param PlayerLookup players_lookup: Suggested players index.
+        """
+        self.players_lookup = players_lookup
+        self.__suggestions_model.setStringList([])
+
+
+    def __updateSuggestions(self,text):
+        """
+        Suggests the players matching the text typed in the search bar.
+
+        :param str text: Text in the search bar.
+        """
+        suggestions = self.players_lookup.suggest(text) if text.strip() else []
+        self.__suggestions_model.setStringList(suggestions)
+        if suggestions and suggestions != [text]:
+            self.complete()
+        else:
+            self.popup().hide()
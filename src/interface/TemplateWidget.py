@@ -9,8 +9,12 @@ Usage: General template for GamBible MainWidget subwidgets
 Author: BoxBoxJason
 Date: 22/11/2023
 '''
-from PyQt6.QtWidgets import QWidget,QLabel,QGridLayout
-from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QWidget,QLabel,QGridLayout,QProgressBar
+from PyQt6.QtCore import Qt,QThreadPool
+from interface.DatabaseLoader import DatabaseLoader
+
+# Layout row of the loading progress bar, below every page content
+LOADING_ROW = 10
 
 
 class TemplatePageWidget(QWidget):
@@ -19,6 +23,8 @@ class TemplatePageWidget(QWidget):
 
     :ivar QLabel title_qlabel: Displayed title label.
     :ivar QLabel subtitle_qlabel: Displayed subtitle label.
+    :ivar QProgressBar loading_progress_bar: Database loading progress, only shown while a database loads.
+    :ivar DatabaseLoader __loader: Running database loader (None if no database is loading).
     """
     def __init__(self,parent):
         super().__init__(parent)
@@ -34,6 +40,12 @@ class TemplatePageWidget(QWidget):
         self.subtitle_qlabel.setObjectName('h2')
         layout.addWidget(self.subtitle_qlabel,1,0,1,2,Qt.AlignmentFlag.AlignHCenter |Qt.AlignmentFlag.AlignTop)
 
+        # Database loading progress
+        self.loading_progress_bar = QProgressBar(self)
+        self.loading_progress_bar.setHidden(True)
+        layout.addWidget(self.loading_progress_bar,LOADING_ROW,0,1,2,Qt.AlignmentFlag.AlignHCenter)
+        self.__loader = None
+
 
     def setTitle(self,title):
         """
@@ -53,9 +65,79 @@ class TemplatePageWidget(QWidget):
         self.subtitle_qlabel.setText(subtitle)
 
 
+    def loadDatabase(self,database_path,process_database=None):
+        """
+        Loads a database in a worker thread, the page stays responsive. Any previous loading is cancelled, the new one
+        starts once it is done (see DatabaseLoader).
+        onDatabaseLoaded is called on the main thread once the database is ready.
+
+        :param path database_path: Absolute path to database file.
+        :param function process_database: (database_path,database,checkpoint_callback) -> None, processes the games
+        in the worker thread (see DatabaseLoader).
+        """
+        self.cancelLoading()
+        loader = DatabaseLoader(database_path,process_database)
+        # Signals of a replaced loader are ignored
+        loader.signals.progress.connect(lambda processed_games,total_games: self.__onLoadingProgress(loader,processed_games,total_games))
+        loader.signals.loaded.connect(lambda database,players_lookup: self.__onLoadingFinished(loader,database,players_lookup))
+        loader.signals.failed.connect(lambda _: self.__onLoadingFinished(loader,None,None))
+        self.__loader = loader
+        self.loading_progress_bar.setRange(0,0)
+        self.loading_progress_bar.setHidden(False)
+        QThreadPool.globalInstance().start(loader)
+
+
+    def cancelLoading(self):
+        """
+        Cancels the running database loading, if any. Nothing is committed by a cancelled loading.
+        """
+        if self.__loader is not None:
+            self.__loader.cancel()
+            self.__loader = None
+        self.loading_progress_bar.setHidden(True)
+
+
+    def __onLoadingProgress(self,loader,processed_games,total_games):
+        """
+        Displays the database loading progress.
+
+        :param DatabaseLoader loader: Emitting loader.
+        :param int processed_games: Number of processed games.
+        :param int total_games: Number of games to process.
+        """
+        if loader is self.__loader:
+            self.loading_progress_bar.setRange(0,max(total_games,1))
+            self.loading_progress_bar.setValue(processed_games)
+
+
+    def __onLoadingFinished(self,loader,database,players_lookup):
+        """
+        Hides the progress bar and hands the loaded database to the page.
+
+        :param DatabaseLoader loader: Emitting loader.
+        :param dict database: Loaded database (None if the loading failed).
+        :param PlayerLookup players_lookup: Database players lookup (None if the loading failed).
+        """
+        if loader is self.__loader:
+            self.__loader = None
+            self.loading_progress_bar.setHidden(True)
+            if database is not None:
+                self.onDatabaseLoaded(database,players_lookup)
+
+
+    def onDatabaseLoaded(self,database,players_lookup):
+        """
+        Populates the page with a loaded database, called on the main thread (to be overridden by the pages).
+
+        :param dict database: Loaded database.
+        :param PlayerLookup players_lookup: Database players lookup, shared by the page search bars.
+        """
+
+
     def clean(self):
         """
-        Remove text from labels.
+        Remove text from labels, cancels the running database loading.
         """
+        self.cancelLoading()
         self.title_qlabel.clear()
         self.subtitle_qlabel.clear()
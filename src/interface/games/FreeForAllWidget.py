@@ -9,19 +9,27 @@ Usage: Free for all game prediction widget, allows to pick several players and p
 Author: BoxBoxJason
 Date: 09/10/2023
 '''
+import logging
 from PyQt6.QtWidgets import QWidget,QVBoxLayout,QLabel,QListWidget,QLineEdit,QHBoxLayout,QMenu,QPushButton,\
-QCompleter,QListWidgetItem,QInputDialog
+QListWidgetItem,QInputDialog
 from PyQt6.QtGui import QAction
-from PyQt6.QtCore import QStringListModel,Qt
-from resources.PathEnum import getJsonObject,dumpJsonObject
-from ranking.MMR import processGames
+from PyQt6.QtCore import Qt
+from ranking.MMR import processGames,DEFAULT_PARAMETERS
+from ranking.GamesIndex import getGamesIndex
+from ranking.Simulation import simulateRace
+from ranking.PlayerLookup import PlayerLookup
 from interface.TemplateWidget import TemplatePageWidget
+from interface.PlayerCompleter import PlayerCompleter
+
+# Number of simulated races of a prediction
+RACE_SIMULATIONS_COUNT = 100_000
 
 class FreeForAllWidget(TemplatePageWidget):
     """
     Free for all game outcome prediction widget.
 
     :ivar dict players_table: Database Players table.
+    :ivar PlayerLookup players_lookup: Database players lookup.
     :ivar RankingWidget __ranking_widget: Game players ranking widget (see RankingWidget documentation).
     :ivar QLabel __prediction_confidence_rate_qlabel: Label used to display prediction confidence rate.
     """
@@ -33,6 +41,7 @@ class FreeForAllWidget(TemplatePageWidget):
         """
         super().__init__(parent)
         self.players_table = {}
+        self.players_lookup = PlayerLookup(())
 
         # Ranking widget
         self.__ranking_widget = RankingWidget(self)
@@ -52,15 +61,24 @@ class FreeForAllWidget(TemplatePageWidget):
 
     def setDatabase(self,database_path):
         """
-        Sets the widget database, changes the pickable players in corresponding widgets.
+        Sets the widget database, its new games are processed in the background.
+        The pickable players are changed once the ratings are ready (see onDatabaseLoaded).
 
         :param path database_path: Absolute path to database file.
         """
-        database = getJsonObject(database_path)
+        self.loadDatabase(database_path,processDatabase)
+
+
+    def onDatabaseLoaded(self,database,players_lookup):
+        """
+        Changes the pickable players in corresponding widgets.
+
+        :param dict database: Processed database.
+        :param PlayerLookup players_lookup: Database players lookup.
+        """
         self.players_table = database['PLAYERS']
-        print(processGames(database_path,database['GAMES'],self.players_table,20,1,1,True))
-        self.__ranking_widget.updatePlayersList(self.players_table)
-        dumpJsonObject(database,database_path)
+        self.players_lookup = players_lookup
+        self.__ranking_widget.updatePlayersList(players_lookup)
 
 
     def __predictOutcome(self):
@@ -69,18 +87,38 @@ class FreeForAllWidget(TemplatePageWidget):
         """
         players_ids_list = self.__ranking_widget.getNames()
         if len(players_ids_list) > 1:
-            players_dicts = [self.players_table[player_id] for player_id in players_ids_list]
-            players_dicts.sort(key= lambda x : x['SKILL'] - 3 * x['SKILL_DEVIATION'])
+            # β of the configuration the ratings are processed with (see processDatabase)
+            positions_probabilities = simulateRace(self.players_table,players_ids_list,DEFAULT_PARAMETERS[1],RACE_SIMULATIONS_COUNT)
+            favourite_index = int(positions_probabilities[:,0].argmax())
+            self.__prediction_confidence_rate_qlabel.setText(
+                f"{players_ids_list[favourite_index]} wins with {positions_probabilities[favourite_index,0]*100:.1f}% probability")
 
 
     def clean(self):
         """
         Cleans widget
         """
+        super().clean()
+        self.players_table = {}
+        self.players_lookup = PlayerLookup(())
+        self.__ranking_widget.updatePlayersList(self.players_lookup)
         self.__ranking_widget.clean()
         self.__prediction_confidence_rate_qlabel.clear()
 
 
+def processDatabase(database_path,database,checkpoint_callback):
+    """
+    Processes and commits the new games of a database (run by the widget database loader).
+
+    :param path database_path: Absolute path to database file.
+    :param dict database: Loaded database.
+    :param function checkpoint_callback: Loading progress and cancellation callback.
+    """
+    success_rate = processGames(database_path,database['GAMES'],database['PLAYERS'],*DEFAULT_PARAMETERS,True,
+                                getGamesIndex(database_path,database['GAMES'],True).games_ids,checkpoint_callback=checkpoint_callback)
+    logging.info(f"MMR success rate on {database_path}: {success_rate}")
+
+
 WRONG_INPUT_STYLE = "QLineEdit {background-color: #edab9f; border: 2px ridge #bf1d00; padding: 5px 10px;}"
 CORRECT_INPUT_STYLE = "QLineEdit {background-color: #b3f5a4;border: 2px ridge #229608;padding: 5px 10px;}"
 
@@ -91,7 +129,7 @@ class RankingWidget(QWidget):
     :ivar set __players_set: Contains players names that were added to the game.
     :ivar QListWidget __list_widget: Displays game players names.
     :ivar QLineEdit __search_bar: Player search bar, used to add players to game.
-    :ivar QCompleter __completer: Search bar completer.
+    :ivar PlayerCompleter __completer: Search bar completer.
     """
 
     def __init__(self,parent,top_label='Players'):
@@ -131,17 +169,16 @@ class RankingWidget(QWidget):
         layout.addWidget(search_widget,0,Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignHCenter)
 
         # Search bar completer
-        self.__completer = QCompleter(self)
-        self.__completer.setCompletionMode(QCompleter.CompletionMode.InlineCompletion)
-        self.__search_bar.setCompleter(self.__completer)
+        self.__completer = PlayerCompleter(self.__search_bar)
 
 
     def __addPlayerIdToList(self):
         """
         Adds a player id to the list of game participants if name is valid, registered in the database and not already there.
+        The name is matched accent and case insensitively.
         """
-        player_id = self.__search_bar.text().strip()
-        if player_id in self.parent().players_table and not player_id in self.__players_set:
+        player_id = self.parent().players_lookup.resolve(self.__search_bar.text())
+        if player_id is not None and not player_id in self.__players_set:
             self.__list_widget.addItem(QListWidgetItem(player_id))
             self.__players_set.add(player_id)
 
@@ -152,7 +189,8 @@ class RankingWidget(QWidget):
 
         :param str text: Text in the search bar.
         """
-        if text.strip() in self.parent().players_table and not text.strip() in self.__players_set:
+        player_id = self.parent().players_lookup.resolve(text)
+        if player_id is not None and not player_id in self.__players_set:
             self.__search_bar.setStyleSheet(CORRECT_INPUT_STYLE)
         else:
             self.__search_bar.setStyleSheet(WRONG_INPUT_STYLE)
@@ -198,13 +236,13 @@ class RankingWidget(QWidget):
             item.setText(text)
 
 
-    def updatePlayersList(self,players_ids):
+    def updatePlayersList(self,players_lookup):
         """
-        Updates players list in the completer.
+        Updates players suggested by the completer.
 
-        :param list[str] players_ids: List of players ids.
+        :param PlayerLookup players_lookup: Database players lookup.
         """
-        self.__completer.setModel(QStringListModel(players_ids, self.__completer))
+        self.__completer.setPlayersLookup(players_lookup)
 
 
     def getNames(self):
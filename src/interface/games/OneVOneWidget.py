@@ -9,17 +9,20 @@ Usage: 1v1 game prediction widget, allows to pick two players and predict the ga
 Author: BoxBoxJason
 Date: 09/10/2023
 '''
-from PyQt6.QtWidgets import QWidget,QLabel,QPushButton,QVBoxLayout,QLineEdit,QCompleter
-from PyQt6.QtCore import Qt,QStringListModel
+from PyQt6.QtWidgets import QWidget,QLabel,QPushButton,QVBoxLayout,QLineEdit
+from PyQt6.QtCore import Qt
 from interface.TemplateWidget import TemplatePageWidget
-from resources.PathEnum import getJsonObject
-from ranking.ELO import determineWinProbability,processGames
+from interface.PlayerCompleter import PlayerCompleter
+from ranking.ELO import determineWinProbability,processGames,DEFAULT_PARAMETERS
+from ranking.GamesIndex import getGamesIndex
+from ranking.PlayerLookup import PlayerLookup
 
 class OneVOneWidget(TemplatePageWidget):
     """
     1v1 game outcome prediction widget.
 
     :ivar dict players_table: Database Players table.
+    :ivar PlayerLookup players_lookup: Database players lookup.
     :ivar PlayerWidget __player1_widget: Player 1 information collection display widget.
     :ivar PlayerWidget __player2_widget: Player 2 information collection display widget.
     :ivar QLabel __prediction_confidence_rate_qlabel: Label used to display prediction confidence rate.
@@ -32,7 +35,7 @@ class OneVOneWidget(TemplatePageWidget):
         """
         super().__init__(parent)
         self.players_table = {}
-        self.layout()
+        self.players_lookup = PlayerLookup(())
         self.__player1_widget = PlayerWidget(self,1)
         self.__player2_widget = PlayerWidget(self,2)
         self.layout().addWidget(self.__player1_widget,2,0,1,1,Qt.AlignmentFlag.AlignCenter)
@@ -47,25 +50,34 @@ class OneVOneWidget(TemplatePageWidget):
 
     def setDatabase(self,database_path):
         """
-        Sets the widget database, changes the pickable players in corresponding widgets.
+        Sets the widget database, its new games are processed in the background.
+        The pickable players are changed once the ratings are ready (see onDatabaseLoaded).
 
         :param path database_path: Absolute path to database file.
         """
-        database = getJsonObject(database_path)
-        games_table = database['GAMES']
+        self.loadDatabase(database_path,processDatabase)
+
+
+    def onDatabaseLoaded(self,database,players_lookup):
+        """
+        Changes the pickable players in corresponding widgets.
+
+        :param dict database: Processed database.
+        :param PlayerLookup players_lookup: Database players lookup.
+        """
         self.players_table = database['PLAYERS']
-        processGames(database_path,games_table,self.players_table,28.163265306122447,3.33265306122449,1,True)
-        self.__player1_widget.updatePlayersList(self.players_table)
-        self.__player2_widget.updatePlayersList(self.players_table)
+        self.players_lookup = players_lookup
+        self.__player1_widget.updatePlayersList(players_lookup)
+        self.__player2_widget.updatePlayersList(players_lookup)
 
 
     def __predictGameOutput(self):
         """
         Predicts the outcome of the game and displays prediction confidence rate
         """
-        player1_id = self.__player1_widget.search_bar.text()
-        player2_id = self.__player2_widget.search_bar.text()
-        if player1_id in self.players_table and player2_id in self.players_table:
+        player1_id = self.players_lookup.resolve(self.__player1_widget.search_bar.text())
+        player2_id = self.players_lookup.resolve(self.__player2_widget.search_bar.text())
+        if player1_id is not None and player2_id is not None:
             player1_winrate = determineWinProbability(self.players_table[player1_id]['ELO'],self.players_table[player2_id]['ELO'])
             player2_winrate = 1 - player1_winrate
 
@@ -78,10 +90,27 @@ class OneVOneWidget(TemplatePageWidget):
         Cleans the widget
         """
         super().clean()
-        self.players_table.clear()
+        self.players_table = {}
+        self.players_lookup = PlayerLookup(())
+        self.__player1_widget.updatePlayersList(self.players_lookup)
+        self.__player2_widget.updatePlayersList(self.players_lookup)
         self.__player1_widget.clean()
         self.__player2_widget.clean()
 
+
+def processDatabase(database_path,database,checkpoint_callback):
+    """
+    Processes and commits the new games of a database (run by the widget database loader).
+
+    :param path database_path: Absolute path to database file.
+    :param dict database: Loaded database.
+    :param function checkpoint_callback: Loading progress and cancellation callback.
+    """
+    games_table = database['GAMES']
+    processGames(database_path,games_table,database['PLAYERS'],*DEFAULT_PARAMETERS,True,
+                 getGamesIndex(database_path,games_table,True).games_ids,checkpoint_callback=checkpoint_callback)
+
+
 WRONG_INPUT_STYLE = "QLineEdit {background-color: #edab9f; border: 2px ridge #bf1d00; padding: 5px 10px;}"
 CORRECT_INPUT_STYLE = "QLineEdit {background-color: #b3f5a4;border: 2px ridge #229608;padding: 5px 10px;}"
 
@@ -91,7 +120,7 @@ class PlayerWidget(QWidget):
     Contains a victory rate display
 
     :ivar QLineEdit search_bar: Player search bar, used to add players to game.
-    :ivar QCompleter completer: Search bar completer. Contains players ids in database.
+    :ivar PlayerCompleter completer: Search bar completer, suggests players ids in database.
     :ivar QLabel player_winrate_qlabel: Player win probability display.
     """
     def __init__(self,parent,player_index):
@@ -116,9 +145,7 @@ class PlayerWidget(QWidget):
         layout.addWidget(self.search_bar,0,Qt.AlignmentFlag.AlignHCenter)
 
         # Search bar completer
-        self.completer = QCompleter(self)
-        self.completer.setCompletionMode(QCompleter.CompletionMode.InlineCompletion)
-        self.search_bar.setCompleter(self.completer)
+        self.completer = PlayerCompleter(self.search_bar)
 
         # Player winrate
         self.player_winrate_qlabel = QLabel(self)
@@ -132,13 +159,8 @@ class PlayerWidget(QWidget):
 
         :param str text: Text in the search bar.
         """
-        first_suitable_element = None
-        for player_id in self.parent().players_table:
-            if text in player_id:
-                first_suitable_element = player_id
-                break
-        
-        if first_suitable_element is not None:
+        players_lookup = self.parent().players_lookup
+        if players_lookup.resolve(text) is not None or players_lookup.searchPrefix(text,1):
             self.search_bar.setStyleSheet(CORRECT_INPUT_STYLE)
         else:
             self.search_bar.setStyleSheet(WRONG_INPUT_STYLE)
@@ -152,10 +174,10 @@ class PlayerWidget(QWidget):
             self.layout().itemAt(i).widget().clear()
 
 
-    def updatePlayersList(self, players_ids):
+    def updatePlayersList(self,players_lookup):
         """
-        Updates players list in the completer.
+        Updates players suggested by the completer.
 
-        :param list[str] players_ids: List of players ids.
+        :param PlayerLookup players_lookup: Database players lookup.
         """
-        self.completer.setModel(QStringListModel(players_ids, self.completer))
+        self.completer.setPlayersLookup(players_lookup)
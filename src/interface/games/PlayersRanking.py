@@ -9,26 +9,39 @@ Usage: Displays global ranking of players
 Author: BoxBoxJason
 Date: 09/10/2023
 '''
-import logging
-from PyQt6.QtWidgets import QWidget,QScrollArea, QVBoxLayout, QHBoxLayout,\
-    QLabel, QLineEdit
-from PyQt6.QtCore import Qt
+from PyQt6.QtWidgets import QLabel,QLineEdit,QTableView,QHeaderView,QAbstractItemView
+from PyQt6.QtGui import QBrush,QColor,QRadialGradient,QGradient
+from PyQt6.QtCore import Qt,QAbstractTableModel,QAbstractProxyModel,QModelIndex
 from interface.TemplateWidget import TemplatePageWidget
+from ranking.PlayerLookup import PlayerLookup
 from resources.utils import getRankFromELO
-from resources.PathEnum import getJsonObject
+
+# Ranking columns headers and widths
+COLUMNS = (('RANK',50),('ID',200),('DIVISION',100),('ELO',55))
+# Ranking rows height
+ROW_HEIGHT = 22
+# Divisions backgrounds radial gradient stops
+DIVISIONS_GRADIENTS = {
+    'BRONZE':((0,'#efa678'),(0.4,'#8c4d37'),(0.5,'#603620'),(0.6,'#b77b56'),(1,'#603620')),
+    'SILVER':((0,'#ededed'),(0.4,'#b0b0b0'),(0.5,'#727272'),(0.6,'#999999'),(1,'#727272')),
+    'GOLD':((0,'#f5ec70'),(0.4,'#a88e2a'),(0.5,'#92741c'),(0.6,'#a88e2a'),(1,'#92741c')),
+    'PLATINUM':((0,'#125c84'),(0.4,'#E5E4E2'),(0.5,'#58949c'),(0.6,'#125384'),(1,'#157bb3')),
+    'DIAMOND':((0,'#9bd4e1'),(0.4,'#aae3f0'),(0.5,'#b9f2ff'),(0.6,'#aae3f0'),(1,'#9bd4e1')),
+    'MASTER':((0,'#fa71cd'),(0.4,'#b256e8'),(0.5,'#c471f5'),(0.6,'#b256e8'),(1,'#c471f5')),
+    'GRANDMASTER':((0,'#b54e4e'),(0.4,'#db7f7f'),(0.5,'#d3d3d3'),(0.6,'#cf2525'),(1,'#8f8989'))
+}
+# Divisions backgrounds brushes, built on first use
+_DIVISIONS_BRUSHES = {}
 
 class PlayersRankingWidget(TemplatePageWidget):
     """
-    Displays the database players ranking.
+    Displays the database players ranking. The view only paints its visible rows, filtering goes through a proxy model.
 
-    :ivar dict __players_table: Database Players table.
-    :ivar dict __players_badges: Dictionary of ranking badge widget for each player {player_id:RankingBadge}.
-    :ivar QVBoxLayout __scroll_layout: Layout used for scrollable area.
+    :ivar RankingTableModel __ranking_model: Players ranking model.
+    :ivar RankingFilterModel __filter_model: Filtered players ranking model, displayed by the view.
     """
     def __init__(self,parent):
         super().__init__(parent)
-        self.__players_table = {}
-        self.__players_badges = {}
 
         # Search bar label
         filter_qlabel = QLabel('Filter players',self)
@@ -40,121 +53,264 @@ class PlayersRankingWidget(TemplatePageWidget):
         search_bar.textChanged.connect(self.__filterPlayers)
         self.layout().addWidget(search_bar,3,0,1,2,Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignTop)
 
-        # Ranking scroll area
-        scroll_area = QScrollArea(self)
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setFixedWidth(445)
-        scroll_area.setMinimumHeight(400)
-        scroll_area.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOn)
-        scroll_area.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOn)
-        self.layout().addWidget(scroll_area,4,0,1,2,Qt.AlignmentFlag.AlignHCenter)
-
-        # Scroll widget and layout
-        scroll_widget = QWidget(self)
-        self.__scroll_layout = QVBoxLayout(scroll_widget)
-        self.__scroll_layout.setContentsMargins(0,0,0,0)
-        self.__scroll_layout.setSpacing(0)
-
-        scroll_area.setWidget(scroll_widget)
-        self.__scroll_layout.addWidget(RankingBadge(self,{'ELO':'ELO'},'RANK'),
-                                      1,Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignHCenter)
+        # Ranking models
+        self.__ranking_model = RankingTableModel(self)
+        self.__filter_model = RankingFilterModel(self)
+        self.__filter_model.setSourceModel(self.__ranking_model)
 
+        # Ranking view
+        ranking_view = QTableView(self)
+        ranking_view.setModel(self.__filter_model)
+        ranking_view.setFixedWidth(445)
+        ranking_view.setMinimumHeight(400)
+        ranking_view.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOn)
+        ranking_view.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOn)
+        ranking_view.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        ranking_view.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        ranking_view.setShowGrid(False)
+        # Fixed rows height, the view never measures its rows
+        ranking_view.verticalHeader().setVisible(False)
+        ranking_view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        ranking_view.verticalHeader().setDefaultSectionSize(ROW_HEIGHT)
+        for column,(_,width) in enumerate(COLUMNS):
+            ranking_view.setColumnWidth(column,width)
+        self.layout().addWidget(ranking_view,4,0,1,2,Qt.AlignmentFlag.AlignHCenter)
 
 
     def __filterPlayers(self,filter_txt):
         """
-        Filters displayed players ranking badges.
+        Filters displayed players ranking rows.
 
         :param str filter_txt: Text in the search bar.
         """
-        for player,player_badge in self.__players_badges.items():
-            if filter_txt in player:
-                player_badge.setHidden(False)
-            else:
-                player_badge.setHidden(True)
+        self.__filter_model.setFilterText(filter_txt)
 
 
     def setDatabase(self,database_path):
         """
-        Sets the widget database, changes the pickable players in corresponding widgets.
+        Sets the widget database, it is loaded in the background (see onDatabaseLoaded).
 
         :param path database_path: Absolute path to database file.
         """
-        database = getJsonObject(database_path)
-        self.__players_table = database['PLAYERS']
-        test_row = self.__players_table.popitem()
-        if 'ELO' in test_row[1]:
-            sorted_players = sorted(self.__players_table.values(),key=lambda x: x['ELO'],reverse=True)
-        else:
-            sorted_players = sorted(self.__players_table.values(),key=lambda x: x['SKILL'] - 3 * x['SKILL_DEVIATION'],reverse=True)
+        self.loadDatabase(database_path)
+
 
-        logging.debug('Creating ranking badges')
-        for index,player_dict in enumerate(sorted_players):
-            new_badge = RankingBadge(self,player_dict,index)
-            self.__players_badges[player_dict['ID']] = new_badge
-            self.__scroll_layout.addWidget(new_badge,1,
-                                          Qt.AlignmentFlag.AlignTop | Qt.AlignmentFlag.AlignHCenter)
-        logging.debug('Ranking badges done')
+    def onDatabaseLoaded(self,database,players_lookup):
+        """
+        Displays the players ranking of a loaded database.
+
+        :param dict database: Loaded database.
+        :param PlayerLookup players_lookup: Database players lookup.
+        """
+        self.__ranking_model.setPlayers(database['PLAYERS'],players_lookup)
 
 
     def clean(self):
         """
         Cleans the widget from existing data
         """
-        self.__players_table.clear()
-        while self.__scroll_layout.count() > 1:
-            self.__scroll_layout.itemAt(1).widget().setParent(None)
+        super().clean()
+        self.__ranking_model.setPlayers({},PlayerLookup(()))
 
 
-class RankingBadge(QWidget):
+class RankingTableModel(QAbstractTableModel):
     """
-    Ranking widget ranking badge. Used for user ranking display.
+    Players ranking table model, players are sorted by decreasing rating (ELO, or MMR skill - 3 * skill deviation).
+    Displayed values are formatted once, when the players are set.
+
+    :ivar list[tuple[str,str,str,str]] rows: (rank,player_id,division,rating) displayed rows.
+    :ivar dict rows_by_id: Rows indexes by player id.
+    :ivar PlayerLookup players_lookup: Ranked players lookup (filtering search index).
     """
-    def __init__(self,parent,player_dict,index_player):
+    def __init__(self,parent=None):
         """
-        Constructor for RankingBadge.
-        
-        :param QWidget parent: Parent widget.
-        :param dict player_dict: Database Players table row.
-        :param int index_player: Global ranking of the player. (first is 0)
+        Constructor for RankingTableModel.
+
+        :param QObject parent: Parent object.
         """
         super().__init__(parent)
-        self.setAttribute(Qt.WidgetAttribute.WA_StyledBackground,True)
-        layout = QHBoxLayout()
-
-        if isinstance(index_player,int):
-            index_player = str(index_player+1)
-
-        # Rank label
-        rank_label = QLabel(index_player,self)
-        rank_label.setFixedSize(50,22)
-        layout.addWidget(rank_label,1,Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignTop)
-
-        # Player label
-        player_label = QLabel(player_dict.get('ID','ID'),self)
-        player_label.setFixedSize(200,22)
-        layout.addWidget(player_label,1,Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignTop)
-
-        # Tier label
-        elo = player_dict.get('ELO')
-        if elo is None:
-            elo = player_dict.get('SKILL',0) - 3 * player_dict.get('SKILL_DEVIATION',0)
-        division = getRankFromELO(elo)
-        self.setObjectName(division)
-        tier_label = QLabel(division,self)
-        tier_label.setFixedSize(100,22)
-        layout.addWidget(tier_label,1,Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignTop)
-
-        # ELO label
-        elotxt = elo
-        if not isinstance(elo,str):
-            elotxt = "{:.2f}".format(elo)
-        elo_label = QLabel(elotxt,self)
-        elo_label.setFixedSize(55,22)
-        layout.addWidget(elo_label,1,Qt.AlignmentFlag.AlignHCenter | Qt.AlignmentFlag.AlignTop)
-
-        for label in rank_label,player_label,tier_label,elo_label:
-            label.setAlignment(Qt.AlignmentFlag.AlignHCenter)
-            label.setObjectName('p')
-
-        self.setLayout(layout)
+        self.rows = []
+        self.rows_by_id = {}
+        self.players_lookup = PlayerLookup(())
+
+
+    def setPlayers(self,players_table,players_lookup):
+        """
+        Replaces the ranked players.
+
+        :param dict players_table: Database Players table.
+        :param PlayerLookup players_lookup: Players table lookup.
+        """
+        self.beginResetModel()
+        ratings = [(getPlayerRating(player_dict),player_id) for player_id,player_dict in players_table.items()]
+        ratings.sort(key=lambda x: x[0],reverse=True)
+        self.rows = [(str(index + 1),player_id,getRankFromELO(rating),f"{rating:.2f}")
+                     for index,(rating,player_id) in enumerate(ratings)]
+        self.rows_by_id = {player_id:index for index,(_,player_id) in enumerate(ratings)}
+        self.players_lookup = players_lookup
+        self.endResetModel()
+
+
+    def rowCount(self,parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+
+    def columnCount(self,parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+
+    def data(self,index,role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row = self.rows[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return row[index.column()]
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return Qt.AlignmentFlag.AlignCenter
+        if role == Qt.ItemDataRole.BackgroundRole:
+            return getDivisionBrush(row[2])
+        return None
+
+
+    def headerData(self,section,orientation,role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return COLUMNS[section][0]
+        return None
+
+
+class RankingFilterModel(QAbstractProxyModel):
+    """
+    Filtering proxy of a RankingTableModel: only the rows whose player id contains the filter text (accent and case
+    insensitive) are mapped. Rows are selected once per filter change from the source players lookup, the view then
+    queries the visible rows only.
+
+    :ivar str filter_text: Filter text.
+    """
+    def __init__(self,parent=None):
+        """
+        Constructor for RankingFilterModel.
+
+        :param QObject parent: Parent object.
+        """
+        super().__init__(parent)
+        self.filter_text = ''
+        self.__source_rows = []
+        self.__proxy_rows = {}
+
+
+    def setSourceModel(self,source_model):
+        """
+        Sets the filtered model, the filter is applied again when the source model is reset.
+
+        :param RankingTableModel source_model: Players ranking model.
+        """
+        self.beginResetModel()
+        super().setSourceModel(source_model)
+        source_model.modelAboutToBeReset.connect(self.beginResetModel)
+        source_model.modelReset.connect(self.__onSourceReset)
+        self.__filterRows()
+        self.endResetModel()
+
+
+    def setFilterText(self,filter_text):
+        """
+        Changes the filter text.
+
+        :param str filter_text: Text the displayed players ids must contain.
+        """
+        if filter_text == self.filter_text:
+            return
+        self.beginResetModel()
+        self.filter_text = filter_text
+        self.__filterRows()
+        self.endResetModel()
+
+
+    def __onSourceReset(self):
+        """
+        Applies the filter to the new source rows.
+        """
+        self.__filterRows()
+        self.endResetModel()
+
+
+    def __filterRows(self):
+        """
+        Selects the source rows matching the filter text, in ranking order.
+        """
+        source_model = self.sourceModel()
+        if self.filter_text.strip():
+            self.__source_rows = sorted(source_model.rows_by_id[player_id]
+                                        for player_id in source_model.players_lookup.searchSubstring(self.filter_text))
+        else:
+            self.__source_rows = list(range(len(source_model.rows)))
+        self.__proxy_rows = {source_row:proxy_row for proxy_row,source_row in enumerate(self.__source_rows)}
+
+
+    def mapToSource(self,proxy_index):
+        if not proxy_index.isValid():
+            return QModelIndex()
+        return self.sourceModel().index(self.__source_rows[proxy_index.row()],proxy_index.column())
+
+
+    def mapFromSource(self,source_index):
+        proxy_row = self.__proxy_rows.get(source_index.row()) if source_index.isValid() else None
+        if proxy_row is None:
+            return QModelIndex()
+        return self.index(proxy_row,source_index.column())
+
+
+    def index(self,row,column,parent=QModelIndex()):
+        if parent.isValid() or not 0 <= row < len(self.__source_rows) or not 0 <= column < len(COLUMNS):
+            return QModelIndex()
+        return self.createIndex(row,column)
+
+
+    def parent(self,index):
+        return QModelIndex()
+
+
+    def rowCount(self,parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.__source_rows)
+
+
+    def columnCount(self,parent=QModelIndex()):
+        return 0 if parent.isValid() else len(COLUMNS)
+
+
+    def headerData(self,section,orientation,role=Qt.ItemDataRole.DisplayRole):
+        # Headers do not depend on the rows, they are shown even if no player matches
+        return self.sourceModel().headerData(section,orientation,role)
+
+
+def getPlayerRating(player_dict):
+    """
+    Returns the rating players are ranked by.
+
+    :param dict player_dict: Database Players table row.
+
+    :return: float - Player ELO, or MMR skill - 3 * skill deviation.
+    """
+    elo = player_dict.get('ELO')
+    if elo is None:
+        elo = player_dict.get('SKILL',0) - 3 * player_dict.get('SKILL_DEVIATION',0)
+    return elo
+
+
+def getDivisionBrush(division):
+    """
+    Returns the background brush of a division (radial gradient relative to the painted cell).
+
+    :param str division: Division name.
+
+    :return: QBrush - Division background.
+    """
+    brush = _DIVISIONS_BRUSHES.get(division)
+    if brush is None:
+        gradient = QRadialGradient(0.8,0.1,1,0.5,0.5)
+        gradient.setCoordinateMode(QGradient.CoordinateMode.ObjectBoundingMode)
+        for stop,color in DIVISIONS_GRADIENTS.get(division,((0,'#646464'),)):
+            gradient.setColorAt(stop,QColor(color))
+        brush = QBrush(gradient)
+        _DIVISIONS_BRUSHES[division] = brush
+    return brush
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+'''
+Project : GamBible
+Package: Ranking
+Module:  DatasetCache
+Version: 2.0
+Usage: Parse-once databases cache for hyperparameter optimization. Each trial gets a fresh rating state copied
+from a pristine template instead of re-parsing the database file.
+
+Author: BoxBoxJason
+Date: 17/10/2026
+'''
+import os
+from resources.ColumnarDB import getDatabaseObject,getColumnarObject,recoverColumnarObject,COLUMNAR_EXTENSION
+from ranking.GamesIndex import getGamesIndex
+from ranking.SymbolTable import internDatabase
+
+# Loaded datasets by database path, inherited by forked worker processes
+_DATASETS = {}
+
+class Dataset:
+    """
+    Database parsed once. The pristine tables are never modified, trials work on copies.
+    Players and games ids are interned: tables are keyed by integers, the games symbol table maps the string ids of the
+    games index to them.
+    The interned tables only live in the dataset, results written to a database use string ids.
+    A columnar database (.gbdb) is memory-mapped instead of parsed: its ids are already interned and its tables are only
+    built if they are requested (the ELO engine is compiled from the arrays).
+
+    :ivar path db_path: Absolute path to the database.
+    :ivar float mtime: Database modification time when it was parsed.
+    :ivar list[int] games_ordered_ids: Unprocessed games ids ordered by date, shared by all trials.
+    """
+    def __init__(self,db_path):
+        """
+        Constructor for Dataset, parses the database (memory-maps it if it is a columnar database).
+
+        :param path db_path: Absolute path to the database.
+        """
+        self.db_path = db_path
+        if db_path.endswith(COLUMNAR_EXTENSION):
+            recoverColumnarObject(db_path)
+        self.mtime = _getModificationTime(db_path)
+        self.__columnar_database = None
+        self.__tables = None
+        self.__elo_engine = None
+        if db_path.endswith(COLUMNAR_EXTENSION) and os.path.exists(os.path.join(db_path,'layout.json')):
+            self.__columnar_database = getColumnarObject(db_path)
+            games_order = self.__columnar_database.getGamesOrder()
+            self.games_ordered_ids = games_order[~self.__columnar_database['GAMES_PROCESSED'][games_order]].tolist()
+        else:
+            database = getDatabaseObject(db_path)
+            games_ordered_ids = getGamesIndex(db_path,database.get('GAMES',{})).getOrderedIds(database.get('GAMES',{}))
+            self.__internTables(database)
+            self.games_ordered_ids = [self.games_symbols.getIndex(game_id) for game_id in games_ordered_ids]
+
+
+    @property
+    def games_table(self):
+        """
+        :return: dict - Pristine interned Games table (read only).
+        """
+        return self.__getTables()[0]
+
+
+    @property
+    def players_table(self):
+        """
+        :return: dict - Pristine interned Players table (read only).
+        """
+        return self.__getTables()[1]
+
+
+    @property
+    def games_symbols(self):
+        """
+        :return: SymbolTable - Games ids symbol table.
+        """
+        return self.__getTables()[2]
+
+
+    def __getTables(self):
+        """
+        Returns the interned tables, a columnar database is converted on first call.
+
+        :return: tuple[dict,dict,SymbolTable] - Games and Players tables, games symbol table.
+        """
+        if self.__tables is None:
+            # Table order gives the interned ids, they match the columnar indexes
+            self.__internTables(self.__columnar_database.toJsonObject())
+        return self.__tables
+
+
+    def __internTables(self,database):
+        """
+        Interns a JSON layout database and keeps its tables.
+
+        :param dict database: {'GAMES':games_table,'PLAYERS':players_table} database with string ids.
+        """
+        database,_,games_symbols = internDatabase(database)
+        self.__tables = (database['GAMES'],database['PLAYERS'],games_symbols)
+
+
+    def getFreshTables(self):
+        """
+        Returns copies of the tables that can be processed without altering the dataset.
+        Only mutable values are copied: unprocessed games dicts (PROCESSED flag) and players rows.
+
+        :return: tuple[dict,dict] - Fresh Games and Players tables.
+        """
+        games_table = dict(self.games_table)
+        for game_id in self.games_ordered_ids:
+            games_table[game_id] = dict(games_table[game_id])
+
+        return games_table,{player_id:_copyRow(player_dict) for player_id,player_dict in self.players_table.items()}
+
+
+    def getELOEngine(self):
+        """
+        Returns the ELO replay engine compiled from the dataset (compiled on first call).
+
+        :return: ELOEngine - Compiled ELO games history.
+        """
+        if self.__elo_engine is None:
+            # Imported on demand, avoids circular import (ranking.ELO uses this module)
+            from ranking.ELOEngine import ELOEngine
+            if self.__columnar_database is not None:
+                self.__elo_engine = ELOEngine.fromColumnarDatabase(self.__columnar_database)
+            else:
+                self.__elo_engine = ELOEngine(self.games_table,self.players_table,self.games_ordered_ids)
+        return self.__elo_engine
+
+
+def getDataset(db_path):
+    """
+    Returns the cached dataset of a database, the database is parsed again only if the file changed.
+
+    :param path db_path: Absolute path to the database.
+
+    :return: Dataset - Parsed database.
+    """
+    dataset = _DATASETS.get(db_path)
+    if dataset is None or dataset.mtime != _getModificationTime(db_path):
+        dataset = Dataset(db_path)
+        _DATASETS[db_path] = dataset
+    return dataset
+
+
+def clearDatasets():
+    """
+    Empties the datasets cache.
+    """
+    _DATASETS.clear()
+
+
+def _getModificationTime(db_path):
+    """
+    :param path db_path: Absolute path to the database.
+
+    :return: float - Database modification time (None if it does not exist).
+    """
+    if os.path.isdir(db_path):
+        # Newest column, whatever the folder modification time
+        return max((entry.stat().st_mtime for entry in os.scandir(db_path) if entry.is_file()),default=None)
+    if os.path.exists(db_path):
+        return os.path.getmtime(db_path)
+    return None
+
+
+def _copyRow(value):
+    """
+    Copies a database row: containers are copied recursively, scalars are shared (immutable).
+    Much faster than copy.deepcopy for JSON values.
+
+    :param JsonObject value: Row to copy.
+
+    :return: JsonObject - Independent copy of the row.
+    """
+    if isinstance(value,dict):
+        return {key:_copyRow(item) for key,item in value.items()}
+    if isinstance(value,list):
+        # JSON lists of the database are homogeneous
+        if value and isinstance(value[0],(dict,list)):
+            return [_copyRow(item) for item in value]
+        return value[:]
+    return value
@@ -10,13 +10,30 @@ Author: BoxBoxJason
 Date: 01/10/2023
 '''
 import logging
-from optuna import load_study,create_study
-from resources.PathEnum import getDBPath,getJsonObject,dumpJsonObject
-from ranking.general import orderGamesTable
+from math import log
+from functools import partial
+import numpy as np
+from resources.PathEnum import getDBPath
+from resources.ColumnarDB import dumpDatabaseObject
+from resources import instrumentation
+from resources.instrumentation import instrumentedCall
+from ranking.general import orderGamesTable,getCheckpointBounds,CHECKPOINTS
+from ranking.DatasetCache import getDataset
+from ranking.PlayerState import ELOPlayer,getPlayersStates,writePlayersStates
 
 START_ELO = 1500
-
-def processGames(output_file_path,games_table,players_table,base_points,beginner_multiplier,low_elo_multiplier,commit=False,games_ordered_ids=None):
+# Number of games under which a player is considered a beginner
+BEGINNER_GAMES_COUNT = 30
+# Number of games from which a player is considered a master
+MASTER_GAMES_COUNT = 2400
+# Logistic slope of the win probability: 10 ** (-elo_diff / 400) == exp(-WIN_PROBABILITY_SLOPE * elo_diff)
+WIN_PROBABILITY_SLOPE = log(10) / 400
+# Default configuration (base_points,beginner_multiplier,low_elo_multiplier), used by the games widgets and the command line
+DEFAULT_PARAMETERS = (28.163265306122447,3.33265306122449,1)
+
+@instrumentedCall('ELO.processGames')
+def processGames(output_file_path,games_table,players_table,base_points,beginner_multiplier,low_elo_multiplier,commit=False,games_ordered_ids=None,
+                 checkpoint_callback=None,checkpoints=CHECKPOINTS):
     """
     Process all unprocessed games in the database.
 
@@ -27,23 +44,34 @@ def processGames(output_file_path,games_table,players_table,base_points,beginner
     :param float beginner_multiplier: ELO algorithm beginner multiplier.
     :param float low_elo_multiplier: ELO algorithm low_elo_multiplier.
     :param bool commit: States if changes made should be committed to the database or not (default True).
+    :param list[str] games_ordered_ids: Games ids ordered by date (computed if not provided).
+    :param function checkpoint_callback: (processed_games,success_rate) -> None, called at chronological checkpoints.
+    :param int checkpoints: Number of checkpoints at which checkpoint_callback is called.
 
     :return: float - Correct game output predictions percentage.
     """
 
-    total_number_games = 0
     correct_predictions = 0
     if games_ordered_ids is None:
         games_ordered_ids = orderGamesTable(games_table)
 
-    for game_id in games_ordered_ids:
-        game_dict = games_table[game_id]
-        if not game_dict['PROCESSED']:
-            total_number_games += 1
-            correct_predictions += processGame(game_dict,players_table,base_points,beginner_multiplier,low_elo_multiplier)
+    unprocessed_games_ids = [game_id for game_id in games_ordered_ids if not games_table[game_id]['PROCESSED']]
+    total_number_games = len(unprocessed_games_ids)
+    players_states = getPlayersStates(players_table,ELOPlayer)
+    try:
+        for start,end in getCheckpointBounds(total_number_games,checkpoints if checkpoint_callback else 1):
+            for game_id in unprocessed_games_ids[start:end]:
+                correct_predictions += processGame(games_table[game_id],players_states,base_points,beginner_multiplier,low_elo_multiplier)
+            if checkpoint_callback is not None:
+                checkpoint_callback(end,correct_predictions / end)
+    finally:
+        # Also written when a checkpoint callback interrupts the replay
+        writePlayersStates(players_table,players_states)
+    if instrumentation.ENABLED:
+        instrumentation.incrementCounter('GAMES_PROCESSED',total_number_games)
 
     if commit:
-        dumpJsonObject({'GAMES':games_table,'PLAYERS':players_table},output_file_path)
+        dumpDatabaseObject({'GAMES':games_table,'PLAYERS':players_table},output_file_path)
 
     success_rate = 0
     if total_number_games != 0:
@@ -56,18 +84,18 @@ def processGame(game_dict,players_table,base_points,beginner_multiplier,low_elo_
     Processes a game, updates the player ELO accordingly.
 
     :param dict game_dict: Game table dict.
-    :param dict players_table: Database players table.
+    :param dict players_table: Player states (ELOPlayer) by player id.
     :param float base_points: ELO algorithm base points.
     :param float beginner_multiplier: ELO algorithm beginner multiplier.
     :param float low_elo_multiplier: ELO algorithm low elo multiplier.
 
     :return: bool - ELO algorithm prediction was correct.
     """
-    winner_dict = players_table[game_dict['WINNER_ID']]
-    loser_dict = players_table[game_dict['LOSER_ID']]
+    winner = players_table[game_dict['WINNER_ID']]
+    loser = players_table[game_dict['LOSER_ID']]
     ### Variables ### (Could optimize but would lose clarity)
     # Predicted probability of player 1 winning
-    probWin1 = determineWinProbability(winner_dict['ELO'], loser_dict['ELO'])
+    probWin1 = determineWinProbability(winner.elo, loser.elo)
     # Predicted probability of player 2 winning
     probWin2 = 1 - probWin1
     # Difference between expected and reality for player 1
@@ -76,21 +104,21 @@ def processGame(game_dict,players_table,base_points,beginner_multiplier,low_elo_
     gameDiff2 = - probWin2
 
     ### New evaluation ###
-    winner_dict['ELO'] += getPlayerGrowthCoeff(len(winner_dict['GAMES']),base_points,beginner_multiplier,low_elo_multiplier) * gameDiff1
-    winner_dict['GAMES'].append(game_dict['ID'])
-    loser_dict['ELO'] += getPlayerGrowthCoeff(len(loser_dict['GAMES']),base_points,beginner_multiplier,low_elo_multiplier) * gameDiff2
-    loser_dict['GAMES'].append(game_dict['ID'])
+    winner.elo += getPlayerGrowthCoeff(len(winner.games),base_points,beginner_multiplier,low_elo_multiplier) * gameDiff1
+    winner.games.append(game_dict['ID'])
+    loser.elo += getPlayerGrowthCoeff(len(loser.games),base_points,beginner_multiplier,low_elo_multiplier) * gameDiff2
+    loser.games.append(game_dict['ID'])
 
     terrain = game_dict.get('TERRAIN')
 
     if terrain:
-        winner_terrains = winner_dict['FAV_TERRAIN']
+        winner_terrains = winner.fav_terrain
         if terrain in winner_terrains:
             winner_terrains[terrain]['WIN'] += 1
         else:
             winner_terrains[terrain] = {'WIN':1,'LOSS':0,'DRAW':0}
 
-        loser_terrains = loser_dict['FAV_TERRAIN']
+        loser_terrains = loser.fav_terrain
         if terrain in loser_terrains:
             loser_terrains[terrain]['LOSS'] += 1
         else:
@@ -114,6 +142,33 @@ def determineWinProbability(ELO1,ELO2):
     return 1 / (1 + 10 ** (-elo_diff / 400))
 
 
+def getWinProbabilities(elos1,elos2):
+    """
+    Calculates the win factors of many games at once (vectorized determineWinProbability).
+
+    :param np.ndarray elos1: First players ELO.
+    :param np.ndarray elos2: Second players ELO.
+
+    :return: np.ndarray - Predicted win probabilities (for the first players).
+    """
+    return 1 / (1 + np.exp((np.asarray(elos2,dtype=np.float64) - elos1) * WIN_PROBABILITY_SLOPE))
+
+
+def predictMatchups(players_table,pairs):
+    """
+    Predicts the outcome of hypothetical games in a single call (e.g. every pairing of a tournament draw).
+    Players missing from the table are rated START_ELO, like new players.
+
+    :param dict players_table: Database Players table.
+    :param list[tuple[str,str]] pairs: (player1_id,player2_id) pairings.
+
+    :return: np.ndarray - Predicted win probabilities of player 1, in pairs order.
+    """
+    elos = np.fromiter((players_table[player_id]['ELO'] if player_id in players_table else START_ELO
+                        for pair in pairs for player_id in pair),dtype=np.float64,count=2 * len(pairs))
+    return getWinProbabilities(elos[0::2],elos[1::2])
+
+
 def getPlayerGrowthCoeff(player_games_count,base_points,beginner_multiplier,low_elo_multiplier):
     """
     Returns a player's growth coeff based on the ELO algorithm.
@@ -125,9 +180,9 @@ def getPlayerGrowthCoeff(player_games_count,base_points,beginner_multiplier,low_
 
     :return: float - Player's growth coefficient (ELO algorithm).
     """
-    if player_games_count < 30: # Beginner
+    if player_games_count < BEGINNER_GAMES_COUNT: # Beginner
         K = base_points * beginner_multiplier
-    elif player_games_count < 2400: # Low ELO
+    elif player_games_count < MASTER_GAMES_COUNT: # Low ELO
         K = base_points * low_elo_multiplier
     else: # Master
         K = base_points
@@ -135,34 +190,115 @@ def getPlayerGrowthCoeff(player_games_count,base_points,beginner_multiplier,low_
     return K
 
 
-def optimizeHyperparametersBayesian(sport,category):
+def createPlayer(players_table,player_id):
+    """
+    Creates a new player dict in the Players table, with default ELO.
+
+    :param dict players_table: Database Players table.
+    :param str player_id: Player (unique) id.
+    """
+    players_table[player_id] = {
+    'ID':player_id,
+    'ELO':START_ELO,
+    'GAMES':[],
+    'FAV_TERRAIN':{}
+    }
+
+
+def createPlayerState(player_id):
+    """
+    Creates a new player state, with default ELO.
+
+    :param str player_id: Player (unique) id.
+
+    :return: ELOPlayer - New player state.
+    """
+    return ELOPlayer(player_id,START_ELO)
+
+
+def suggestConfiguration(trial):
+    """
+    Samples an ELO algorithm configuration from an optuna trial.
+
+    :param optuna.Trial trial: Optuna trial.
+
+    :return: tuple[float,float,float] - (base_points, beginner_multiplier, low_elo_multiplier).
+    """
+    base_points = trial.suggest_float('BASE_POINTS',1e-6,50)
+    beginner_multiplier = trial.suggest_float('BEGINNER_MULTIPLIER',1e-6,15)
+    low_elo_multiplier = trial.suggest_float('LOW_ELO_MULTIPLIER',1e-6,4)
+
+    return base_points,beginner_multiplier,low_elo_multiplier
+
+
+def runTrials(study,n_trials,db_path,batch_size=1):
+    """
+    Runs ELO configuration trials of a study in the current process.
+
+    :param optuna.Study study: Hyperparameters study.
+    :param int n_trials: Number of configurations to evaluate.
+    :param path db_path: Absolute path to the database.
+    :param int batch_size: Number of configurations evaluated together in a single replay (ask / tell interface).
+    """
+    # Optimization modules are imported on first use, replaying or predicting never needs optuna
+    from optuna.trial import TrialState
+    from ranking.optimization import getPruningCallback
+
+    # The history is parsed and compiled once per process, every trial replays it over fresh arrays
+    engine = getDataset(db_path).getELOEngine()
+
+    def objective(trial):
+        _,success_rate = engine.replay(*suggestConfiguration(trial),getPruningCallback(trial))
+
+        return success_rate
+
+    if batch_size <= 1:
+        study.optimize(objective,n_trials=n_trials)
+    else:
+        for batch_start in range(0,n_trials,batch_size):
+            trials = [study.ask() for _ in range(min(batch_size,n_trials - batch_start))]
+            pruned = set()
+
+            def batchPruningCallback(processed_games,indexes,success_rates):
+                kept = np.ones(len(indexes),dtype=bool)
+                for position,(index,success_rate) in enumerate(zip(indexes.tolist(),success_rates.tolist())):
+                    trials[index].report(success_rate,processed_games)
+                    if trials[index].should_prune():
+                        study.tell(trials[index],state=TrialState.PRUNED)
+                        pruned.add(index)
+                        kept[position] = False
+                return kept
+
+            _,success_rates = engine.replayBatch([suggestConfiguration(trial) for trial in trials],batchPruningCallback)
+            for index,(trial,success_rate) in enumerate(zip(trials,success_rates.tolist())):
+                if index not in pruned:
+                    study.tell(trial,success_rate)
+            logging.info(f"Evaluated {batch_start + len(trials)}/{n_trials} configurations, best success rate: {study.best_value}")
+
+
+def optimizeHyperparametersBayesian(sport,category,n_trials=1000,batch_size=1,n_workers=1,journal=False,pruning=True):
     """
     Hyperparemeter optimization algorithm, tests a large number of configurations and logs the succes rate into database.
 
     :param str sport: Sport name (must correspond to existing folder).
     :param str category: Category name (must correspond to existing folder).
+    :param int n_trials: Number of configurations to evaluate.
+    :param int batch_size: Number of configurations evaluated together in a single replay (ask / tell interface).
+    :param int n_workers: Number of worker processes sharing the study storage.
+    :param bool journal: Store the study in a journal file (configurationELO.log) instead of the SQLite database.
+    :param bool pruning: States if unpromising configurations are abandoned at chronological checkpoints.
+
+    :return: float - Throughput in trials per second.
     """
+    from ranking.optimization import optimizeStudy
     logging.info('Starting ELO algorithm hyperparameter optimization')
 
     db_path = getDBPath(sport,category,'defaultELO.json')
-    games_ordered_ids = orderGamesTable(getJsonObject(db_path)['GAMES'])
-
-    def objective(trial):
-        base_points = trial.suggest_float('BASE_POINTS',1e-6,50)
-        beginner_multiplier = trial.suggest_float('BEGINNER_MULTIPLIER',1e-6,15)
-        low_elo_multiplier = trial.suggest_float('LOW_ELO_MULTIPLIER',1e-6,4)
-        gambible_db = getJsonObject(db_path)
-        success_rate = processGames(db_path,gambible_db['GAMES'],gambible_db['PLAYERS'],
-                                    base_points,beginner_multiplier,low_elo_multiplier,False,games_ordered_ids)
-
-        return success_rate
+    # Compiled before the workers are forked, they share it read-only
+    getDataset(db_path).getELOEngine()
 
     study_name = f"{sport} MMR-{category} configuration"
-    configuration_db_path = f"sqlite:///{getDBPath(sport,category,'configurationELO.db',False)}"
-
-    try:
-        study = load_study(study_name=study_name,storage=configuration_db_path)
-    except:
-        study = create_study(direction='maximize',study_name=study_name,storage=configuration_db_path)
+    storage_path = getDBPath(sport,category,'configurationELO.log' if journal else 'configurationELO.db',False)
 
-    study.optimize(objective,n_trials=1000)
+    return optimizeStudy(study_name,storage_path,partial(runTrials,db_path=db_path,batch_size=batch_size),
+                         n_trials,n_workers,journal,pruning)
@@ -0,0 +1,272 @@
+# -*- coding: utf-8 -*-
+'''
+Project : GamBible
+Package: Ranking
+Module:  ELOEngine
+Version: 2.0
+Usage: Array based ELO replay engine. Compiles the database tables once into NumPy arrays and replays the whole history over flat ratings arrays.
+
+Author: BoxBoxJason
+Date: 17/10/2026
+'''
+import numpy as np
+from resources import instrumentation
+from resources.instrumentation import instrumentedCall
+from ranking.ELO import BEGINNER_GAMES_COUNT,MASTER_GAMES_COUNT
+from ranking.general import orderGamesTable,getCheckpointBounds,CHECKPOINTS
+
+class ELOEngine:
+    """
+    Compiled ELO games history. Players, games and terrains are converted to integer indexes once,
+    every replay then only works on flat arrays (no JSON dict walking).
+
+    :ivar list[str] players_ids: Players ids, the position in the list is the player index.
+    :ivar list[str] terrains: Terrains names, the position in the list is the terrain index.
+    :ivar list[str] games_ids: Unprocessed games ids, in chronological order.
+    :ivar np.ndarray winners: Winner index of each game.
+    :ivar np.ndarray losers: Loser index of each game.
+    :ivar np.ndarray games_terrains: Terrain index of each game (-1 if the game has no terrain).
+    :ivar np.ndarray start_elos: Players ELO before the replay.
+    :ivar np.ndarray start_games_counts: Players games count before the replay.
+    :ivar np.ndarray winners_levels: Winner growth level for each game (0: beginner, 1: low ELO, 2: master).
+    :ivar np.ndarray losers_levels: Loser growth level for each game (0: beginner, 1: low ELO, 2: master).
+    :ivar np.ndarray terrains_results: Wins and losses added by the replay for each player on each terrain, shape (players, terrains, 2).
+    """
+    def __init__(self,games_table,players_table,games_ordered_ids=None):
+        """
+        Constructor for ELOEngine, compiles the database tables.
+
+        :param dict games_table: Database Games table.
+        :param dict players_table: Database Players table.
+        :param list[str] games_ordered_ids: Games ids ordered by date (computed if not provided).
+        """
+        if games_ordered_ids is None:
+            games_ordered_ids = orderGamesTable(games_table)
+
+        self.games_ids = [game_id for game_id in games_ordered_ids if not games_table[game_id]['PROCESSED']]
+        self.players_ids = list(players_table)
+        players_indexes = {player_id:index for index,player_id in enumerate(self.players_ids)}
+
+        self.terrains = []
+        terrains_indexes = {}
+        games_count = len(self.games_ids)
+        self.winners = np.empty(games_count,dtype=np.int64)
+        self.losers = np.empty(games_count,dtype=np.int64)
+        self.games_terrains = np.full(games_count,-1,dtype=np.int64)
+        for game_index,game_id in enumerate(self.games_ids):
+            game_dict = games_table[game_id]
+            self.winners[game_index] = players_indexes[game_dict['WINNER_ID']]
+            self.losers[game_index] = players_indexes[game_dict['LOSER_ID']]
+            terrain = game_dict.get('TERRAIN')
+            if terrain:
+                if terrain not in terrains_indexes:
+                    terrains_indexes[terrain] = len(self.terrains)
+                    self.terrains.append(terrain)
+                self.games_terrains[game_index] = terrains_indexes[terrain]
+
+        self.start_elos = np.array([players_table[player_id]['ELO'] for player_id in self.players_ids],dtype=np.float64)
+        self.start_games_counts = np.array([len(players_table[player_id]['GAMES']) for player_id in self.players_ids],dtype=np.int64)
+        self.__compile()
+
+
+    @classmethod
+    def fromColumnarDatabase(cls,columnar_database):
+        """
+        Compiles an ELO columnar database straight from its (memory-mapped) arrays, no JSON table is built.
+        Players and games ids of the engine are their columnar indexes, the integer ids internDatabase gives.
+
+        :param ColumnarDatabase columnar_database: ELO layout columnar database.
+
+        :return: ELOEngine - Compiled ELO games history.
+        """
+        engine = cls.__new__(cls)
+        games_order = np.asarray(columnar_database.getGamesOrder())
+        games_indexes = games_order[~columnar_database['GAMES_PROCESSED'][games_order]]
+        # ELO rankings are (winner,loser) pairs
+        rankings_starts = np.asarray(columnar_database['GAMES_RANKING_OFFSETS'])[games_indexes]
+        rankings = np.asarray(columnar_database['GAMES_RANKING'])
+
+        engine.games_ids = games_indexes.tolist()
+        engine.players_ids = list(range(len(columnar_database.players_ids)))
+        engine.terrains = columnar_database['TERRAINS'].tolist()
+        engine.winners = rankings[rankings_starts].astype(np.int64)
+        engine.losers = rankings[rankings_starts + 1].astype(np.int64)
+        engine.games_terrains = np.asarray(columnar_database['GAMES_TERRAIN'])[games_indexes].astype(np.int64)
+        engine.start_elos = np.array(columnar_database['PLAYERS_ELO'],dtype=np.float64)
+        engine.start_games_counts = np.diff(columnar_database['PLAYERS_GAMES_OFFSETS']).astype(np.int64)
+        engine.__compile()
+        return engine
+
+
+    def __compile(self):
+        """
+        Computes the arrays derived from the compiled games: growth levels and terrains results.
+        """
+        # Games counts (hence growth levels) do not depend on the ratings, they are computed once
+        winners_games_counts,losers_games_counts = self.__countPreviousGames()
+        self.winners_levels = (winners_games_counts >= BEGINNER_GAMES_COUNT).astype(np.int64) + (winners_games_counts >= MASTER_GAMES_COUNT)
+        self.losers_levels = (losers_games_counts >= BEGINNER_GAMES_COUNT).astype(np.int64) + (losers_games_counts >= MASTER_GAMES_COUNT)
+
+        self.terrains_results = np.zeros((len(self.players_ids),len(self.terrains),2),dtype=np.int64)
+        with_terrain = self.games_terrains >= 0
+        np.add.at(self.terrains_results,(self.winners[with_terrain],self.games_terrains[with_terrain],0),1)
+        np.add.at(self.terrains_results,(self.losers[with_terrain],self.games_terrains[with_terrain],1),1)
+
+
+    def __countPreviousGames(self):
+        """
+        Computes the number of games each participant had played before every game of the replay.
+
+        :return: tuple[np.ndarray,np.ndarray] - Winners and losers games counts before each game.
+        """
+        # Participants in processing order: winner of game 0, loser of game 0, winner of game 1...
+        participants = np.empty(2 * len(self.games_ids),dtype=np.int64)
+        participants[0::2] = self.winners
+        participants[1::2] = self.losers
+
+        order = np.argsort(participants,kind='stable')
+        sorted_participants = participants[order]
+        previous_games = np.empty_like(participants)
+        previous_games[order] = np.arange(len(participants)) - np.searchsorted(sorted_participants,sorted_participants,'left')
+        previous_games += self.start_games_counts[participants]
+
+        return previous_games[0::2],previous_games[1::2]
+
+
+    def getGrowthCoeffs(self,base_points,beginner_multiplier,low_elo_multiplier):
+        """
+        Returns the growth coefficient of the winner and the loser of every game.
+
+        :param float base_points: ELO algorithm base points.
+        :param float beginner_multiplier: ELO algorithm beginner multiplier.
+        :param float low_elo_multiplier: ELO algorithm low elo multiplier.
+
+        :return: tuple[np.ndarray,np.ndarray] - Winners and losers growth coefficients.
+        """
+        growth_coeffs = np.array([base_points * beginner_multiplier,base_points * low_elo_multiplier,base_points])
+        return growth_coeffs[self.winners_levels],growth_coeffs[self.losers_levels]
+
+
+    @instrumentedCall('ELOEngine.replay')
+    def replay(self,base_points,beginner_multiplier,low_elo_multiplier,checkpoint_callback=None,checkpoints=CHECKPOINTS):
+        """
+        Replays the whole compiled history with the given configuration.
+
+        :param float base_points: ELO algorithm base points.
+        :param float beginner_multiplier: ELO algorithm beginner multiplier.
+        :param float low_elo_multiplier: ELO algorithm low elo multiplier.
+        :param function checkpoint_callback: (processed_games,success_rate) -> None, called at chronological checkpoints.
+        :param int checkpoints: Number of checkpoints at which checkpoint_callback is called.
+
+        :return: tuple[np.ndarray,float] - Players ELO after the replay and correct game output predictions percentage.
+        """
+        winners_coeffs,losers_coeffs = self.getGrowthCoeffs(base_points,beginner_multiplier,low_elo_multiplier)
+        # Games are sequentially dependent: the loop runs on plain floats, which is faster than NumPy scalars
+        elos = self.start_elos.tolist()
+        winners = self.winners.tolist()
+        losers = self.losers.tolist()
+        winners_coeffs = winners_coeffs.tolist()
+        losers_coeffs = losers_coeffs.tolist()
+        correct_predictions = 0
+        for start,end in getCheckpointBounds(len(self.games_ids),checkpoints if checkpoint_callback else 1):
+            for winner,loser,winner_coeff,loser_coeff in zip(winners[start:end],losers[start:end],
+                                                            winners_coeffs[start:end],losers_coeffs[start:end]):
+                win_probability = 1 / (1 + 10 ** (-(elos[winner] - elos[loser]) / 400))
+                game_diff = 1 - win_probability
+                correct_predictions += win_probability > game_diff
+                elos[winner] += winner_coeff * game_diff
+                elos[loser] -= loser_coeff * game_diff
+            if checkpoint_callback is not None:
+                checkpoint_callback(end,correct_predictions / end)
+        if instrumentation.ENABLED:
+            instrumentation.incrementCounter('GAMES_PROCESSED',len(self.games_ids))
+
+        success_rate = 0
+        if self.games_ids:
+            success_rate = correct_predictions / len(self.games_ids)
+        return np.array(elos),success_rate
+
+
+    @instrumentedCall('ELOEngine.replayBatch')
+    def replayBatch(self,configurations,checkpoint_callback=None,checkpoints=CHECKPOINTS):
+        """
+        Replays the whole compiled history once for N configurations at the same time.
+        Ratings are held as a (players x N) array so that each game updates two contiguous rows.
+        Results equal N calls to replay, up to floating point rounding of the vectorized power.
+        At each checkpoint, the callback may stop configurations: their ratings and success rates are frozen
+        at that checkpoint and they are no longer replayed.
+
+        :param np.ndarray configurations: (N x 3) matrix of (base_points, beginner_multiplier, low_elo_multiplier) rows.
+        :param function checkpoint_callback: (processed_games,indexes,success_rates) -> np.ndarray | None, called at
+        chronological checkpoints with the indexes and success rates of the configurations still replayed. May return a
+        boolean mask of the configurations to keep replaying.
+        :param int checkpoints: Number of checkpoints at which checkpoint_callback is called.
+
+        :return: tuple[np.ndarray,np.ndarray] - (N x players) ELO matrix after the replay and the N success rates.
+        """
+        configurations = np.asarray(configurations,dtype=np.float64).reshape(-1,3)
+        base_points = configurations[:,0]
+        # Growth coefficient of each level (rows) for each configuration (columns)
+        growth_coeffs = np.stack((base_points * configurations[:,1],base_points * configurations[:,2],base_points))
+
+        final_elos = np.repeat(self.start_elos[:,np.newaxis],len(configurations),axis=1)
+        success_rates = np.zeros(len(configurations))
+        # Configurations still replayed
+        indexes = np.arange(len(configurations))
+        elos = final_elos.copy()
+        correct_predictions = np.zeros(len(configurations),dtype=np.int64)
+        winners = self.winners.tolist()
+        losers = self.losers.tolist()
+        winners_levels = self.winners_levels.tolist()
+        losers_levels = self.losers_levels.tolist()
+        for start,end in getCheckpointBounds(len(self.games_ids),checkpoints if checkpoint_callback else 1):
+            for winner,loser,winner_level,loser_level in zip(winners[start:end],losers[start:end],
+                                                            winners_levels[start:end],losers_levels[start:end]):
+                win_probability = 1 / (1 + 10 ** (-(elos[winner] - elos[loser]) / 400))
+                game_diff = 1 - win_probability
+                correct_predictions += win_probability > game_diff
+                elos[winner] += growth_coeffs[winner_level] * game_diff
+                elos[loser] -= growth_coeffs[loser_level] * game_diff
+
+            final_elos[:,indexes] = elos
+            success_rates[indexes] = correct_predictions / end
+            if instrumentation.ENABLED:
+                instrumentation.incrementCounter('GAMES_PROCESSED',(end - start) * len(indexes))
+            if checkpoint_callback is not None:
+                kept = checkpoint_callback(end,indexes,success_rates[indexes])
+                if kept is not None and not np.all(kept):
+                    indexes = indexes[kept]
+                    elos = elos[:,kept]
+                    correct_predictions = correct_predictions[kept]
+                    growth_coeffs = growth_coeffs[:,kept]
+                    if len(indexes) == 0:
+                        break
+
+        return final_elos.T,success_rates
+
+
+    def apply(self,games_table,players_table,elos):
+        """
+        Writes a replay result back to the database tables (same changes as ELO.processGames).
+
+        :param dict games_table: Database Games table (the one the engine was compiled from, interned for a columnar engine).
+        :param dict players_table: Database Players table (the one the engine was compiled from, interned for a columnar engine).
+        :param np.ndarray elos: Players ELO returned by replay.
+        """
+        for player_id,elo in zip(self.players_ids,elos.tolist()):
+            players_table[player_id]['ELO'] = elo
+
+        for game_id,winner,loser in zip(self.games_ids,self.winners.tolist(),self.losers.tolist()):
+            players_table[self.players_ids[winner]]['GAMES'].append(game_id)
+            players_table[self.players_ids[loser]]['GAMES'].append(game_id)
+            games_table[game_id]['PROCESSED'] = True
+
+        for player_index,terrain_index in zip(*np.nonzero(self.terrains_results.sum(axis=2))):
+            wins,losses = self.terrains_results[player_index,terrain_index].tolist()
+            player_terrains = players_table[self.players_ids[player_index]]['FAV_TERRAIN']
+            terrain = self.terrains[terrain_index]
+            if terrain in player_terrains:
+                player_terrains[terrain]['WIN'] += wins
+                player_terrains[terrain]['LOSS'] += losses
+            else:
+                player_terrains[terrain] = {'WIN':wins,'LOSS':losses,'DRAW':0}
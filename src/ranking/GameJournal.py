@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+'''
+Project : GamBible
+Package: Ranking
+Module:  GameJournal
+Version: 2.0
+Usage: Incremental games ingestion. New games are appended to a write-ahead log and applied to the last ratings
+checkpoint, so that adding games costs O(new games) instead of rewriting and reprocessing the whole database.
+
+Author: BoxBoxJason
+Date: 17/10/2026
+'''
+import os
+import logging
+from json import dumps,loads
+from resources.PathEnum import getJsonObject,dumpJsonObject
+from resources.ColumnarDB import getDatabaseObject,dumpDatabaseObject
+from ranking import ELO,MMR
+from ranking.GameStream import applyGame,getAlgorithmPlayersStates,ALGORITHMS
+from ranking.GamesIndex import getGamesIndex
+
+# Number of appended games between two players snapshots
+CHECKPOINT_INTERVAL = 500
+
+class GameJournal:
+    """
+    Append-only games journal on top of a database.
+    The base database is never rewritten by appends: new games go to the write-ahead log (<database>.wal, one JSON
+    game per line) and the Players table is periodically snapshot (<database>.checkpoint.json) along with the log
+    position it covers and the fingerprint of the base database it was built from. Opening the journal loads the
+    snapshot and only replays the log tail, the ratings are rebuilt from the base database and the whole log if the base
+    database changed since the snapshot.
+    Appended games must be more recent than the games already ingested.
+
+    :ivar path db_path: Absolute path to the base database.
+    :ivar str algorithm: Ranking algorithm ('ELO' or 'MMR').
+    :ivar tuple parameters: Ranking algorithm parameters ((base_points,beginner_multiplier,low_elo_multiplier) or (γ,β,ρ)).
+    :ivar int checkpoint_interval: Number of appended games between two players snapshots.
+    :ivar dict players_states: Up to date player states (ELOPlayer or MMRPlayer) by player id.
+    :ivar int games_count: Number of games applied since the journal creation.
+    :ivar int correct_predictions: Number of correct predictions over the applied games.
+    """
+    def __init__(self,db_path,algorithm,parameters,checkpoint_interval=CHECKPOINT_INTERVAL):
+        """
+        Constructor for GameJournal, loads the last checkpoint and replays the log tail.
+
+        :param path db_path: Absolute path to the base database.
+        :param str algorithm: Ranking algorithm ('ELO' or 'MMR').
+        :param tuple parameters: Ranking algorithm parameters.
+        :param int checkpoint_interval: Number of appended games between two players snapshots.
+        """
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown ranking algorithm {algorithm}, expected one of {ALGORITHMS}")
+        self.db_path = db_path
+        self.algorithm = algorithm
+        self.parameters = tuple(parameters)
+        self.checkpoint_interval = checkpoint_interval
+        self.players_states = {}
+        self.games_count = 0
+        self.correct_predictions = 0
+        self.__wal_offset = 0
+        self.__uncheckpointed_games = 0
+
+        checkpoint = getJsonObject(self.checkpoint_path)
+        if checkpoint and checkpoint['ALGORITHM'] == self.algorithm and tuple(checkpoint['PARAMETERS']) == self.parameters \
+                and checkpoint.get('BASE_FINGERPRINT') == getFingerprint(self.db_path):
+            self.players_states = getAlgorithmPlayersStates(checkpoint['PLAYERS'],self.algorithm)
+            self.games_count = checkpoint['GAMES_COUNT']
+            self.correct_predictions = checkpoint['CORRECT_PREDICTIONS']
+            self.__wal_offset = checkpoint['WAL_OFFSET']
+            if self.__wal_offset > _getFileSize(self.wal_path):
+                # Log emptied by a compaction after its checkpoint was written
+                self.__wal_offset = 0
+                self.checkpoint()
+            self.__replayLog()
+        else:
+            if checkpoint:
+                logging.info(f"Checkpoint of {self.db_path} does not match its configuration or base database, rebuilding it")
+            base_games_ids = self.__loadBaseDatabase()
+            # Next openings start from the processed base database
+            self.__uncheckpointed_games = self.checkpoint_interval
+            # Log games already merged into the base database by an interrupted compaction are skipped
+            self.__replayLog(base_games_ids)
+
+
+    @property
+    def wal_path(self):
+        """
+        :return: path - Absolute path to the write-ahead log.
+        """
+        return f"{self.db_path}.wal"
+
+
+    @property
+    def checkpoint_path(self):
+        """
+        :return: path - Absolute path to the players snapshot.
+        """
+        return f"{self.db_path}.checkpoint.json"
+
+
+    @property
+    def players_table(self):
+        """
+        :return: dict - Up to date Players table (rows share their values with the player states).
+        """
+        return {player_id:player_state.toDict() for player_id,player_state in self.players_states.items()}
+
+
+    def __loadBaseDatabase(self):
+        """
+        Processes the base database (without committing it) as the journal starting point.
+
+        :return: set[str] - Ids of the base database games.
+        """
+        database = getDatabaseObject(self.db_path)
+        players_table = database.get('PLAYERS',{})
+        games_table = database.get('GAMES',{})
+        games_ordered_ids = getGamesIndex(self.db_path,games_table).getOrderedIds(games_table)
+        unprocessed_count = len(games_ordered_ids)
+        if self.algorithm == 'ELO':
+            success_rate = ELO.processGames(self.db_path,games_table,players_table,*self.parameters,
+                                            games_ordered_ids=games_ordered_ids)
+        else:
+            success_rate = MMR.processGames(self.db_path,games_table,players_table,*self.parameters,
+                                            games_ordered_ids=games_ordered_ids)
+        self.players_states = getAlgorithmPlayersStates(players_table,self.algorithm)
+        self.games_count = unprocessed_count
+        self.correct_predictions = round(success_rate * unprocessed_count)
+        self.__wal_offset = 0
+        return set(games_table)
+
+
+    def __replayLog(self,skipped_games_ids=()):
+        """
+        Applies the log games written after the loaded checkpoint.
+
+        :param set[str] skipped_games_ids: Ids of the games not to apply (already in the ratings).
+        """
+        if os.path.exists(self.wal_path):
+            with open(self.wal_path,'rb') as wal_file:
+                wal_file.seek(self.__wal_offset)
+                for line in wal_file:
+                    # A truncated last line comes from an interrupted append, it is ignored
+                    if not line.endswith(b'\n'):
+                        break
+                    game_dict = loads(line)
+                    if game_dict['ID'] not in skipped_games_ids:
+                        self.__applyGame(game_dict)
+                        self.__uncheckpointed_games += 1
+                    self.__wal_offset += len(line)
+
+        if self.__uncheckpointed_games >= self.checkpoint_interval:
+            self.checkpoint()
+
+
+    def __applyGame(self,game_dict):
+        """
+        Applies a game to the player states, unknown players are created.
+
+        :param dict game_dict: Game dict.
+        """
+        self.correct_predictions += applyGame(self.players_states,game_dict,self.algorithm,self.parameters)
+        self.games_count += 1
+
+
+    def appendGames(self,games):
+        """
+        Appends new games to the log and applies them to the ratings.
+        Only the new log lines are written, plus a players snapshot every checkpoint_interval games.
+
+        :param list[dict] games: New games dicts, in chronological order.
+        """
+        with open(self.wal_path,'ab') as wal_file:
+            for game_dict in games:
+                game_dict = dict(game_dict,PROCESSED=False)
+                line = (dumps(game_dict) + '\n').encode('utf-8')
+                wal_file.write(line)
+                self.__applyGame(game_dict)
+                self.__wal_offset += len(line)
+                self.__uncheckpointed_games += 1
+            wal_file.flush()
+            os.fsync(wal_file.fileno())
+
+        if self.__uncheckpointed_games >= self.checkpoint_interval:
+            self.checkpoint()
+
+
+    def checkpoint(self):
+        """
+        Snapshots the Players table along with the log position it covers (atomic, a crash never leaves a partial
+        checkpoint).
+        """
+        dumpJsonObject({
+            'ALGORITHM':self.algorithm,
+            'PARAMETERS':self.parameters,
+            'BASE_FINGERPRINT':getFingerprint(self.db_path),
+            'WAL_OFFSET':self.__wal_offset,
+            'GAMES_COUNT':self.games_count,
+            'CORRECT_PREDICTIONS':self.correct_predictions,
+            'PLAYERS':self.players_table
+        },self.checkpoint_path)
+        self.__uncheckpointed_games = 0
+
+
+    def compact(self):
+        """
+        Merges the log into the base database (full rewrite) and empties the log.
+        Every step leaves a consistent journal: the base database is replaced atomically, then a checkpoint of the new
+        base database covering the whole log is written before the log is emptied.
+        """
+        database = getDatabaseObject(self.db_path)
+        games_table = database.get('GAMES',{})
+        for game_dict in games_table.values():
+            game_dict['PROCESSED'] = True
+        if os.path.exists(self.wal_path):
+            with open(self.wal_path,'rb') as wal_file:
+                for line in wal_file:
+                    if line.endswith(b'\n'):
+                        game_dict = loads(line)
+                        game_dict['PROCESSED'] = True
+                        games_table[game_dict['ID']] = game_dict
+
+        dumpDatabaseObject({'GAMES':games_table,'PLAYERS':self.players_table},self.db_path)
+        self.__wal_offset = _getFileSize(self.wal_path)
+        self.checkpoint()
+        open(self.wal_path,'wb').close()
+        self.__wal_offset = 0
+        self.checkpoint()
+
+
+    def getSuccessRate(self):
+        """
+        :return: float - Correct game output predictions percentage over the applied games.
+        """
+        success_rate = 0
+        if self.games_count != 0:
+            success_rate = self.correct_predictions / self.games_count
+        return success_rate
+
+
+def getFingerprint(db_path):
+    """
+    Returns the fingerprint of a database: modification time and size of its file (of its newest file and of all its
+    files for a columnar database folder).
+
+    :param path db_path: Absolute path to the database.
+
+    :return: list[int] - [modification time (ns),size] (None if the database does not exist).
+    """
+    if os.path.isdir(db_path):
+        stats = [entry.stat() for entry in os.scandir(db_path) if entry.is_file()]
+        return [max((stat.st_mtime_ns for stat in stats),default=0),sum(stat.st_size for stat in stats)]
+    if os.path.exists(db_path):
+        stat = os.stat(db_path)
+        return [stat.st_mtime_ns,stat.st_size]
+    return None
+
+
+def _getFileSize(file_path):
+    """
+    :param path file_path: Absolute path to the file.
+
+    :return: int - File size (0 if it does not exist).
+    """
+    return os.path.getsize(file_path) if os.path.exists(file_path) else 0
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+'''
+Project : GamBible
+Package: Ranking
+Module:  GameStream
+Version: 2.0
+Usage: Out-of-core games pipeline. Games are read lazily, in chronological order, from JSON-lines streams (one game
+per line) and ratings are updated through generators, so that a replay only holds the Players table in memory.
+
+Author: BoxBoxJason
+Date: 17/10/2026
+'''
+import os
+import heapq
+import tempfile
+from json import dumps,loads
+from ranking import ELO,MMR
+from ranking.general import orderGamesTable,getGameSortKey
+from ranking.PlayerState import ELOPlayer,MMRPlayer,getPlayersStates,writePlayersStates
+
+# Number of games sorted in memory at once by the external sort
+SORT_CHUNK_SIZE = 100_000
+# Supported ranking algorithms
+ALGORITHMS = ('ELO','MMR')
+
+def readGamesStream(stream_path):
+    """
+    Lazily reads the games of a JSON-lines stream.
+
+    :param path stream_path: Absolute path to the games stream.
+
+    :return: generator[dict] - Games dicts, in file order.
+    """
+    with open(stream_path,'r',encoding='utf-8') as stream_file:
+        for line in stream_file:
+            if line.strip():
+                yield loads(line)
+
+
+def writeGamesStream(games,stream_path):
+    """
+    Writes games to a JSON-lines stream, games are consumed one at a time.
+
+    :param iterable[dict] games: Games dicts.
+    :param path stream_path: Absolute path to the destination games stream.
+
+    :return: int - Number of written games.
+    """
+    games_count = 0
+    with open(stream_path,'w',encoding='utf-8') as stream_file:
+        for game_dict in games:
+            stream_file.write(dumps(game_dict) + '\n')
+            games_count += 1
+    return games_count
+
+
+def exportGamesStream(games_table,stream_path):
+    """
+    Writes the Games table of a database to a chronologically sorted games stream.
+
+    :param dict games_table: Database Games table.
+    :param path stream_path: Absolute path to the destination games stream.
+
+    :return: int - Number of written games.
+    """
+    return writeGamesStream((games_table[game_id] for game_id in orderGamesTable(games_table)),stream_path)
+
+
+def sortGamesStream(input_path,output_path,chunk_size=SORT_CHUNK_SIZE):
+    """
+    Chronologically sorts a games stream of any size (external merge sort): chunks of chunk_size games are sorted in
+    memory and written to temporary runs, which are then merged lazily. Games with the same date keep their order.
+
+    :param path input_path: Absolute path to the unsorted games stream.
+    :param path output_path: Absolute path to the destination sorted games stream (may be input_path).
+    :param int chunk_size: Number of games held in memory at once.
+
+    :return: int - Number of sorted games.
+    """
+    runs_directory = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(output_path)))
+    runs_paths = []
+    try:
+        chunk = []
+        for game_dict in readGamesStream(input_path):
+            chunk.append(game_dict)
+            if len(chunk) >= chunk_size:
+                runs_paths.append(_writeRun(chunk,runs_directory,len(runs_paths)))
+                chunk = []
+        if chunk or not runs_paths:
+            runs_paths.append(_writeRun(chunk,runs_directory,len(runs_paths)))
+
+        # heapq.merge is stable: on equal keys, earlier runs come first
+        sorted_games = heapq.merge(*(readGamesStream(run_path) for run_path in runs_paths),key=getGameSortKey)
+        games_count = writeGamesStream(sorted_games,os.path.join(runs_directory,'sorted.jsonl'))
+        os.replace(os.path.join(runs_directory,'sorted.jsonl'),output_path)
+    finally:
+        for run_path in runs_paths:
+            if os.path.exists(run_path):
+                os.remove(run_path)
+        os.rmdir(runs_directory)
+
+    return games_count
+
+
+def _writeRun(chunk,runs_directory,run_index):
+    """
+    Sorts a chunk of games and writes it to a temporary run.
+
+    :param list[dict] chunk: Games dicts.
+    :param path runs_directory: Absolute path to the temporary runs folder.
+    :param int run_index: Run number.
+
+    :return: path - Absolute path to the run.
+    """
+    chunk.sort(key=getGameSortKey)
+    run_path = os.path.join(runs_directory,f"run-{run_index}.jsonl")
+    writeGamesStream(chunk,run_path)
+    return run_path
+
+
+def applyGame(players_states,game_dict,algorithm,parameters):
+    """
+    Applies a game to the player states, unknown players are created.
+    MMR games ids are listed by MMR.createGame, not by the replay: the id is added to the players games unless the game
+    was created that way (ELO.processGame lists the ELO games ids itself).
+
+    :param dict players_states: Player states (ELOPlayer or MMRPlayer) by player id.
+    :param dict game_dict: Game dict.
+    :param str algorithm: Ranking algorithm ('ELO' or 'MMR').
+    :param tuple parameters: Ranking algorithm parameters ((base_points,beginner_multiplier,low_elo_multiplier) or (γ,β,ρ)).
+
+    :return: bool - Success of the game outcome prediction.
+    """
+    if algorithm == 'ELO':
+        for player_id in (game_dict['WINNER_ID'],game_dict['LOSER_ID']):
+            if player_id not in players_states:
+                players_states[player_id] = ELO.createPlayerState(player_id)
+        return ELO.processGame(game_dict,players_states,*parameters)
+
+    for player_id in game_dict['RANKING']:
+        if player_id not in players_states:
+            players_states[player_id] = MMR.createPlayerState(player_id)
+        # Linear in the player games count, like the MMR.update history sums
+        if game_dict['ID'] not in players_states[player_id].games:
+            players_states[player_id].games.append(game_dict['ID'])
+    return MMR.processGame(players_states,game_dict,*parameters)
+
+
+def getAlgorithmPlayersStates(players_table,algorithm):
+    """
+    Converts a Players table to the player states of a ranking algorithm.
+
+    :param dict players_table: Database Players table.
+    :param str algorithm: Ranking algorithm ('ELO' or 'MMR').
+
+    :return: dict - Player states by player id.
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown ranking algorithm {algorithm}, expected one of {ALGORITHMS}")
+    return getPlayersStates(players_table,ELOPlayer if algorithm == 'ELO' else MMRPlayer)
+
+
+def processGamesStream(games,players_table,algorithm,parameters,games_window=None):
+    """
+    Generator stage updating the ratings with each game of a chronological games iterable.
+    Ratings are held in player states during the replay, the Players table is written when the generator is exhausted
+    or closed.
+    With a games_window, players only keep their games_window most recent games ids, which bounds the memory by the
+    number of players. ELO ratings stay exact as long as games_window >= ELO.MASTER_GAMES_COUNT (ELO only compares the
+    games count to that threshold), MMR ratings do not depend on the games ids.
+
+    :param iterable[dict] games: Chronologically ordered games dicts.
+    :param dict players_table: Database Players table, updated in place.
+    :param str algorithm: Ranking algorithm ('ELO' or 'MMR').
+    :param tuple parameters: Ranking algorithm parameters.
+    :param int games_window: Number of games ids kept by player (None to keep them all).
+
+    :return: generator[tuple[dict,bool]] - Processed games dicts and the success of their outcome prediction.
+    """
+    players_states = getAlgorithmPlayersStates(players_table,algorithm)
+    try:
+        for game_dict in games:
+            if game_dict.get('PROCESSED'):
+                continue
+            predicted = applyGame(players_states,game_dict,algorithm,parameters)
+            if games_window is not None:
+                players_ids = (game_dict['WINNER_ID'],game_dict['LOSER_ID']) if algorithm == 'ELO' else game_dict['RANKING']
+                for player_id in players_ids:
+                    player_games = players_states[player_id].games
+                    # Trimmed by whole windows, keeps the deletions cost amortized
+                    if len(player_games) >= 2 * games_window:
+                        del player_games[:len(player_games) - games_window]
+            yield game_dict,predicted
+    finally:
+        writePlayersStates(players_table,players_states)
+
+
+def replayGamesStream(stream_path,algorithm,parameters,players_table=None,games_window=None,output_stream_path=None,
+                      checkpoint_callback=None,checkpoint_interval=SORT_CHUNK_SIZE):
+    """
+    Replays a chronologically sorted games stream, the games are never all held in memory.
+
+    :param path stream_path: Absolute path to the sorted games stream.
+    :param str algorithm: Ranking algorithm ('ELO' or 'MMR').
+    :param tuple parameters: Ranking algorithm parameters.
+    :param dict players_table: Players table to start from (empty if None), updated in place.
+    :param int games_window: Number of games ids kept by player (None to keep them all), see processGamesStream.
+    :param path output_stream_path: Absolute path to a games stream receiving the processed games (not written if None).
+    :param function checkpoint_callback: (processed_games,success_rate) -> None, called every checkpoint_interval games.
+    :param int checkpoint_interval: Number of games between two checkpoint_callback calls.
+
+    :return: tuple[dict,float] - Updated Players table and correct game output predictions percentage.
+    """
+    if players_table is None:
+        players_table = {}
+    processed_games = processGamesStream(readGamesStream(stream_path),players_table,algorithm,parameters,games_window)
+
+    games_count = 0
+    correct_predictions = 0
+    output_file = open(output_stream_path,'w',encoding='utf-8') if output_stream_path is not None else None
+    try:
+        for game_dict,predicted in processed_games:
+            games_count += 1
+            correct_predictions += predicted
+            if output_file is not None:
+                output_file.write(dumps(game_dict) + '\n')
+            if checkpoint_callback is not None and games_count % checkpoint_interval == 0:
+                checkpoint_callback(games_count,correct_predictions / games_count)
+    finally:
+        # Writes the player states back even if the replay is interrupted
+        processed_games.close()
+        if output_file is not None:
+            output_file.close()
+
+    success_rate = 0
+    if games_count != 0:
+        success_rate = correct_predictions / games_count
+    return players_table,success_rate
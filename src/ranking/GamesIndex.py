@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+'''
+Project : GamBible
+Package: Ranking
+Module:  GamesIndex
+Version: 2.0
+Usage: Persistent chronological games index. Parsed games dates are kept sorted and stored alongside the database
+(<database>.index.json), so that replays get the games order without sorting the Games table.
+
+Author: BoxBoxJason
+Date: 17/10/2026
+'''
+from bisect import bisect_right
+from resources.PathEnum import getJsonObject,dumpJsonObject
+from resources.utils import parseGameDate
+from ranking.general import getGameSortKey
+
+class GamesIndex:
+    """
+    Games ids sorted by parsed date. Games with the same date keep their insertion order.
+
+    :ivar list[str] games_ids: Games ids in chronological order (read only, use addGame).
+    :ivar list[str] dates: Parsed dates of games_ids.
+    :ivar list[str] source_dates: DATE fields of games_ids, as written in the Games table (detects edited dates).
+    """
+    def __init__(self,games_ids=None,dates=None,source_dates=None):
+        """
+        Constructor for GamesIndex.
+
+        :param list[str] games_ids: Games ids in chronological order.
+        :param list[str] dates: Parsed dates of games_ids.
+        :param list[str] source_dates: DATE fields of games_ids.
+        """
+        self.games_ids = games_ids if games_ids is not None else []
+        self.dates = dates if dates is not None else []
+        self.source_dates = source_dates if source_dates is not None else []
+
+
+    def __len__(self):
+        return len(self.games_ids)
+
+
+    def addGame(self,game_dict):
+        """
+        Inserts a game at its chronological position, found by binary search.
+
+        :param dict game_dict: Game dict.
+        """
+        date = parseGameDate(game_dict['DATE'])
+        position = bisect_right(self.dates,date)
+        self.dates.insert(position,date)
+        self.source_dates.insert(position,game_dict['DATE'])
+        self.games_ids.insert(position,game_dict['ID'])
+
+
+    def getOrderedIds(self,games_table=None):
+        """
+        Returns the games ids in chronological order.
+
+        :param dict games_table: Database Games table, only its unprocessed games are returned if provided.
+
+        :return: list[str] - Ordered games ids.
+        """
+        if games_table is None:
+            return list(self.games_ids)
+        return [game_id for game_id in self.games_ids if not games_table[game_id]['PROCESSED']]
+
+
+def buildGamesIndex(games_table):
+    """
+    Builds the index of a Games table (full sort).
+
+    :param dict games_table: Database Games table.
+
+    :return: GamesIndex - Games table index.
+    """
+    keyed_games = sorted(((getGameSortKey(game_dict),game_id) for game_id,game_dict in games_table.items()),key=lambda x: x[0])
+    return GamesIndex([game_id for _,game_id in keyed_games],[date for date,_ in keyed_games],
+                      [games_table[game_id]['DATE'] for _,game_id in keyed_games])
+
+
+def getIndexPath(db_path):
+    """
+    :param path db_path: Absolute path to the database.
+
+    :return: path - Absolute path to the database games index.
+    """
+    return f"{db_path}.index.json"
+
+
+def getGamesIndex(db_path,games_table,persist=False):
+    """
+    Returns the stored index of a database, brought up to date with its Games table.
+    Games missing from the stored index are inserted one by one, the index is only rebuilt if it references games
+    that are not in the table anymore or whose DATE changed. Reading never writes: the stored index is only updated if it changed and
+    persist is set (callers committing the database).
+
+    :param path db_path: Absolute path to the database.
+    :param dict games_table: Database Games table.
+    :param bool persist: Stores the updated index alongside the database.
+
+    :return: GamesIndex - Games table index.
+    """
+    index_dict = getJsonObject(getIndexPath(db_path))
+    games_index = GamesIndex(index_dict.get('IDS',[]),index_dict.get('DATES',[]),index_dict.get('SOURCE_DATES',[]))
+    indexed_count = len(games_index)
+
+    indexed_ids = set(games_index.games_ids)
+    # (id,DATE) pairs are compared, not parsed again: an edited date invalidates the index
+    if len(indexed_ids) != indexed_count or len(games_index.source_dates) != indexed_count \
+            or not all(game_id in games_table and games_table[game_id]['DATE'] == source_date
+                       for game_id,source_date in zip(games_index.games_ids,games_index.source_dates)):
+        games_index = buildGamesIndex(games_table)
+        indexed_count = -1
+    elif indexed_count != len(games_table):
+        for game_id,game_dict in games_table.items():
+            if game_id not in indexed_ids:
+                games_index.addGame(game_dict)
+
+    if persist and indexed_count != len(games_index):
+        dumpGamesIndex(games_index,db_path)
+    return games_index
+
+
+def dumpGamesIndex(games_index,db_path):
+    """
+    Stores a games index alongside its database.
+
+    :param GamesIndex games_index: Games index.
+    :param path db_path: Absolute path to the database.
+    """
+    dumpJsonObject({'IDS':games_index.games_ids,'DATES':games_index.dates,'SOURCE_DATES':games_index.source_dates},getIndexPath(db_path))
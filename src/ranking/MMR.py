@@ -10,19 +10,34 @@ Author: BoxBoxJason
 Date: 13/10/2023
 '''
 from math import tanh,pi,sqrt
-from copy import copy
 import logging
-from optuna import create_study,load_study
-from resources.utils import findZeroBisection
-from resources.PathEnum import getDBPath,getJsonObject,dumpJsonObject
-from ranking.general import orderGamesTable
+import numpy as np
+from functools import partial
+from resources.solvers import findZeroNewton,findZerosNewton
+from resources.PathEnum import getDBPath
+from resources.ColumnarDB import dumpDatabaseObject
+from resources import instrumentation
+from resources.instrumentation import StageTimer,instrumentedCall
+from ranking.general import orderGamesTable,getCheckpointBounds,CHECKPOINTS
+from ranking.DatasetCache import getDataset
+from ranking.PlayerState import MMRPlayer,getPlayersStates,writePlayersStates
 
 # Player default skill value
 START_SKILL = 1500
 # Player default skill deviation (skill uncertainty)
 START_DEVIATION = 350
-
-def processGames(output_file_path,games_table,players_table,γ=START_DEVIATION,β=0.5,ρ=1,commit=False,games_ordered_ids=None):
+# Default configuration (γ,β,ρ), used by the games widgets and the command line
+DEFAULT_PARAMETERS = (20,1,1)
+# Number of players from which the performance equations of a game are solved as a single array problem
+VECTORIZED_MIN_PLAYERS = 6
+# Maximum number of performances kept in a player history (None for unbounded, histories are exact by default)
+MAX_PERF_HISTORY = None
+# Performances weighing less than this ratio of the player total weight are merged into the prior term (None to never merge)
+MIN_PERF_WEIGHT_RATIO = None
+
+@instrumentedCall('MMR.processGames')
+def processGames(output_file_path,games_table,players_table,γ=START_DEVIATION,β=0.5,ρ=1,commit=False,games_ordered_ids=None,
+                 max_history=MAX_PERF_HISTORY,min_weight_ratio=MIN_PERF_WEIGHT_RATIO,checkpoint_callback=None,checkpoints=CHECKPOINTS):
     """
     Processes the entire history file and updates players dict with new games informations.
     
@@ -33,6 +48,11 @@ def processGames(output_file_path,games_table,players_table,γ=START_DEVIATION,
     :param float β: Performance deviation [0,inf[.
     :param float ρ: 1/ρ Inverse momentum -> player ranking volatility in case of sudden level change.
     :param bool commit: States if changes should be commited to database or not.
+    :param list[str] games_ordered_ids: Games ids ordered by date (computed if not provided).
+    :param int max_history: Maximum number of performances kept in a player history (None for unbounded).
+    :param float min_weight_ratio: Performances weighing less than this ratio of the player total weight are merged into the prior term (None to never merge).
+    :param function checkpoint_callback: (processed_games,success_rate) -> None, called at chronological checkpoints.
+    :param int checkpoints: Number of checkpoints at which checkpoint_callback is called.
 
     :return: float - MMR algorithm prediction success rate
     """
@@ -40,15 +60,24 @@ def processGames(output_file_path,games_table,players_table,γ=START_DEVIATION,
     if games_ordered_ids is None:
         games_ordered_ids = orderGamesTable(games_table)
 
-    total_processed_games = 0
+    unprocessed_games_ids = [game_id for game_id in games_ordered_ids if not games_table[game_id]['PROCESSED']]
+    total_processed_games = len(unprocessed_games_ids)
     predicted_output = 0
-    for game_id in games_ordered_ids:
-        if not games_table[game_id]['PROCESSED']:
-            predicted_output += processGame(players_table,games_table[game_id],γ,β,ρ)
-            total_processed_games += 1
+    players_states = getPlayersStates(players_table,MMRPlayer)
+    try:
+        for start,end in getCheckpointBounds(total_processed_games,checkpoints if checkpoint_callback else 1):
+            for game_id in unprocessed_games_ids[start:end]:
+                predicted_output += processGame(players_states,games_table[game_id],γ,β,ρ,max_history,min_weight_ratio)
+            if checkpoint_callback is not None:
+                checkpoint_callback(end,predicted_output / end)
+    finally:
+        # Also written when a checkpoint callback interrupts the replay
+        writePlayersStates(players_table,players_states)
+    if instrumentation.ENABLED:
+        instrumentation.incrementCounter('GAMES_PROCESSED',total_processed_games)
 
     if commit:
-        dumpJsonObject({'GAMES':games_table,'PLAYERS':players_table},output_file_path)
+        dumpDatabaseObject({'GAMES':games_table,'PLAYERS':players_table},output_file_path)
 
     success_rate = 0
     if total_processed_games != 0:
@@ -58,116 +87,207 @@ def processGames(output_file_path,games_table,players_table,γ=START_DEVIATION,
     return success_rate
 
 
-def processGame(players_table,game_dict,γ,β,ρ):
+def processGame(players_table,game_dict,γ,β,ρ,max_history=MAX_PERF_HISTORY,min_weight_ratio=MIN_PERF_WEIGHT_RATIO):
     """
     Updates all rankings according to game results.
     
-    :param dict players_table: Database Players table.
+    :param dict players_table: Player states (MMRPlayer) by player id.
     :param str game_dict: Database Games table row.
     :param float γ: Temporal diffusion [0,inf[.
     :param float β: Performance deviation [0,inf[.
     :param float ρ: 1/ρ Inverse momentum -> player ranking volatility in case of sudden level change.
+    :param int max_history: Maximum number of performances kept in a player history (None for unbounded).
+    :param float min_weight_ratio: Performances weighing less than this ratio of the player total weight are merged into the prior term (None to never merge).
 
     :return: bool - Success of game outcome prediction by MMR algorithm
     """
     # Adding unknown players to playersDict
-    ranking_skills = [players_table[player_id]['SKILL'] - 3 * players_table[player_id]['SKILL_DEVIATION'] for player_id in game_dict['RANKING']]
+    ranking_skills = [players_table[player_id].skill - 3 * players_table[player_id].skill_deviation for player_id in game_dict['RANKING']]
     result_predicted = ranking_skills[0] == max(ranking_skills)
 
-    for player_id in game_dict['RANKING']:
-        diffuse(players_table[player_id],γ,ρ)
-        players_table[player_id]['SKILL_DEVIATION'] = sqrt(players_table[player_id]['SKILL_DEVIATION'] ** 2 + β ** 2)
+    with StageTimer('MMR.diffuse'):
+        for player_id in game_dict['RANKING']:
+            diffuse(players_table[player_id],γ,ρ)
+            players_table[player_id].skill_deviation = sqrt(players_table[player_id].skill_deviation ** 2 + β ** 2)
 
-    new_dicts = []
-    # Perform update in parallel
-    for i in range(len(game_dict['RANKING'])):
-        new_dicts.append(update([copy(players_table[player_id]) for player_id in game_dict['RANKING']],i,β))
-
-    # Apply update
-    for i,player_id in enumerate(game_dict['RANKING']):
-        players_table[player_id] = new_dicts[i]
+    with StageTimer('MMR.update'):
+        update([players_table[player_id] for player_id in game_dict['RANKING']],β,max_history,min_weight_ratio)
 
     game_dict['PROCESSED'] = True
 
     return result_predicted
 
 
-def diffuse(player_dict,γ,ρ):
+def diffuse(player,γ,ρ):
     """
     Updates changes in player skill.
 
-    :param dict player_dict: Database Players row.
+    :param MMRPlayer player: Player state.
     :param float γ: Temporal diffusion [0,inf[.
     :param float ρ: 1/ρ Inverse momentum -> player ranking volatility in case of sudden level change.
     """
-    ϰ = 1 / (1 + (γ / player_dict['SKILL_DEVIATION']) ** 2)
-    wg = ϰ ** ρ * player_dict['PERF_WEIGHT'][0]
-    wl = (1 - ϰ ** ρ) * sum(player_dict['PERF_WEIGHT'])
+    ϰ = 1 / (1 + (γ / player.skill_deviation) ** 2)
+    wg = ϰ ** ρ * player.perf_weight[0]
+    wl = (1 - ϰ ** ρ) * sum(player.perf_weight)
 
-    player_dict['PERF_HISTORY'][0] = (wg * player_dict['PERF_HISTORY'][0] + wl * player_dict['SKILL']) / (wg + wl)
-    player_dict['PERF_WEIGHT'][0] = ϰ * (wg + wl)
+    # Weights may underflow to 0 with extreme momentums, the prior performance is then kept
+    if wg + wl > 0:
+        player.perf_history[0] = (wg * player.perf_history[0] + wl * player.skill) / (wg + wl)
+    player.perf_weight[0] = ϰ * (wg + wl)
 
-    for i in range(len(player_dict['PERF_WEIGHT'])):
-        player_dict['PERF_WEIGHT'][i] *= ϰ ** (1 + ρ)
-    player_dict['SKILL_DEVIATION'] *= sqrt(ϰ)
+    for i in range(len(player.perf_weight)):
+        player.perf_weight[i] *= ϰ ** (1 + ρ)
+    player.skill_deviation *= sqrt(ϰ)
 
 
-def update(players_ranking,selected_player_index,β):
+def update(players_ranking,β,max_history=MAX_PERF_HISTORY,min_weight_ratio=MIN_PERF_WEIGHT_RATIO):
     """
-    Updates the player average skill evaluation.
+    Updates the average skill evaluation of all the players of a game simultaneously.
+    The pre-game skills and deviations are snapshot once, every performance is estimated from that snapshot before
+    any player state is modified.
 
-    :param list[dict] players_ranking: List of player dicts, order corresponds to game outcome.
-    :param int selected_player_index: Index (in players_ranking) of the player to update.
+    :param list[MMRPlayer] players_ranking: List of player states, order corresponds to game outcome.
     :param float β: Performance deviation [0,inf[.
+    :param int max_history: Maximum number of performances kept in a player history (None for unbounded).
+    :param float min_weight_ratio: Performances weighing less than this ratio of the player total weight are merged into the prior term (None to never merge).
     """
-    p = getPerfEstimation(players_ranking, selected_player_index)
-    players_ranking[selected_player_index]['PERF_HISTORY'].append(p)
-    players_ranking[selected_player_index]['PERF_WEIGHT'].append(1 / β ** 2)
-
-    players_ranking[selected_player_index]['SKILL'] = getAverageSkillEstimation(players_ranking[selected_player_index],β)
-
-    return players_ranking[selected_player_index]
-
-
-def getAverageSkillEstimation(player_dict,β):
+    skills = [player.skill for player in players_ranking]
+    deviations = [player.skill_deviation for player in players_ranking]
+    with StageTimer('MMR.getPerfEstimation'):
+        if len(players_ranking) >= VECTORIZED_MIN_PLAYERS:
+            perfs = getPerfEstimations(np.array(skills),np.array(deviations)).tolist()
+        else:
+            perfs = [getPerfEstimation(skills,deviations,i) for i in range(len(players_ranking))]
+
+    with StageTimer('MMR.getAverageSkillEstimation'):
+        for player,perf in zip(players_ranking,perfs):
+            player.perf_history.append(perf)
+            player.perf_weight.append(1 / β ** 2)
+            compactPerfHistory(player,max_history,min_weight_ratio)
+            player.skill = getAverageSkillEstimation(player,β)
+
+
+def compactPerfHistory(player,max_history=MAX_PERF_HISTORY,min_weight_ratio=MIN_PERF_WEIGHT_RATIO):
+    """
+    Merges the oldest performances of a player history into the prior term (index 0), as done by Elo-MMR.
+    Weights decay identically for every performance, so the merged entries are always the oldest ones:
+    those weighing less than min_weight_ratio of the total weight, and those beyond max_history entries.
+    The merged term keeps the total weight and the weighted average of the merged performances.
+    A single tanh term only approximates the merged ones: compacted replays give different skills than exact ones
+    (compaction is opt-in, see MAX_PERF_HISTORY and MIN_PERF_WEIGHT_RATIO).
+
+    :param MMRPlayer player: Player state.
+    :param int max_history: Maximum number of performances kept in the history (None for unbounded).
+    :param float min_weight_ratio: Performances weighing less than this ratio of the total weight are merged (None to never merge).
+    """
+    perf_history = player.perf_history
+    perf_weights = player.perf_weight
+
+    merged_count = 0
+    if max_history is not None:
+        merged_count = max(0,len(perf_weights) - max(max_history,1))
+    if min_weight_ratio is not None:
+        min_weight = min_weight_ratio * sum(perf_weights)
+        while merged_count + 1 < len(perf_weights) and perf_weights[merged_count + 1] < min_weight:
+            merged_count += 1
+
+    if merged_count:
+        merged_weight = sum(perf_weights[:merged_count + 1])
+        # Weights may all underflow to 0 with extreme deviations, the prior performance is then kept
+        if merged_weight > 0:
+            perf_history[0] = sum(perf_weight * perf for perf,perf_weight in
+                                  zip(perf_history[:merged_count + 1],perf_weights[:merged_count + 1])) / merged_weight
+        perf_weights[0] = merged_weight
+        # Lists are modified in place, Players rows written from the state share them
+        del perf_history[1:merged_count + 1]
+        del perf_weights[1:merged_count + 1]
+
+
+def getAverageSkillEstimation(player,β):
     """
     Returns updated player's average skill.
 
-    :param dict player_dict: Database Players table row.
+    :param MMRPlayer player: Player state.
     :param float β: Performance deviation [0,inf[.
 
     :return: float - Player updated average skill.
     """
+    perf_history = player.perf_history
+    perf_weights = player.perf_weight
+    scale = 2 * sqrt(3) / pi * β
+    # (performance, tanh term coefficient) of every entry, computed like the bisection estimation function did
+    terms = [(perf,perf_weight * β / (sqrt(3) / pi)) for perf,perf_weight in zip(perf_history,perf_weights)]
+
     def estimationFunction(x):
-        val = player_dict['PERF_WEIGHT'][0] * (x - player_dict['PERF_HISTORY'][0])
-        for game_index,perf_weight in enumerate(player_dict['PERF_WEIGHT']):
-            val += perf_weight * β / (sqrt(3) / pi) * tanh((x - player_dict['PERF_HISTORY'][game_index]) / (2 * sqrt(3) / pi * β))
+        val = perf_weights[0] * (x - perf_history[0])
+        derivative = perf_weights[0]
+        for perf,coefficient in terms:
+            t = tanh((x - perf) / scale)
+            val += coefficient * t
+            derivative += coefficient / scale * (1 - t * t)
 
-        return val
+        return val,derivative
 
-    return findZeroBisection(estimationFunction)
+    return findZeroNewton(estimationFunction,player.skill)
 
 
-def getPerfEstimation(players_ranking,selected_player_index):
+def getPerfEstimation(skills,deviations,selected_player_index):
     """
     Returns updated player's average performance for a game.
 
-    :param list[dict] players_ranking: List of player dicts, order corresponds to game outcome.
-    :param int selected_player_index: Index (in players_ranking) of the player to update.
+    :param list[float] skills: Players pre-game skills, order corresponds to game outcome.
+    :param list[float] deviations: Players pre-game skill deviations, order corresponds to game outcome.
+    :param int selected_player_index: Index (in skills) of the player to update.
 
     :return: float - Player's game performance estimation
     """
+    # (skill, 1 / deviation, tanh scale) of every player, the selected player counts in both sums
+    terms = [(skill,1 / deviation,2 * sqrt(3) / pi * deviation) for skill,deviation in zip(skills,deviations)]
+
     def estimationFunction(x):
+        tanh_terms = [tanh((x - skill) / scale) for skill,_,scale in terms]
+        # Summed in the bisection estimation function order: saturated terms cancel exactly
         val = 0
-        for player_dict in players_ranking[0:selected_player_index+1]:
-            val += 1 / player_dict['SKILL_DEVIATION'] * (tanh((x - player_dict['SKILL']) / (2 * sqrt(3) / pi * player_dict['SKILL_DEVIATION'])) - 1)
+        for (_,inverse_deviation,_),t in zip(terms[:selected_player_index + 1],tanh_terms):
+            val += inverse_deviation * (t - 1)
+        for (_,inverse_deviation,_),t in zip(terms[selected_player_index:],tanh_terms[selected_player_index:]):
+            val += inverse_deviation * (t + 1)
+        derivative = sum(inverse_deviation / scale * (1 - t * t) for (_,inverse_deviation,scale),t in zip(terms,tanh_terms))
+        derivative += terms[selected_player_index][1] / terms[selected_player_index][2] * (1 - tanh_terms[selected_player_index] ** 2)
 
-        for player_dict in players_ranking[selected_player_index:]:
-            val += 1 / player_dict['SKILL_DEVIATION'] * (tanh((x - player_dict['SKILL']) / (2 * sqrt(3) / pi * player_dict['SKILL_DEVIATION'])) + 1)
+        return val,derivative
 
-        return val
+    return findZeroNewton(estimationFunction,skills[selected_player_index])
 
-    return findZeroBisection(estimationFunction)
+
+def getPerfEstimations(skills,deviations):
+    """
+    Returns the performance estimation of every player of a game, all equations are solved as one batched problem.
+    Equation i is the one of getPerfEstimation for selected_player_index = i:
+    sum_{j<=i}((tanh_j - 1) / σ_j) + sum_{j>=i}((tanh_j + 1) / σ_j).
+
+    :param np.ndarray skills: Players skills, order corresponds to game outcome.
+    :param np.ndarray deviations: Players skill deviations, order corresponds to game outcome.
+
+    :return: np.ndarray - Players game performance estimations.
+    """
+    inverse_deviations = 1 / deviations
+    scales = 2 * sqrt(3) / pi * deviations
+    slopes = inverse_deviations / scales
+    players_indexes = np.arange(len(skills))
+
+    def estimationFunction(x,indexes):
+        # tanh_kj: performance of equation indexes[k] evaluated against player j
+        t = np.tanh((x[:,np.newaxis] - skills) / scales)
+        t_selected = t[np.arange(len(indexes)),indexes]
+        # Saturated terms are exactly 0, like in getPerfEstimation
+        values = np.where(players_indexes <= indexes[:,np.newaxis],inverse_deviations * (t - 1),0).sum(axis=1) \
+               + np.where(players_indexes >= indexes[:,np.newaxis],inverse_deviations * (t + 1),0).sum(axis=1)
+        derivatives = (1 - t * t) @ slopes + slopes[indexes] * (1 - t_selected * t_selected)
+
+        return values,derivatives
+
+    return findZerosNewton(estimationFunction,skills)
 
 
 def createGame(games_table,players_table,game_id,game_date,game_ranking):
@@ -191,27 +311,82 @@ def createGame(games_table,players_table,game_id,game_date,game_ranking):
         players_table[player_id]['GAMES'].append(game_id)
 
 
-def optimizeHyperparametersBayesian(sport,category):
-    db_path = getDBPath(sport,category,'defaultMMR-FFA.json')
-    games_ordered_ids = orderGamesTable(getJsonObject(db_path)['GAMES'])
+def createPlayer(players_table,player_id):
+    """
+    Creates a new player dict in the Players table, with default skill and deviation.
+
+    :param dict players_table: Database Players table.
+    :param str player_id: Player (unique) id.
+    """
+    players_table[player_id] = {
+    'ID':player_id,
+    'SKILL':START_SKILL,
+    'SKILL_DEVIATION':START_DEVIATION,
+    'PERF_HISTORY':[START_SKILL],
+    'PERF_WEIGHT':[1 / START_DEVIATION],
+    'GAMES':[]
+    }
+
+
+def createPlayerState(player_id):
+    """
+    Creates a new player state, with default skill and deviation.
+
+    :param str player_id: Player (unique) id.
+
+    :return: MMRPlayer - New player state.
+    """
+    return MMRPlayer(player_id,START_SKILL,START_DEVIATION,[START_SKILL],[1 / START_DEVIATION])
+
+
+def runTrials(study,n_trials,db_path):
+    """
+    Runs MMR configuration trials of a study in the current process.
+
+    :param optuna.Study study: Hyperparameters study.
+    :param int n_trials: Number of configurations to evaluate.
+    :param path db_path: Absolute path to the database.
+    """
+    # Optimization modules are imported on first use, replaying or predicting never needs optuna
+    from ranking.optimization import getPruningCallback
+
+    # Parsed once per process, every trial processes fresh copies of the pristine tables
+    dataset = getDataset(db_path)
 
     def objective(trial):
         γ = trial.suggest_float('γ',1e-6,50)
         β = trial.suggest_float('β',1e-6,50)
         ρ = trial.suggest_float('ρ',1e-6,10000)
-        gambible_db = getJsonObject(db_path)
-        success_rate = processGames(db_path,gambible_db['GAMES'],gambible_db['PLAYERS'],γ,β,ρ,False,games_ordered_ids)
+        games_table,players_table = dataset.getFreshTables()
+        success_rate = processGames(db_path,games_table,players_table,γ,β,ρ,False,dataset.games_ordered_ids,
+                                    checkpoint_callback=getPruningCallback(trial))
 
         return success_rate
 
-    study_name = f"{sport} MMR-{category} configuration"
-    configuration_db_path = f"sqlite:///{getDBPath(sport,category,'configurationMMR.db',False)}"
+    study.optimize(objective,n_trials=n_trials)
 
-    try:
-        study = load_study(study_name=study_name,storage=configuration_db_path)
-    except:
-        study = create_study(direction='maximize',study_name=study_name,storage=configuration_db_path)
 
-    print(study.best_params,study.best_value)
+def optimizeHyperparametersBayesian(sport,category,n_trials=1000,n_workers=1,journal=False,pruning=True):
+    """
+    Hyperparemeter optimization algorithm, tests a large number of configurations and logs the succes rate into database.
+
+    :param str sport: Sport name (must correspond to existing folder).
+    :param str category: Category name (must correspond to existing folder).
+    :param int n_trials: Number of configurations to evaluate.
+    :param int n_workers: Number of worker processes sharing the study storage.
+    :param bool journal: Store the study in a journal file (configurationMMR.log) instead of the SQLite database.
+    :param bool pruning: States if unpromising configurations are abandoned at chronological checkpoints.
+
+    :return: float - Throughput in trials per second.
+    """
+    from ranking.optimization import optimizeStudy
+    logging.info('Starting MMR algorithm hyperparameter optimization')
+
+    db_path = getDBPath(sport,category,'defaultMMR-FFA.json')
+    # Parsed before the workers are forked, they share it read-only
+    getDataset(db_path)
+
+    study_name = f"{sport} MMR-{category} configuration"
+    storage_path = getDBPath(sport,category,'configurationMMR.log' if journal else 'configurationMMR.db',False)
 
-    study.optimize(objective,n_trials=1000)
+    return optimizeStudy(study_name,storage_path,partial(runTrials,db_path=db_path),n_trials,n_workers,journal,pruning)
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+'''
+Project : GamBible
+Package: Ranking
+Module:  PlayerLookup
+Version: 2.0
+Usage: Players ids search index, built once per database load and shared by every search bar and completer.
+Ids are searched through accent and case insensitive keys ('Räikkönen' and 'raikkonen' have the same key): a sorted
+keys array answers prefix queries, an n-grams index answers substring and fuzzy queries.
+
+Author: BoxBoxJason
+Date: 17/10/2026
+'''
+import unicodedata
+from bisect import bisect_left
+import numpy as np
+
+# Length of the indexed n-grams
+NGRAM_SIZE = 3
+# Default number of suggestions returned for a search text
+SUGGESTIONS_LIMIT = 20
+# Minimum n-grams similarity (shared n-grams / distinct n-grams of both keys) of a fuzzy match
+MIN_SIMILARITY = 0.3
+# Posting list of the n-grams absent from the index
+EMPTY_POSTING_LIST = np.empty(0,dtype=np.int32)
+
+class PlayerLookup:
+    """
+    Players ids search index.
+
+    :ivar list[str] players_ids: Indexed players ids.
+    """
+    def __init__(self,players_ids):
+        """
+        Constructor for PlayerLookup, builds the indexes.
+
+        :param iterable[str] players_ids: Players ids (a Players table can be given directly).
+        """
+        self.players_ids = list(players_ids)
+        self.__keys = [normalizeName(player_id) for player_id in self.players_ids]
+        self.__indexes = {player_id:index for index,player_id in enumerate(self.players_ids)}
+
+        # Prefix index: keys sorted once, prefix queries are binary searches
+        self.__sorted_indexes = sorted(range(len(self.__keys)),key=self.__keys.__getitem__)
+        self.__sorted_keys = [self.__keys[index] for index in self.__sorted_indexes]
+        # Players indexes by key, a key may be shared by several ids
+        self.__keys_indexes = {}
+        for index,key in enumerate(self.__keys):
+            self.__keys_indexes.setdefault(key,[]).append(index)
+
+        # N-grams index: posting lists of players indexes (increasing) by n-gram
+        ngrams = {}
+        ngrams_counts = []
+        for index,key in enumerate(self.__keys):
+            key_ngrams = getNgrams(key)
+            ngrams_counts.append(len(key_ngrams))
+            for ngram in key_ngrams:
+                ngrams.setdefault(ngram,[]).append(index)
+        self.__ngrams = {ngram:np.array(posting_list,dtype=np.int32) for ngram,posting_list in ngrams.items()}
+        self.__ngrams_counts = np.array(ngrams_counts,dtype=np.int32)
+
+
+    def __len__(self):
+        return len(self.players_ids)
+
+
+    def __contains__(self,player_id):
+        return player_id in self.__indexes
+
+
+    def resolve(self,text):
+        """
+        Returns the player id designated by a search text: the text itself if it is an id, else the only id with the
+        same accent and case insensitive key.
+
+        :param str text: Search text.
+
+        :return: str - Player id (None if no player or several players match).
+        """
+        text = text.strip()
+        if text in self.__indexes:
+            return text
+        indexes = self.__keys_indexes.get(normalizeName(text),())
+        if len(indexes) == 1:
+            return self.players_ids[indexes[0]]
+        return None
+
+
+    def searchPrefix(self,text,limit=None):
+        """
+        Returns the players ids whose key starts with the text key.
+
+        :param str text: Search text.
+        :param int limit: Maximum number of returned ids (None for all).
+
+        :return: list[str] - Matching players ids, in keys order.
+        """
+        prefix = normalizeName(text.strip())
+        matches = []
+        position = bisect_left(self.__sorted_keys,prefix)
+        while position < len(self.__sorted_keys) and self.__sorted_keys[position].startswith(prefix):
+            if limit is not None and len(matches) >= limit:
+                break
+            matches.append(self.players_ids[self.__sorted_indexes[position]])
+            position += 1
+        return matches
+
+
+    def searchSubstring(self,text):
+        """
+        Returns the players ids whose key contains the text key. Candidates are the intersection of the text n-grams
+        posting lists, only texts shorter than an n-gram are searched by scanning the keys.
+
+        :param str text: Search text.
+
+        :return: list[str] - Matching players ids, in players_ids order.
+        """
+        substring = normalizeName(text.strip())
+        if len(substring) < NGRAM_SIZE:
+            return [self.players_ids[index] for index,key in enumerate(self.__keys) if substring in key]
+
+        # Smallest posting lists first, the intersection shrinks as fast as possible
+        posting_lists = sorted((self.__ngrams.get(ngram,EMPTY_POSTING_LIST) for ngram in getNgrams(substring,False)),key=len)
+        candidates = posting_lists[0]
+        for posting_list in posting_lists[1:]:
+            if len(candidates) == 0:
+                break
+            candidates = np.intersect1d(candidates,posting_list,assume_unique=True)
+        return [self.players_ids[index] for index in candidates.tolist() if substring in self.__keys[index]]
+
+
+    def searchFuzzy(self,text,limit=SUGGESTIONS_LIMIT,min_similarity=MIN_SIMILARITY):
+        """
+        Returns the players ids whose key shares the most n-grams with the text key (typos and missing letters
+        tolerant).
+
+        :param str text: Search text.
+        :param int limit: Maximum number of returned ids.
+        :param float min_similarity: Minimum n-grams similarity of a match [0,1].
+
+        :return: list[str] - Matching players ids, most similar first.
+        """
+        text_ngrams = getNgrams(normalizeName(text.strip()))
+        posting_lists = [self.__ngrams[ngram] for ngram in text_ngrams if ngram in self.__ngrams]
+        if not posting_lists:
+            return []
+        shared_counts = np.bincount(np.concatenate(posting_lists),minlength=len(self.players_ids))
+        similarities = shared_counts / (len(text_ngrams) + self.__ngrams_counts - shared_counts)
+
+        matches = np.flatnonzero(similarities >= min_similarity)
+        if len(matches) > limit:
+            matches = matches[np.argpartition(-similarities[matches],limit - 1)[:limit]]
+        # Most similar first, ties in keys order
+        return [self.players_ids[index] for index in sorted(matches.tolist(),key=lambda index: (-similarities[index],self.__keys[index]))]
+
+
+    def suggest(self,text,limit=SUGGESTIONS_LIMIT):
+        """
+        Returns completion suggestions for a search text: prefix matches first, completed by fuzzy matches.
+
+        :param str text: Search text.
+        :param int limit: Maximum number of returned ids.
+
+        :return: list[str] - Suggested players ids.
+        """
+        suggestions = self.searchPrefix(text,limit)
+        if len(suggestions) < limit:
+            suggested_ids = set(suggestions)
+            for player_id in self.searchFuzzy(text,limit):
+                if player_id not in suggested_ids:
+                    suggestions.append(player_id)
+                    if len(suggestions) >= limit:
+                        break
+        return suggestions
+
+
+def normalizeName(name):
+    """
+    Returns the search key of a name: case folded, without accents.
+
+    :param str name: Player id or search text.
+
+    :return: str - Search key.
+    """
+    decomposed_name = unicodedata.normalize('NFKD',name.casefold())
+    return ''.join(character for character in decomposed_name if not unicodedata.combining(character))
+
+
+def getNgrams(key,padded=True):
+    """
+    Returns the distinct n-grams of a key.
+
+    :param str key: Search key.
+    :param bool padded: Pads the key with spaces, so that its first and last letters weigh as much as the others.
+
+    :return: set[str] - Key n-grams.
+    """
+    if padded:
+        key = f"{' ' * (NGRAM_SIZE - 1)}{key} "
+    return {key[i:i + NGRAM_SIZE] for i in range(len(key) - NGRAM_SIZE + 1)}
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+'''
+Project : GamBible
+Package: Ranking
+Module:  PlayerState
+Version: 2.0
+Usage: Compact player states used by the ranking algorithms during replays in place of the database Players rows.
+States are slotted objects (no per-instance dict), converted from and back to the JSON layout at the replay bounds.
+States share their mutable values (games lists, histories) with the Players rows: a replay updates the rows values
+in place, like the rows themselves were updated, and converting a table never copies it.
+
+Author: BoxBoxJason
+Date: 17/10/2026
+'''
+
+class ELOPlayer:
+    """
+    ELO player state.
+
+    :ivar str id: Player id.
+    :ivar float elo: Player ELO.
+    :ivar list[str] games: Ids of the games played.
+    :ivar dict fav_terrain: Results by terrain ({terrain:{'WIN':int,'LOSS':int,'DRAW':int}}).
+    """
+    __slots__ = ('id','elo','games','fav_terrain')
+
+    def __init__(self,player_id,elo,games=None,fav_terrain=None):
+        """
+        Constructor for ELOPlayer.
+
+        :param str player_id: Player id.
+        :param float elo: Player ELO.
+        :param list[str] games: Ids of the games played.
+        :param dict fav_terrain: Results by terrain.
+        """
+        self.id = player_id
+        self.elo = elo
+        self.games = games if games is not None else []
+        self.fav_terrain = fav_terrain if fav_terrain is not None else {}
+
+
+    @classmethod
+    def fromDict(cls,player_dict):
+        """
+        Converts a Players row, mutable values are shared with the row.
+
+        :param dict player_dict: Database Players row.
+
+        :return: ELOPlayer - Player state.
+        """
+        return cls(player_dict['ID'],player_dict['ELO'],player_dict['GAMES'],player_dict['FAV_TERRAIN'])
+
+
+    def toDict(self):
+        """
+        :return: dict - Database Players row (values are shared with the state).
+        """
+        return {'ID':self.id,'ELO':self.elo,'GAMES':self.games,'FAV_TERRAIN':self.fav_terrain}
+
+
+class MMRPlayer:
+    """
+    MMR player state.
+
+    :ivar str id: Player id.
+    :ivar float skill: Player average skill.
+    :ivar float skill_deviation: Player skill deviation.
+    :ivar list[float] perf_history: Player performances, index 0 is the prior term.
+    :ivar list[float] perf_weight: Weights of the performances.
+    :ivar list[str] games: Ids of the games played.
+    """
+    __slots__ = ('id','skill','skill_deviation','perf_history','perf_weight','games')
+
+    def __init__(self,player_id,skill,skill_deviation,perf_history,perf_weight,games=None):
+        """
+        Constructor for MMRPlayer.
+
+        :param str player_id: Player id.
+        :param float skill: Player average skill.
+        :param float skill_deviation: Player skill deviation.
+        :param list[float] perf_history: Player performances, index 0 is the prior term.
+        :param list[float] perf_weight: Weights of the performances.
+        :param list[str] games: Ids of the games played.
+        """
+        self.id = player_id
+        self.skill = skill
+        self.skill_deviation = skill_deviation
+        self.perf_history = perf_history
+        self.perf_weight = perf_weight
+        self.games = games if games is not None else []
+
+
+    @classmethod
+    def fromDict(cls,player_dict):
+        """
+        Converts a Players row, mutable values are shared with the row.
+
+        :param dict player_dict: Database Players row.
+
+        :return: MMRPlayer - Player state.
+        """
+        return cls(player_dict['ID'],player_dict['SKILL'],player_dict['SKILL_DEVIATION'],player_dict['PERF_HISTORY'],
+                   player_dict['PERF_WEIGHT'],player_dict['GAMES'])
+
+
+    def toDict(self):
+        """
+        :return: dict - Database Players row (values are shared with the state).
+        """
+        return {'ID':self.id,'SKILL':self.skill,'SKILL_DEVIATION':self.skill_deviation,'PERF_HISTORY':self.perf_history,
+                'PERF_WEIGHT':self.perf_weight,'GAMES':self.games}
+
+
+def getPlayersStates(players_table,player_class):
+    """
+    Converts a Players table to player states.
+
+    :param dict players_table: Database Players table.
+    :param type player_class: Player state class (ELOPlayer or MMRPlayer).
+
+    :return: dict - Player states by player id.
+    """
+    return {player_id:player_class.fromDict(player_dict) for player_id,player_dict in players_table.items()}
+
+
+def writePlayersStates(players_table,players_states):
+    """
+    Writes player states back to a Players table, rows are updated in place. Row fields unknown to the states are kept.
+
+    :param dict players_table: Database Players table.
+    :param dict players_states: Player states by player id.
+    """
+    for player_id,player_state in players_states.items():
+        player_dict = players_table.get(player_id)
+        if player_dict is None:
+            players_table[player_id] = player_state.toDict()
+        else:
+            player_dict.update(player_state.toDict())
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*-
+'''
+Project : GamBible
+Package: Ranking
+Module:  Simulation
+Version: 2.0
+Usage: Monte-Carlo outcome simulations from the current ratings. Free-for-all races sample the players performances
+from the MMR logistic model, single elimination brackets draw every game from the ELO win probabilities.
+Simulations run by batches of NumPy arrays and can be split across processes for large fields.
+
+Author: BoxBoxJason
+Date: 17/10/2026
+'''
+import multiprocessing
+from math import sqrt,pi
+import numpy as np
+from ranking import ELO,MMR
+
+# Default number of simulated races or brackets
+SIMULATIONS_COUNT = 100_000
+# Maximum number of array elements (simulations x players) held by a simulation batch
+BATCH_ELEMENTS = 2_000_000
+
+def simulateRace(players_table,players_ids,β,n_simulations=SIMULATIONS_COUNT,n_workers=1,seed=None):
+    """
+    Simulates a free-for-all race. Each player performance is sampled from the MMR logistic model: centered on the
+    player skill, with the standard deviation sqrt(skill_deviation ** 2 + β ** 2).
+    Players missing from the table are rated like new players.
+
+    :param dict players_table: Database Players table (MMR).
+    :param list[str] players_ids: Race participants ids.
+    :param float β: Performance deviation [0,inf[.
+    :param int n_simulations: Number of simulated races.
+    :param int n_workers: Number of processes running the simulations.
+    :param int seed: Random generator seed (None for a random one).
+
+    :return: np.ndarray - Finishing positions distribution: [i,k] is the probability that players_ids[i] finishes k + 1th.
+    """
+    if not players_ids:
+        raise ValueError('A race needs at least one player')
+    skills = np.array([players_table[player_id]['SKILL'] if player_id in players_table else MMR.START_SKILL
+                       for player_id in players_ids],dtype=np.float64)
+    deviations = np.array([players_table[player_id]['SKILL_DEVIATION'] if player_id in players_table else MMR.START_DEVIATION
+                           for player_id in players_ids],dtype=np.float64)
+    # Logistic distribution scale of a given standard deviation
+    scales = sqrt(3) / pi * np.sqrt(deviations ** 2 + β ** 2)
+
+    counts = _runSimulations(_simulateRaces,(skills,scales),n_simulations,n_workers,seed)
+    return counts / n_simulations
+
+
+def simulateBracket(players_table,draw,n_simulations=SIMULATIONS_COUNT,n_workers=1,seed=None):
+    """
+    Simulates a single elimination tournament. Draw neighbours meet in the first round, then the winners of
+    neighbour games, and so on. Every game is won according to the ELO win probability.
+    Players missing from the table are rated like new players.
+
+    :param dict players_table: Database Players table (ELO).
+    :param list[str] draw: Players ids in draw order (power of two length), None for a bye.
+    :param int n_simulations: Number of simulated tournaments.
+    :param int n_workers: Number of processes running the simulations.
+    :param int seed: Random generator seed (None for a random one).
+
+    :return: tuple[list[str],np.ndarray] - Drawn players ids and their finishing positions distribution: [i,k] is the
+    probability that the ith player finishes in the kth positions group (winner, finalist, semi-finalists, ...).
+    """
+    rounds_count = len(draw).bit_length() - 1
+    if len(draw) < 2 or len(draw) != 2 ** rounds_count:
+        raise ValueError(f"Draw size must be a power of two, got {len(draw)} players")
+
+    players_ids = [player_id for player_id in draw if player_id is not None]
+    # Byes get the last index: they lose every game and are removed from the distribution
+    bye_index = len(players_ids)
+    positions = iter(range(bye_index))
+    draw_indexes = np.array([bye_index if player_id is None else next(positions) for player_id in draw],dtype=np.intp)
+
+    elos = np.array([players_table[player_id]['ELO'] if player_id in players_table else ELO.START_ELO
+                     for player_id in players_ids],dtype=np.float64)
+    win_probabilities = np.zeros((bye_index + 1,bye_index + 1))
+    win_probabilities[:bye_index,:bye_index] = ELO.getWinProbabilities(elos[:,np.newaxis],elos[np.newaxis,:])
+    win_probabilities[:bye_index,bye_index] = 1
+
+    counts = _runSimulations(_simulateBrackets,(draw_indexes,win_probabilities),n_simulations,n_workers,seed)
+    return players_ids,counts[:bye_index] / n_simulations
+
+
+def _runSimulations(simulate,arguments,n_simulations,n_workers,seed):
+    """
+    Runs a simulation function, split across worker processes. Each worker gets an independent random stream.
+
+    :param function simulate: (*arguments,n_simulations,seed_sequence) -> np.ndarray, returns outcomes counts.
+    :param tuple arguments: Simulation function arguments.
+    :param int n_simulations: Total number of simulations.
+    :param int n_workers: Number of processes.
+    :param int seed: Random generator seed (None for a random one).
+
+    :return: np.ndarray - Summed outcomes counts.
+    """
+    n_workers = max(1,min(n_workers,n_simulations))
+    seed_sequences = np.random.SeedSequence(seed).spawn(n_workers)
+    workers_simulations = [n_simulations // n_workers + (worker < n_simulations % n_workers) for worker in range(n_workers)]
+    if n_workers == 1:
+        return simulate(*arguments,n_simulations,seed_sequences[0])
+
+    start_method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+    with multiprocessing.get_context(start_method).Pool(n_workers) as pool:
+        workers_counts = pool.starmap(simulate,[(*arguments,worker_simulations,seed_sequence) for worker_simulations,seed_sequence
+                                                in zip(workers_simulations,seed_sequences)])
+    return sum(workers_counts)
+
+
+def _simulateRaces(skills,scales,n_simulations,seed_sequence):
+    """
+    Simulates races by batches.
+
+    :param np.ndarray skills: Players performances means.
+    :param np.ndarray scales: Players performances logistic scales.
+    :param int n_simulations: Number of simulated races.
+    :param np.random.SeedSequence seed_sequence: Random stream seed.
+
+    :return: np.ndarray - Finishing positions counts: [i,k] is the number of races player i finished k + 1th.
+    """
+    generator = np.random.default_rng(seed_sequence)
+    players_count = len(skills)
+    batch_size = max(1,BATCH_ELEMENTS // players_count)
+    position_offsets = np.arange(players_count)
+    counts = np.zeros(players_count * players_count,dtype=np.int64)
+    for start in range(0,n_simulations,batch_size):
+        performances = generator.logistic(skills,scales,(min(batch_size,n_simulations - start),players_count))
+        # order[s,k]: player finishing k + 1th of simulation s
+        order = np.argsort(-performances,axis=1)
+        counts += np.bincount((order * players_count + position_offsets).ravel(),minlength=players_count * players_count)
+    return counts.reshape(players_count,players_count)
+
+
+def _simulateBrackets(draw_indexes,win_probabilities,n_simulations,seed_sequence):
+    """
+    Simulates single elimination tournaments by batches.
+
+    :param np.ndarray draw_indexes: Players indexes in draw order.
+    :param np.ndarray win_probabilities: [i,j] is the probability that player i beats player j.
+    :param int n_simulations: Number of simulated tournaments.
+    :param np.random.SeedSequence seed_sequence: Random stream seed.
+
+    :return: np.ndarray - Finishing positions groups counts: [i,k] is the number of tournaments player i finished in
+    the kth group (0 for the winner, 1 for the finalist, 2 for the semi-finalists, ...).
+    """
+    generator = np.random.default_rng(seed_sequence)
+    players_count = len(win_probabilities)
+    rounds_count = len(draw_indexes).bit_length() - 1
+    batch_size = max(1,BATCH_ELEMENTS // len(draw_indexes))
+    counts = np.zeros(players_count * (rounds_count + 1),dtype=np.int64)
+    for start in range(0,n_simulations,batch_size):
+        remaining = np.broadcast_to(draw_indexes,(min(batch_size,n_simulations - start),len(draw_indexes)))
+        for round_index in range(rounds_count):
+            players1 = remaining[:,0::2]
+            players2 = remaining[:,1::2]
+            players1_won = generator.random(players1.shape) < win_probabilities[players1,players2]
+            losers = np.where(players1_won,players2,players1)
+            remaining = np.where(players1_won,players1,players2)
+            # Losers of the first round finish in the last group
+            counts += np.bincount((losers * (rounds_count + 1) + rounds_count - round_index).ravel(),
+                                  minlength=len(counts))
+        counts += np.bincount(remaining.ravel() * (rounds_count + 1),minlength=len(counts))
+    return counts.reshape(players_count,rounds_count + 1)
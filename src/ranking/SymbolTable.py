@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+'''
+Project : GamBible
+Package: Ranking
+Module:  SymbolTable
+Version: 2.0
+Usage: Interning of players and games ids. External string ids are mapped to dense integers, so that tables keyed by
+integers can be copied and hashed cheaply. Only the optimization datasets (DatasetCache) are interned, because only
+their tables are copied once per trial: the processing paths (ELO.processGame, MMR.update, PlayerState, GameStream)
+work on the tables of the databases files and of the widgets, and keep their string ids.
+
+Author: BoxBoxJason
+Date: 17/10/2026
+'''
+
+class SymbolTable:
+    """
+    Two-way mapping between external string ids and dense integers (0 to len - 1, in interning order).
+
+    :ivar list[str] symbols: Interned strings, the position in the list is the integer id.
+    """
+    def __init__(self,symbols=None):
+        """
+        Constructor for SymbolTable.
+
+        :param iterable[str] symbols: Strings to intern, in order.
+        """
+        self.symbols = []
+        self.__indexes = {}
+        for symbol in symbols or ():
+            self.intern(symbol)
+
+
+    def __len__(self):
+        return len(self.symbols)
+
+
+    def __contains__(self,symbol):
+        return symbol in self.__indexes
+
+
+    def intern(self,symbol):
+        """
+        Returns the integer id of a string, a new id is allocated if the string is unknown.
+
+        :param str symbol: External string id.
+
+        :return: int - Integer id.
+        """
+        index = self.__indexes.get(symbol)
+        if index is None:
+            index = len(self.symbols)
+            self.__indexes[symbol] = index
+            self.symbols.append(symbol)
+        return index
+
+
+    def getIndex(self,symbol):
+        """
+        :param str symbol: Interned string id.
+
+        :return: int - Integer id (raises KeyError if the string was never interned).
+        """
+        return self.__indexes[symbol]
+
+
+    def getSymbol(self,index):
+        """
+        :param int index: Integer id.
+
+        :return: str - External string id.
+        """
+        return self.symbols[index]
+
+
+def internDatabase(database,players_symbols=None,games_symbols=None):
+    """
+    Converts a database to integer ids: tables keys, ID fields, players GAMES lists and games WINNER_ID, LOSER_ID and
+    RANKING fields. Other values are shared with the source database.
+
+    :param dict database: {'GAMES':games_table,'PLAYERS':players_table} database with string ids.
+    :param SymbolTable players_symbols: Players symbol table to extend (new one if None).
+    :param SymbolTable games_symbols: Games symbol table to extend (new one if None).
+
+    :return: tuple[dict,SymbolTable,SymbolTable] - Interned database, players and games symbol tables.
+    """
+    if players_symbols is None:
+        players_symbols = SymbolTable()
+    if games_symbols is None:
+        games_symbols = SymbolTable()
+    games_table = database.get('GAMES',{})
+    players_table = database.get('PLAYERS',{})
+    # Tables order gives the ids, whatever the order they are referenced in
+    for game_id in games_table:
+        games_symbols.intern(game_id)
+    for player_id in players_table:
+        players_symbols.intern(player_id)
+
+    interned_games_table = {}
+    for game_id,game_dict in games_table.items():
+        game_dict = dict(game_dict,ID=games_symbols.intern(game_id))
+        if 'RANKING' in game_dict:
+            game_dict['RANKING'] = [players_symbols.intern(player_id) for player_id in game_dict['RANKING']]
+        else:
+            game_dict['WINNER_ID'] = players_symbols.intern(game_dict['WINNER_ID'])
+            game_dict['LOSER_ID'] = players_symbols.intern(game_dict['LOSER_ID'])
+        interned_games_table[game_dict['ID']] = game_dict
+
+    interned_players_table = {}
+    for player_id,player_dict in players_table.items():
+        player_dict = dict(player_dict,ID=players_symbols.intern(player_id))
+        player_dict['GAMES'] = [games_symbols.intern(game_id) for game_id in player_dict['GAMES']]
+        interned_players_table[player_dict['ID']] = player_dict
+
+    return {'GAMES':interned_games_table,'PLAYERS':interned_players_table},players_symbols,games_symbols
+
@@ -10,7 +10,11 @@ Author: BoxBoxJason
 Date: 20/11/2023
 '''
 
-from matplotlib.pyplot import savefig,figure,show,Normalize
+from resources.instrumentation import StageTimer
+from resources.utils import parseGameDate
+
+# Default number of chronological checkpoints at which intermediate success rates are reported
+CHECKPOINTS = 10
 
 def orderGamesTable(games_table):
     """
@@ -20,11 +24,39 @@ def orderGamesTable(games_table):
 
     :return: list[dict] - Games dictionaries list ordered by date.
     """
-    games_table_list = list(games_table.values())
+    with StageTimer('orderGamesTable'):
+        games_table_list = list(games_table.values())
+
+        games_table_list.sort(key=getGameSortKey)
+
+        return [game_dict['ID'] for game_dict in games_table_list]
+
+
+def getGameSortKey(game_dict):
+    """
+    Returns the key games are chronologically sorted by, shared by in-memory tables and on-disk games streams.
+
+    :param dict game_dict: Game dict.
+
+    :return: str - Game sort key (parsed date).
+    """
+    return parseGameDate(game_dict['DATE'])
 
-    games_table_list.sort(key = lambda x : x['DATE'])
 
-    return [game_dict['ID'] for game_dict in games_table_list]
+def getCheckpointBounds(games_count,checkpoints=CHECKPOINTS):
+    """
+    Splits a chronological games sequence into consecutive chunks, one per checkpoint.
+
+    :param int games_count: Number of games in the sequence.
+    :param int checkpoints: Number of checkpoints (the last one is the end of the sequence).
+
+    :return: list[tuple[int,int]] - (start,end) games indexes of each chunk.
+    """
+    if games_count == 0:
+        return []
+    checkpoints = max(1,min(checkpoints,games_count))
+    ends = [games_count * (checkpoint + 1) // checkpoints for checkpoint in range(checkpoints)]
+    return list(zip([0] + ends[:-1],ends))
 
 
 def orderConfigurationsTable(configurations_table):
@@ -49,6 +81,9 @@ def plotSuccessRate(config_table,X_key,Y_key):
     :param str x_key: Config table x axis key.
     :param str y_key: Config table y axis key.
     """
+    # Imported on first plot, matplotlib is only needed by this function
+    from matplotlib.pyplot import savefig,figure,show,Normalize
+
     X_ticks_list = []
     Y_ticks_list = []
     Z_ticks_list = []
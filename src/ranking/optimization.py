@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+'''
+Project : GamBible
+Package: Ranking
+Module:  optimization
+Version: 2.0
+Usage: Hyperparameter optimization helpers shared by ranking algorithms: study storage and multi-process execution.
+
+Author: BoxBoxJason
+Date: 17/10/2026
+'''
+import logging
+import time
+import multiprocessing
+import optuna
+from optuna.trial import TrialState
+
+# Seconds a worker waits for the SQLite lock before failing
+SQLITE_TIMEOUT = 60
+# Number of completed trials before the pruner starts stopping trials
+PRUNER_STARTUP_TRIALS = 10
+# States of the trials counted as evaluated configurations
+FINISHED_STATES = (TrialState.COMPLETE,TrialState.PRUNED)
+
+def getStorage(storage_path,journal=False):
+    """
+    Returns the optuna storage of a configuration database.
+
+    :param path storage_path: Absolute path to the storage file.
+    :param bool journal: Use a journal file storage (better suited to concurrent writers) instead of SQLite.
+
+    :return: optuna.storages.BaseStorage - Study storage.
+    """
+    if journal:
+        try:
+            from optuna.storages.journal import JournalFileBackend
+        except ImportError: # optuna < 4.0
+            from optuna.storages import JournalFileStorage as JournalFileBackend
+        return optuna.storages.JournalStorage(JournalFileBackend(storage_path))
+
+    return optuna.storages.RDBStorage(f"sqlite:///{storage_path}",engine_kwargs={'connect_args':{'timeout':SQLITE_TIMEOUT}})
+
+
+def getPruner(pruning=True):
+    """
+    Returns the pruner used by the studies: trials whose intermediate success rate is under the median of previous
+    trials at the same checkpoint are stopped.
+
+    :param bool pruning: States if trials can be pruned.
+
+    :return: optuna.pruners.BasePruner - Study pruner.
+    """
+    if pruning:
+        return optuna.pruners.MedianPruner(n_startup_trials=PRUNER_STARTUP_TRIALS)
+    return optuna.pruners.NopPruner()
+
+
+def getPruningCallback(trial):
+    """
+    Returns a processGames checkpoint callback reporting intermediate success rates to the trial pruner.
+
+    :param optuna.Trial trial: Evaluated trial.
+
+    :return: function - (processed_games,success_rate) -> None, raises optuna.TrialPruned if the trial should stop.
+    """
+    def pruningCallback(processed_games,success_rate):
+        trial.report(success_rate,processed_games)
+        if trial.should_prune():
+            raise optuna.TrialPruned(f"Pruned after {processed_games} games")
+
+    return pruningCallback
+
+
+def loadOrCreateStudy(study_name,storage,pruner=None):
+    """
+    Loads a study from its storage, creates it if it does not exist.
+
+    :param str study_name: Study name.
+    :param optuna.storages.BaseStorage storage: Study storage.
+    :param optuna.pruners.BasePruner pruner: Study pruner (pruners are not stored, they are set on every load).
+
+    :return: optuna.Study - Loaded study.
+    """
+    try:
+        study = optuna.load_study(study_name=study_name,storage=storage,pruner=pruner)
+    except KeyError:
+        study = optuna.create_study(direction='maximize',study_name=study_name,storage=storage,pruner=pruner)
+
+    return study
+
+
+def optimizeStudy(study_name,storage_path,run_trials,n_trials,n_workers=1,journal=False,pruning=True):
+    """
+    Runs n_trials trials of a study, split between n_workers processes sharing the study storage.
+    Workers are forked when possible so that they share the already parsed datasets. Raises RuntimeError if a worker
+    process failed.
+
+    :param str study_name: Study name.
+    :param path storage_path: Absolute path to the storage file.
+    :param function run_trials: (study,n_trials) -> None, runs trials in the current process (must be picklable).
+    :param int n_trials: Total number of trials.
+    :param int n_workers: Number of worker processes.
+    :param bool journal: Use a journal file storage instead of SQLite.
+    :param bool pruning: States if unpromising trials are stopped early.
+
+    :return: float - Throughput in trials per second, counted from the trials finished (completed or pruned) in the
+    study storage.
+    """
+    pruner = getPruner(pruning)
+    # Created once by the parent process, workers only load it
+    study = loadOrCreateStudy(study_name,getStorage(storage_path,journal),pruner)
+    n_workers = max(1,min(n_workers,n_trials))
+    previous_trials = len(study.get_trials(deepcopy=False,states=FINISHED_STATES))
+
+    failed_workers = 0
+    start_time = time.perf_counter()
+    if n_workers == 1:
+        run_trials(study,n_trials)
+    else:
+        start_method = 'fork' if 'fork' in multiprocessing.get_all_start_methods() else 'spawn'
+        context = multiprocessing.get_context(start_method)
+        workers = [context.Process(target=_runWorker,args=(study_name,storage_path,journal,pruner,run_trials,
+                                                           n_trials // n_workers + (worker_index < n_trials % n_workers)))
+                   for worker_index in range(n_workers)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        failed_workers = sum(1 for worker in workers if worker.exitcode != 0)
+    elapsed_time = time.perf_counter() - start_time
+    finished_trials = len(study.get_trials(deepcopy=False,states=FINISHED_STATES)) - previous_trials
+    if failed_workers:
+        raise RuntimeError(f"{failed_workers}/{n_workers} optimization workers failed, {finished_trials}/{n_trials} trials finished")
+
+    throughput = finished_trials / elapsed_time if elapsed_time > 0 else 0
+    logging.info(f"{study_name}: {finished_trials} trials on {n_workers} worker(s) in {elapsed_time:.2f}s ({throughput:.2f} trials/s)")
+    try:
+        logging.info(f"{study_name}: best success rate {study.best_value} with {study.best_params}")
+    except ValueError: # No completed trial
+        pass
+
+    return throughput
+
+
+def _runWorker(study_name,storage_path,journal,pruner,run_trials,n_trials):
+    """
+    Worker process entry point, connects to the shared storage and runs its share of trials.
+
+    :param str study_name: Study name.
+    :param path storage_path: Absolute path to the storage file.
+    :param bool journal: Use a journal file storage instead of SQLite.
+    :param optuna.pruners.BasePruner pruner: Study pruner.
+    :param function run_trials: (study,n_trials) -> None, runs trials in the current process.
+    :param int n_trials: Number of trials to run.
+    """
+    # Storage connections are not shared with the parent process
+    study = optuna.load_study(study_name=study_name,storage=getStorage(storage_path,journal),pruner=pruner)
+    run_trials(study,n_trials)
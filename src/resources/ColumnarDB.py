@@ -0,0 +1,395 @@
+# -*- coding: utf-8 -*-
+'''
+Project : GamBible
+Package: resources
+Module:  ColumnarDB
+Version: 2.0
+Usage: Compact columnar storage for GAMES / PLAYERS databases. Ids are interned into integers, tables are stored as
+NumPy arrays (one .npy file per column in a .gbdb folder) that can be memory-mapped. JSON import / export is provided.
+
+Author: BoxBoxJason
+Date: 17/10/2026
+'''
+import os
+import shutil
+from json import dump,load
+import numpy as np
+from resources.PathEnum import getJsonObject,dumpJsonObject
+from resources import instrumentation
+from resources.instrumentation import StageTimer
+from resources.utils import parseGameDate
+
+# Columnar database folder extension
+COLUMNAR_EXTENSION = '.gbdb'
+# Layout of games rows: ELO games have a winner and a loser, MMR games have a ranking
+ELO_LAYOUT = 'ELO'
+MMR_LAYOUT = 'MMR'
+# Rows fields stored by each layout, other fields are rejected instead of being lost
+GAMES_FIELDS = {ELO_LAYOUT:{'ID','DATE','WINNER_ID','LOSER_ID','TERRAIN','PROCESSED'},
+                MMR_LAYOUT:{'ID','DATE','RANKING','TERRAIN','PROCESSED'}}
+PLAYERS_FIELDS = {ELO_LAYOUT:{'ID','ELO','GAMES','FAV_TERRAIN'},
+                  MMR_LAYOUT:{'ID','SKILL','SKILL_DEVIATION','PERF_HISTORY','PERF_WEIGHT','GAMES'}}
+
+class ColumnarDatabase:
+    """
+    Columnar GAMES / PLAYERS database. Variable length fields (rankings, players games, histories) are stored as
+    flat arrays with offsets: the values of row i are values[offsets[i]:offsets[i+1]].
+
+    :ivar str layout: Database layout (ELO_LAYOUT or MMR_LAYOUT).
+    :ivar dict columns: Columns arrays by column name.
+    """
+    def __init__(self,layout,columns):
+        """
+        Constructor for ColumnarDatabase.
+
+        :param str layout: Database layout (ELO_LAYOUT or MMR_LAYOUT).
+        :param dict columns: Columns arrays by column name.
+        """
+        self.layout = layout
+        self.columns = columns
+
+
+    def __getitem__(self,column_name):
+        return self.columns[column_name]
+
+
+    @property
+    def players_ids(self):
+        """
+        :return: np.ndarray - Players ids, position is the player index.
+        """
+        return self.columns['PLAYERS_ID']
+
+
+    @property
+    def games_ids(self):
+        """
+        :return: np.ndarray - Games ids, position is the game index.
+        """
+        return self.columns['GAMES_ID']
+
+
+    def getGamesOrder(self):
+        """
+        Returns games indexes ordered by date (precomputed index).
+
+        :return: np.ndarray - Games indexes ordered by date.
+        """
+        return self.columns['GAMES_DATE_ORDER']
+
+
+    def toJsonObject(self):
+        """
+        Converts the database back to the JSON layout.
+
+        :return: dict - {'GAMES':games_table,'PLAYERS':players_table} database.
+        """
+        players_ids = self.columns['PLAYERS_ID'].tolist()
+        games_ids = self.columns['GAMES_ID'].tolist()
+
+        games_table = {}
+        rankings = _splitOffsets(self.columns['GAMES_RANKING'],self.columns['GAMES_RANKING_OFFSETS'])
+        terrains = self.columns['TERRAINS'].tolist()
+        for game_id,game_date,processed,ranking,terrain in zip(games_ids,self.columns['GAMES_DATE'].tolist(),
+                                                               self.columns['GAMES_PROCESSED'].tolist(),rankings,
+                                                               self.columns['GAMES_TERRAIN'].tolist()):
+            game_dict = {'ID':game_id,'DATE':game_date}
+            if self.layout == ELO_LAYOUT:
+                game_dict['WINNER_ID'] = players_ids[ranking[0]]
+                game_dict['LOSER_ID'] = players_ids[ranking[1]]
+            else:
+                game_dict['RANKING'] = [players_ids[player_index] for player_index in ranking]
+            if terrain >= 0:
+                game_dict['TERRAIN'] = terrains[terrain]
+            game_dict['PROCESSED'] = processed
+            games_table[game_id] = game_dict
+
+        players_table = {}
+        players_games = _splitOffsets(self.columns['PLAYERS_GAMES'],self.columns['PLAYERS_GAMES_OFFSETS'])
+        if self.layout == ELO_LAYOUT:
+            players_terrains = _splitOffsets(self.columns['PLAYERS_TERRAINS'],self.columns['PLAYERS_TERRAINS_OFFSETS'])
+            players_terrains_results = _splitOffsets(self.columns['PLAYERS_TERRAINS_RESULTS'],self.columns['PLAYERS_TERRAINS_OFFSETS'])
+            for player_id,elo,player_games,player_terrains,terrains_results in zip(players_ids,self.columns['PLAYERS_ELO'].tolist(),players_games,
+                                                                                   players_terrains,players_terrains_results):
+                players_table[player_id] = {
+                    'ID':player_id,
+                    'ELO':elo,
+                    'GAMES':[games_ids[game_index] for game_index in player_games],
+                    'FAV_TERRAIN':{terrains[terrain]:{'WIN':wins,'LOSS':losses,'DRAW':draws}
+                                   for terrain,(wins,losses,draws) in zip(player_terrains,terrains_results)}
+                }
+        else:
+            perf_histories = _splitOffsets(self.columns['PLAYERS_PERF_HISTORY'],self.columns['PLAYERS_PERF_OFFSETS'])
+            perf_weights = _splitOffsets(self.columns['PLAYERS_PERF_WEIGHT'],self.columns['PLAYERS_PERF_OFFSETS'])
+            for player_id,skill,deviation,perf_history,perf_weight,player_games in zip(players_ids,self.columns['PLAYERS_SKILL'].tolist(),
+                                                                                       self.columns['PLAYERS_SKILL_DEVIATION'].tolist(),
+                                                                                       perf_histories,perf_weights,players_games):
+                players_table[player_id] = {
+                    'ID':player_id,
+                    'SKILL':skill,
+                    'SKILL_DEVIATION':deviation,
+                    'PERF_HISTORY':perf_history,
+                    'PERF_WEIGHT':perf_weight,
+                    'GAMES':[games_ids[game_index] for game_index in player_games]
+                }
+
+        return {'GAMES':games_table,'PLAYERS':players_table}
+
+
+def fromJsonObject(json_object):
+    """
+    Converts a JSON layout database into a columnar database.
+    Raises ValueError if a row has fields the columnar layout does not store (see GAMES_FIELDS and PLAYERS_FIELDS).
+
+    :param dict json_object: {'GAMES':games_table,'PLAYERS':players_table} database.
+
+    :return: ColumnarDatabase - Columnar database.
+    """
+    games_table = json_object['GAMES']
+    players_table = json_object['PLAYERS']
+    layout = _guessLayout(json_object)
+    _checkFields(games_table,GAMES_FIELDS[layout],'Games')
+    _checkFields(players_table,PLAYERS_FIELDS[layout],'Players')
+
+    players_ids = list(players_table)
+    players_indexes = {player_id:index for index,player_id in enumerate(players_ids)}
+    games_ids = list(games_table)
+    games_indexes = {game_id:index for index,game_id in enumerate(games_ids)}
+    terrains = []
+    terrains_indexes = {}
+
+    def internTerrain(terrain):
+        if terrain not in terrains_indexes:
+            terrains_indexes[terrain] = len(terrains)
+            terrains.append(terrain)
+        return terrains_indexes[terrain]
+
+    rankings = []
+    games_terrains = []
+    for game_dict in games_table.values():
+        if layout == ELO_LAYOUT:
+            rankings.append([players_indexes[game_dict['WINNER_ID']],players_indexes[game_dict['LOSER_ID']]])
+        else:
+            rankings.append([players_indexes[player_id] for player_id in game_dict['RANKING']])
+        terrain = game_dict.get('TERRAIN')
+        games_terrains.append(internTerrain(terrain) if terrain else -1)
+
+    games_dates = [game_dict['DATE'] for game_dict in games_table.values()]
+    parsed_dates = [parseGameDate(game_date) for game_date in games_dates]
+    columns = {
+        'GAMES_ID':_stringsArray(games_ids),
+        'GAMES_DATE':_stringsArray(games_dates),
+        'GAMES_DATE_ORDER':np.array(sorted(range(len(parsed_dates)),key=parsed_dates.__getitem__),dtype=np.int64),
+        'GAMES_PROCESSED':np.array([game_dict['PROCESSED'] for game_dict in games_table.values()],dtype=bool),
+        'GAMES_TERRAIN':np.array(games_terrains,dtype=np.int32),
+        'PLAYERS_ID':_stringsArray(players_ids)
+    }
+    columns['GAMES_RANKING'],columns['GAMES_RANKING_OFFSETS'] = _joinOffsets(rankings,np.int32)
+    columns['PLAYERS_GAMES'],columns['PLAYERS_GAMES_OFFSETS'] = _joinOffsets(
+        [[games_indexes[game_id] for game_id in player_dict['GAMES']] for player_dict in players_table.values()],np.int32)
+
+    if layout == ELO_LAYOUT:
+        columns['PLAYERS_ELO'] = np.array([player_dict['ELO'] for player_dict in players_table.values()],dtype=np.float64)
+        columns['PLAYERS_TERRAINS'],columns['PLAYERS_TERRAINS_OFFSETS'] = _joinOffsets(
+            [[internTerrain(terrain) for terrain in player_dict['FAV_TERRAIN']] for player_dict in players_table.values()],np.int32)
+        terrains_results = [[result['WIN'],result['LOSS'],result['DRAW']] for player_dict in players_table.values()
+                            for result in player_dict['FAV_TERRAIN'].values()]
+        columns['PLAYERS_TERRAINS_RESULTS'] = np.array(terrains_results,dtype=np.int64).reshape(-1,3)
+    else:
+        columns['PLAYERS_SKILL'] = np.array([player_dict['SKILL'] for player_dict in players_table.values()],dtype=np.float64)
+        columns['PLAYERS_SKILL_DEVIATION'] = np.array([player_dict['SKILL_DEVIATION'] for player_dict in players_table.values()],dtype=np.float64)
+        columns['PLAYERS_PERF_HISTORY'],columns['PLAYERS_PERF_OFFSETS'] = _joinOffsets(
+            [player_dict['PERF_HISTORY'] for player_dict in players_table.values()],np.float64)
+        columns['PLAYERS_PERF_WEIGHT'],_ = _joinOffsets([player_dict['PERF_WEIGHT'] for player_dict in players_table.values()],np.float64)
+
+    columns['TERRAINS'] = _stringsArray(terrains)
+
+    return ColumnarDatabase(layout,columns)
+
+
+def getColumnarObject(dir_path,mmap=True):
+    """
+    Returns the content of a columnar database.
+
+    :param path dir_path: Absolute path to the .gbdb database folder.
+    :param bool mmap: States if the columns should be memory-mapped instead of read in memory.
+
+    :return: ColumnarDatabase - Columnar database.
+    """
+    recoverColumnarObject(dir_path)
+    with open(os.path.join(dir_path,'layout.json'),'r',encoding='utf-8') as layout_file:
+        layout_dict = load(layout_file)
+
+    mmap_mode = 'r' if mmap else None
+    columns = {column_name:np.load(os.path.join(dir_path,f"{column_name}.npy"),mmap_mode=mmap_mode)
+               for column_name in layout_dict['COLUMNS']}
+
+    return ColumnarDatabase(layout_dict['LAYOUT'],columns)
+
+
+def dumpColumnarObject(columnar_database,dir_path):
+    """
+    Overwrites a columnar database to dir_path.
+    The database is written to a sibling temporary folder that then replaces dir_path: a crash never mixes old and new
+    columns, and the files of the replaced database are unlinked instead of truncated (memory-mapped columns stay valid).
+
+    :param ColumnarDatabase columnar_database: Columnar database to save.
+    :param path dir_path: Absolute path to the destination .gbdb folder.
+    """
+    dir_path = os.path.normpath(dir_path)
+    temp_path = f"{dir_path}.tmp"
+    old_path = f"{dir_path}.old"
+    recoverColumnarObject(dir_path)
+    shutil.rmtree(temp_path,True)
+    os.makedirs(temp_path,511)
+    for column_name,column in columnar_database.columns.items():
+        np.save(os.path.join(temp_path,f"{column_name}.npy"),column)
+        if instrumentation.ENABLED:
+            instrumentation.incrementCounter('BYTES_WRITTEN',os.path.getsize(os.path.join(temp_path,f"{column_name}.npy")))
+
+    # Written last, a database folder without layout file is incomplete
+    with open(os.path.join(temp_path,'layout.json'),'w',encoding='utf-8') as layout_file:
+        dump({'LAYOUT':columnar_database.layout,'COLUMNS':list(columnar_database.columns)},layout_file)
+        if instrumentation.ENABLED:
+            instrumentation.incrementCounter('BYTES_WRITTEN',layout_file.tell())
+
+    # A folder can only replace an empty folder, the old database is moved aside first (see recoverColumnarObject)
+    if os.path.exists(dir_path):
+        os.replace(dir_path,old_path)
+    os.replace(temp_path,dir_path)
+    shutil.rmtree(old_path,True)
+
+
+def recoverColumnarObject(dir_path):
+    """
+    Completes a dumpColumnarObject interrupted while swapping the database folders: the new database is moved in if
+    it was complete, the old one is restored otherwise. Incomplete temporary folders are left to the next dump.
+
+    :param path dir_path: Absolute path to the .gbdb database folder.
+    """
+    dir_path = os.path.normpath(dir_path)
+    if os.path.exists(dir_path):
+        return
+    for candidate_path in (f"{dir_path}.tmp",f"{dir_path}.old"):
+        if os.path.exists(os.path.join(candidate_path,'layout.json')):
+            os.replace(candidate_path,dir_path)
+            return
+
+
+def importJsonDatabase(json_path,dir_path):
+    """
+    Converts a JSON database file into a columnar database.
+
+    :param path json_path: Absolute path to the source .json database.
+    :param path dir_path: Absolute path to the destination .gbdb folder.
+    """
+    dumpColumnarObject(fromJsonObject(getJsonObject(json_path)),dir_path)
+
+
+def exportJsonDatabase(dir_path,json_path):
+    """
+    Converts a columnar database into a JSON database file.
+
+    :param path dir_path: Absolute path to the source .gbdb folder.
+    :param path json_path: Absolute path to the destination .json database.
+    """
+    dumpJsonObject(getColumnarObject(dir_path,False).toJsonObject(),json_path)
+
+
+def _checkFields(table,fields,table_name):
+    """
+    Raises ValueError if a row of the table has fields outside of the stored ones.
+
+    :param dict table: Database table.
+    :param set[str] fields: Fields stored by the columnar layout.
+    :param str table_name: Table name (for the error message).
+    """
+    for row_id,row in table.items():
+        unknown_fields = row.keys() - fields
+        if unknown_fields:
+            raise ValueError(f"{table_name} row {row_id} has fields the columnar layout does not store: {sorted(unknown_fields)}")
+
+
+def _guessLayout(json_object):
+    """
+    Returns the layout of a JSON database from its first rows.
+
+    :param dict json_object: {'GAMES':games_table,'PLAYERS':players_table} database.
+
+    :return: str - Database layout (ELO_LAYOUT or MMR_LAYOUT).
+    """
+    for game_dict in json_object['GAMES'].values():
+        return ELO_LAYOUT if 'WINNER_ID' in game_dict else MMR_LAYOUT
+    for player_dict in json_object['PLAYERS'].values():
+        return ELO_LAYOUT if 'ELO' in player_dict else MMR_LAYOUT
+    return MMR_LAYOUT
+
+
+def _stringsArray(strings):
+    """
+    :param list[str] strings: Strings to store.
+
+    :return: np.ndarray - Fixed width unicode array (can be memory-mapped, unlike object arrays).
+    """
+    return np.array(strings,dtype=np.str_) if strings else np.array([],dtype='<U1')
+
+
+def _joinOffsets(rows,dtype):
+    """
+    Flattens variable length rows.
+
+    :param list[list] rows: Rows to flatten.
+    :param type dtype: Values NumPy type.
+
+    :return: tuple[np.ndarray,np.ndarray] - Flat values and rows offsets (len(rows) + 1).
+    """
+    offsets = np.zeros(len(rows) + 1,dtype=np.int64)
+    np.cumsum([len(row) for row in rows],out=offsets[1:])
+    values = np.fromiter((value for row in rows for value in row),dtype=dtype,count=int(offsets[-1]))
+    return values,offsets
+
+
+def _splitOffsets(values,offsets):
+    """
+    Splits flat values back into rows.
+
+    :param np.ndarray values: Flat values.
+    :param np.ndarray offsets: Rows offsets.
+
+    :return: list[list] - Rows values.
+    """
+    values = values.tolist()
+    offsets = offsets.tolist()
+    return [values[start:end] for start,end in zip(offsets[:-1],offsets[1:])]
+
+
+def getDatabaseObject(file_path):
+    """
+    Returns a database in the JSON layout, whatever its storage format (.json file or .gbdb folder).
+    Converting a columnar database builds every table dict, array consumers should use getColumnarObject instead.
+
+    :param path file_path: Absolute path to the database.
+
+    :return: dict - {'GAMES':games_table,'PLAYERS':players_table} database.
+    """
+    with StageTimer('getDatabaseObject'):
+        if file_path.endswith(COLUMNAR_EXTENSION):
+            recoverColumnarObject(file_path)
+            if not os.path.exists(os.path.join(file_path,'layout.json')):
+                return {'GAMES':{},'PLAYERS':{}}
+            return getColumnarObject(file_path,False).toJsonObject()
+        return getJsonObject(file_path)
+
+
+def dumpDatabaseObject(json_object,file_path):
+    """
+    Overwrites a JSON layout database to file_path, the storage format depends on the path extension (.json or .gbdb).
+
+    :param dict json_object: {'GAMES':games_table,'PLAYERS':players_table} database.
+    :param path file_path: Absolute path to the destination database.
+    """
+    with StageTimer('dumpDatabaseObject'):
+        if file_path.endswith(COLUMNAR_EXTENSION):
+            dumpColumnarObject(fromJsonObject(json_object),file_path)
+        else:
+            dumpJsonObject(json_object,file_path)
@@ -11,6 +11,7 @@ Date: 05/10/2023
 '''
 import os
 from json import dump,load
+from resources import instrumentation
 
 class PathEnum:
     """
@@ -44,19 +45,22 @@ def getImage(image_name):
 def getDBPath(sport,category,db_name,create=True):
     """
     Returns absolute database path for requested sport, category and file name.
-    If the path does not exist, it will be created.
-    If the database does not exist, it will be created.
+    If create is set and the path does not exist, it will be created.
+    If create is set and the database does not exist, it will be created.
 
     :param str sport : Sport name.
     :param str category: Sport category.
     :param str db_name: Database file name.
+    :param bool create: States if the folder and the database should be created (nothing is written otherwise).
 
     :return: path - Absolute path to database file.
     """
     db_path = os.path.join(PathEnum.RESULTS,sport,category,db_name)
-    os.makedirs(os.path.dirname(db_path),777,True)
-    if not os.path.exists(db_path) and create:
-        dumpJsonObject({'GAMES':{},'PLAYERS':{}},db_path)
+    if create:
+        os.makedirs(os.path.dirname(db_path),777,True)
+        # Columnar databases (.gbdb folders) are created on first dump
+        if not os.path.exists(db_path) and not db_name.endswith('.gbdb'):
+            dumpJsonObject({'GAMES':{},'PLAYERS':{}},db_path)
     return db_path
 
 
@@ -123,10 +127,14 @@ def getJsonObject(file_path):
 def dumpJsonObject(json_object,file_path):
     """
     Overwrites json object to file_path.
+    The object is written to a temporary file that then replaces file_path: readers never see a partial file.
 
     :param JsonObject json_object : JSON object to save in file.
     :param path file_path: Absolute path to destination file.
     """
     os.makedirs(os.path.dirname(file_path),511,True)
-    with open(file_path,'w',encoding='utf-8') as json_file:
+    with open(f"{file_path}.tmp",'w',encoding='utf-8') as json_file:
         dump(json_object,json_file)
+        if instrumentation.ENABLED:
+            instrumentation.incrementCounter('BYTES_WRITTEN',json_file.tell())
+    os.replace(f"{file_path}.tmp",file_path)
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+'''
+Project : GamBible
+Package: resources
+Module:  instrumentation
+Version: 2.0
+Usage: Opt-in profiling of the ranking pipeline: per-stage timers and counters (root finders iterations and
+evaluations, games processed, bytes written). Disabled by default, hot paths only test ENABLED when it is off.
+Enable it with enableInstrumentation() or the GAMBIBLE_INSTRUMENTATION=1 environment variable.
+
+Author: BoxBoxJason
+Date: 17/10/2026
+'''
+import os
+import time
+import logging
+from functools import wraps
+from json import dumps
+
+# Read by the instrumented modules as instrumentation.ENABLED, never import it by name
+ENABLED = os.getenv('GAMBIBLE_INSTRUMENTATION','0') not in ('','0')
+# Cumulated seconds and calls by stage name
+_TIMERS = {}
+# Counters values by name
+_COUNTERS = {}
+
+class StageTimer:
+    """
+    Context manager adding its duration to a stage timer when instrumentation is enabled.
+    Nested stages are timed inclusively (an enclosing stage time includes its nested stages times).
+
+    :ivar str stage: Stage name.
+    """
+    __slots__ = ('stage','__start_time')
+
+    def __init__(self,stage):
+        """
+        Constructor for StageTimer.
+
+        :param str stage: Stage name.
+        """
+        self.stage = stage
+        self.__start_time = None
+
+
+    def __enter__(self):
+        if ENABLED:
+            self.__start_time = time.perf_counter()
+        return self
+
+
+    def __exit__(self,*_):
+        if self.__start_time is not None:
+            addStageTime(self.stage,time.perf_counter() - self.__start_time)
+            self.__start_time = None
+
+
+def instrumentedCall(label):
+    """
+    Decorator timing every call of a function as a stage and logging a summary line of the values recorded during
+    the call. When instrumentation is disabled, the only overhead is the ENABLED test.
+
+    :param str label: Stage name and log line label.
+
+    :return: function - Decorator.
+    """
+    def decorator(function):
+        @wraps(function)
+        def wrapper(*args,**kwargs):
+            if not ENABLED:
+                return function(*args,**kwargs)
+            snapshot = getInstrumentationSummary()
+            with StageTimer(label):
+                result = function(*args,**kwargs)
+            logInstrumentationSummary(label,snapshot)
+            return result
+
+        return wrapper
+
+    return decorator
+
+
+def enableInstrumentation(enabled=True):
+    """
+    Enables or disables the instrumentation, recorded values are kept.
+
+    :param bool enabled: States if timers and counters are recorded.
+    """
+    global ENABLED
+    ENABLED = enabled
+
+
+def resetInstrumentation():
+    """
+    Clears every timer and counter.
+    """
+    _TIMERS.clear()
+    _COUNTERS.clear()
+
+
+def addStageTime(stage,seconds,calls=1):
+    """
+    Adds time to a stage timer (callers check ENABLED first).
+
+    :param str stage: Stage name.
+    :param float seconds: Elapsed seconds.
+    :param int calls: Number of stage executions.
+    """
+    timer = _TIMERS.setdefault(stage,[0.0,0])
+    timer[0] += seconds
+    timer[1] += calls
+
+
+def incrementCounter(counter,value=1):
+    """
+    Increments a counter (callers check ENABLED first).
+
+    :param str counter: Counter name.
+    :param int value: Increment.
+    """
+    _COUNTERS[counter] = _COUNTERS.get(counter,0) + value
+
+
+def countRootFinder(solves,iterations,evaluations):
+    """
+    Records root finders statistics (callers check ENABLED first).
+
+    :param int solves: Number of solved equations.
+    :param int iterations: Number of iterations.
+    :param int evaluations: Number of scalar function evaluations.
+    """
+    incrementCounter('ROOT_FINDER_SOLVES',solves)
+    incrementCounter('ROOT_FINDER_ITERATIONS',iterations)
+    incrementCounter('ROOT_FINDER_EVALUATIONS',evaluations)
+
+
+def getInstrumentationSummary(snapshot=None):
+    """
+    Returns the recorded timers and counters.
+
+    :param dict snapshot: Previous summary, only the values recorded since are returned if provided.
+
+    :return: dict - TIMERS (stage -> {SECONDS,CALLS}) and COUNTERS (name -> value).
+    """
+    summary = {
+        'TIMERS':{stage:{'SECONDS':seconds,'CALLS':calls} for stage,(seconds,calls) in _TIMERS.items()},
+        'COUNTERS':dict(_COUNTERS)
+    }
+    if snapshot is not None:
+        for stage,timer in list(summary['TIMERS'].items()):
+            previous_timer = snapshot['TIMERS'].get(stage,{'SECONDS':0.0,'CALLS':0})
+            timer = {'SECONDS':timer['SECONDS'] - previous_timer['SECONDS'],'CALLS':timer['CALLS'] - previous_timer['CALLS']}
+            if timer['CALLS']:
+                summary['TIMERS'][stage] = timer
+            else:
+                del summary['TIMERS'][stage]
+        summary['COUNTERS'] = {counter:value - snapshot['COUNTERS'].get(counter,0) for counter,value in summary['COUNTERS'].items()
+                               if value != snapshot['COUNTERS'].get(counter,0)}
+    return summary
+
+
+def logInstrumentationSummary(label,snapshot=None):
+    """
+    Logs a summary as a single structured line: label followed by the JSON summary.
+
+    :param str label: Summary label (instrumented call).
+    :param dict snapshot: Previous summary, only the values recorded since are logged if provided.
+
+    :return: dict - Logged summary.
+    """
+    summary = getInstrumentationSummary(snapshot)
+    logging.info(f"{label} {dumps(summary,sort_keys=True)}")
+    return summary
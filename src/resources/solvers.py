@@ -0,0 +1,189 @@
+# -*- coding: utf-8 -*-
+'''
+Project : GamBible
+Package: resources
+Module:  solvers
+Version: 2.0
+Usage: Root finding algorithms for the monotone functions used by the ranking algorithms.
+Newton steps locate the root, the result is then chosen like findZeroBisection (resources.utils) chooses it: the
+bisection midpoints of [a,b] are walked down, reusing the signs Newton already knows. Saturated tanh sums have flat
+zero regions, their root is not unique and the bisection one is returned.
+
+Author: BoxBoxJason
+Date: 17/10/2026
+'''
+import numpy as np
+from resources import instrumentation
+
+# Newton estimates are probed at ε / PROBE_RATIO on each side: the closer the probes, the fewer bisection midpoints
+# fall between them
+PROBE_RATIO = 64
+
+def findZeroNewton(f,x0,a=0,b=1e4,ε=1e-5,max_iterations=100):
+    """
+    Newton algorithm for non decreasing functions, searches for values from a to b.
+    Newton steps are taken from the warm start x0 and the sign of every evaluation is kept. Once Newton converged (or
+    as soon as a step is useless: flat function, step leaving the known bracket), the bisection of [a,b] is replayed,
+    evaluating f only at the midpoints whose sign is not known yet: the returned value is the one findZeroBisection
+    returns.
+
+    :param function f: R -> (R,R) function returning the evaluated value and its derivative.
+    :param float x0: Warm start, expected to be close to the root.
+    :param float a: Lower bound of the search interval.
+    :param float b: Upper bound of the search interval.
+    :param float ε: Tolerance on x.
+    :param int max_iterations: Maximum number of Newton evaluations of f.
+
+    :return: float - x value for which f(x) ~ 0.
+    """
+    # Largest x known to give f(x) < 0, smallest x known to give f(x) > 0
+    negative = -np.inf
+    positive = np.inf
+    evaluations = 0
+
+    x = min(max(x0,a),b)
+    for _ in range(max_iterations):
+        value,derivative = f(x)
+        evaluations += 1
+        if value < 0:
+            negative = x
+        elif value > 0:
+            positive = x
+        # Exact root, flat zero region or saturated (flat) function: Newton steps are useless, the bisection chooses
+        if value == 0 or not derivative > 0:
+            break
+        next_x = x - value / derivative
+        if not max(negative,a) < next_x < min(positive,b):
+            break
+
+        converged = abs(next_x - x) < ε
+        x = next_x
+        if converged:
+            # Probes on both sides of the estimate, the bisection then only evaluates f between them
+            for probe in (x - ε / PROBE_RATIO,x + ε / PROBE_RATIO):
+                if negative < probe < positive:
+                    value,_ = f(probe)
+                    evaluations += 1
+                    if value < 0:
+                        negative = probe
+                    elif value > 0:
+                        positive = probe
+            break
+
+    def getSign(x):
+        nonlocal negative,positive,evaluations
+        if x <= negative:
+            return -1
+        if x >= positive:
+            return 1
+        value,_ = f(x)
+        evaluations += 1
+        if value < 0:
+            negative = x
+            return -1
+        if value > 0:
+            positive = x
+            return 1
+        return 0
+
+    # Same steps as findZeroBisection
+    Δ = 1
+    a_sign = getSign(a)
+    while Δ > ε:
+        m = (a + b) / 2
+        Δ = abs(b - a)
+        m_sign = getSign(m)
+        if m_sign == 0:
+            a = m
+            break
+        elif a_sign * m_sign > 0:
+            a = m
+        else:
+            b = m
+
+    if instrumentation.ENABLED:
+        instrumentation.countRootFinder(1,evaluations,evaluations)
+    return a
+
+
+def findZerosNewton(f,x0,a=0,b=1e4,ε=1e-5,max_iterations=100):
+    """
+    Batched version of findZeroNewton, solves N independent equations at once.
+    Each equation keeps its own bracket, only the equations still searching (or whose bisection midpoint sign is
+    unknown) are evaluated.
+
+    :param function f: (R^K,indexes) -> (R^K,R^K) function evaluating the equations of the given indexes (K of the N
+    equations) at the given values, returns the values and the derivatives.
+    :param np.ndarray x0: Warm starts, expected to be close to the roots.
+    :param float a: Lower bound of the search interval.
+    :param float b: Upper bound of the search interval.
+    :param float ε: Tolerance on x.
+    :param int max_iterations: Maximum number of Newton evaluations of f.
+
+    :return: np.ndarray - x values for which f(x) ~ 0.
+    """
+    x = np.clip(np.asarray(x0,dtype=np.float64),a,b)
+    negative = np.full_like(x,-np.inf)
+    positive = np.full_like(x,np.inf)
+    evaluations = 0
+    iterations = 0
+
+    def evaluate(values_x,indexes):
+        nonlocal evaluations,iterations
+        values,derivatives = f(values_x,indexes)
+        evaluations += len(indexes)
+        iterations += 1
+        negative[indexes] = np.where(values < 0,values_x,negative[indexes])
+        positive[indexes] = np.where(values > 0,values_x,positive[indexes])
+        return values,derivatives
+
+    active = np.arange(len(x))
+    for _ in range(max_iterations):
+        x_active = x[active]
+        values,derivatives = evaluate(x_active,active)
+        with np.errstate(divide='ignore',invalid='ignore'):
+            next_x = x_active - values / derivatives
+
+        # Exact roots, flat zero regions and saturated functions are left to the bisection
+        searching = (values != 0) & (derivatives > 0) & (np.maximum(negative[active],a) < next_x) \
+                  & (next_x < np.minimum(positive[active],b))
+        converged = searching & (np.abs(next_x - x_active) < ε)
+        x[active] = np.where(searching,next_x,x_active)
+        for offset in (-ε / PROBE_RATIO,ε / PROBE_RATIO):
+            probed = active[converged]
+            probes = x[probed] + offset
+            unknown = (negative[probed] < probes) & (probes < positive[probed])
+            if unknown.any():
+                evaluate(probes[unknown],probed[unknown])
+        active = active[searching & ~converged]
+        if not len(active):
+            break
+
+    def getSigns(values_x,indexes):
+        signs = np.where(values_x <= negative[indexes],-1,np.where(values_x >= positive[indexes],1,0))
+        unknown = (signs == 0).nonzero()[0]
+        if len(unknown):
+            values,_ = evaluate(values_x[unknown],indexes[unknown])
+            signs[unknown] = np.sign(values)
+        return signs
+
+    # Same steps as findZeroBisection, for every equation
+    lower = np.full_like(x,a)
+    upper = np.full_like(x,b)
+    equations = np.arange(len(x))
+    lower_signs = getSigns(lower,equations)
+    searching = equations
+    while len(searching):
+        lower_searching = lower[searching]
+        upper_searching = upper[searching]
+        middles = (lower_searching + upper_searching) / 2
+        widths = np.abs(upper_searching - lower_searching)
+        middles_signs = getSigns(middles,searching)
+        moves_lower = (middles_signs == 0) | (lower_signs[searching] * middles_signs > 0)
+        lower[searching] = np.where(moves_lower,middles,lower_searching)
+        upper[searching] = np.where(moves_lower,upper_searching,middles)
+        searching = searching[(middles_signs != 0) & (widths > ε)]
+
+    if instrumentation.ENABLED:
+        instrumentation.countRootFinder(len(x),iterations,evaluations)
+    return lower
@@ -9,6 +9,13 @@ Usage: General utility functions
 Author: BoxBoxJason
 Date: 01/10/2023
 '''
+import re
+from resources import instrumentation
+
+# Numeric fields of a game date
+DATE_FIELDS_PATTERN = re.compile(r'\d+')
+# Digits of each parsed date field
+DATE_FIELD_WIDTH = 10
 
 def getRankFromELO(ELO):
     """
@@ -38,6 +45,19 @@ def getRankFromELO(ELO):
     return rank
 
 
+def parseGameDate(game_date):
+    """
+    Parses a game date into a chronologically comparable key: its numeric fields, from the most significant one,
+    zero padded to the same width. Works for every collected format (2017-1-7-1 tennis dates, 2009-03-29 06:00 races
+    dates), unlike raw string comparison which orders 2017-1-10 before 2017-1-7.
+
+    :param str game_date: Game date.
+
+    :return: str - Parsed date, ordered as the tuple of its numeric fields.
+    """
+    return ''.join(field.zfill(DATE_FIELD_WIDTH) for field in DATE_FIELDS_PATTERN.findall(game_date))
+
+
 def findZeroBisection(f):
     """
     Implementation of the bisection algorithm, searches from values from 0 to 10000.
@@ -50,15 +70,23 @@ def findZeroBisection(f):
     ε = 1e-5
     a = 0
     b = 1e4
+    # f(a) is only re-evaluated when a moves
+    fa = f(a)
+    iterations = 0
     while Δ > ε:
+        iterations += 1
         m = (a + b) / 2
         Δ = abs(b - a)
-        if f(m) == 0:
+        fm = f(m)
+        if fm == 0:
             a =  m
             break
-        elif f(a) * f(m)  > 0:
+        elif fa * fm  > 0:
             a = m
+            fa = fm
         else:
             b = m
 
+    if instrumentation.ENABLED:
+        instrumentation.countRootFinder(1,iterations,iterations + 1)
     return a
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+'''
+Project : GamBible
+Package: service
+Module:  PredictionClient
+Version: 2.0
+Usage: Client of the local prediction server (see PredictionServer), requests go through a single persistent
+connection.
+
+Author: BoxBoxJason
+Date: 17/10/2026
+'''
+import json
+from http.client import HTTPConnection
+from urllib.parse import urlencode
+from service.PredictionServer import DEFAULT_HOST,DEFAULT_PORT
+
+# Seconds before a request fails
+REQUEST_TIMEOUT = 30
+
+class PredictionServerError(Exception):
+    """
+    Error answered by the prediction server.
+
+    :ivar int status: HTTP status code.
+    """
+    def __init__(self,message,status):
+        """
+        Constructor for PredictionServerError.
+
+        :param str message: Server error message.
+        :param int status: HTTP status code.
+        """
+        super().__init__(f"{status}: {message}")
+        self.status = status
+
+
+class PredictionClient:
+    """
+    Prediction server client.
+
+    :ivar str host: Server address.
+    :ivar int port: Server port.
+    """
+    def __init__(self,host=DEFAULT_HOST,port=DEFAULT_PORT,timeout=REQUEST_TIMEOUT):
+        """
+        Constructor for PredictionClient, the connection is opened by the first request.
+
+        :param str host: Server address.
+        :param int port: Server port.
+        :param float timeout: Seconds before a request fails.
+        """
+        self.host = host
+        self.port = port
+        self.__connection = HTTPConnection(host,port,timeout=timeout)
+
+
+    def getHealth(self):
+        """
+        :return: dict - Server status and loaded players counts.
+        """
+        return self.request('GET','/health')
+
+
+    def getLeaderboard(self,algorithm='elo',start=0,count=50):
+        """
+        :param str algorithm: Ranking algorithm ('elo' or 'mmr').
+        :param int start: Rank of the first row - 1.
+        :param int count: Number of rows.
+
+        :return: dict - Total number of ranked players and rows (rank, id, rating, division).
+        """
+        return self.request('GET','/leaderboard',{'algorithm':algorithm,'start':start,'count':count})
+
+
+    def predictMatchups(self,pairs):
+        """
+        :param list[tuple[str,str]] pairs: (player1_id,player2_id) pairings.
+
+        :return: list[float] - Win probabilities of the first players, in pairs order.
+        """
+        return self.request('POST','/matchups',{'pairs':[list(pair) for pair in pairs]})['probabilities']
+
+
+    def predictRace(self,players_ids,n_simulations=None,seed=None):
+        """
+        :param list[str] players_ids: Race participants ids.
+        :param int n_simulations: Number of simulated races (server default if None).
+        :param int seed: Simulations seed (random if None).
+
+        :return: dict - Players ids, their win probabilities and expected finishing positions.
+        """
+        body = {'players':list(players_ids)}
+        if n_simulations is not None:
+            body['simulations'] = n_simulations
+        if seed is not None:
+            body['seed'] = seed
+        return self.request('POST','/race',body)
+
+
+    def batch(self,requests):
+        """
+        Sends several requests in a single round-trip.
+
+        :param list[tuple[str,dict]] requests: (path,parameters) requests.
+
+        :return: list[dict] - Responses (status and body), in requests order.
+        """
+        return self.request('POST','/batch',{'requests':[{'path':path,'body':body} for path,body in requests]})['responses']
+
+
+    def request(self,method,path,parameters=None):
+        """
+        Sends a request and returns its JSON response.
+
+        :param str method: HTTP method ('GET' or 'POST').
+        :param str path: Request path.
+        :param dict parameters: Query parameters (GET) or JSON body (POST).
+
+        :return: dict - JSON response, raises PredictionServerError if the server answered an error.
+        """
+        if method == 'GET':
+            body = None
+            headers = {}
+            if parameters:
+                path = f"{path}?{urlencode(parameters)}"
+        else:
+            body = json.dumps(parameters or {},separators=(',',':')).encode('utf-8')
+            headers = {'Content-Type':'application/json'}
+        try:
+            self.__connection.request(method,path,body,headers)
+            response = self.__connection.getresponse()
+            response_body = json.loads(response.read())
+        except (OSError,ValueError):
+            # The connection is reopened by the next request
+            self.__connection.close()
+            raise
+        if response.status != 200:
+            raise PredictionServerError(response_body.get('error'),response.status)
+        return response_body
+
+
+    def close(self):
+        """
+        Closes the connection.
+        """
+        self.__connection.close()
+
+
+    def __enter__(self):
+        return self
+
+
+    def __exit__(self,*_):
+        self.close()
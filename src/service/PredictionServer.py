@@ -0,0 +1,380 @@
+# -*- coding: utf-8 -*-
+'''
+Project : GamBible
+Package: service
+Module:  PredictionServer
+Version: 2.0
+Usage: Local HTTP prediction server. A sport category ratings are loaded and processed once, then kept in memory to
+answer JSON requests (127.0.0.1 only by default):
+    GET  /health                                            -> players counts
+    GET  /leaderboard?algorithm=elo|mmr&start=0&count=50    -> ranking slice
+    POST /matchups {"pairs":[[id1,id2],...]}                -> ELO win probabilities of player 1, one array operation
+    POST /race {"players":[id,...],"simulations":N,"seed":S} -> MMR simulated win probabilities and expected positions
+    POST /batch {"requests":[{"path":...,"body":...},...]}  -> responses of several requests in a single round-trip
+Matchups and leaderboard requests target a p99 latency under LATENCY_TARGET_P99_MS on the loopback interface,
+measured by the benchmarks suite through PredictionClient.
+
+Author: BoxBoxJason
+Date: 17/10/2026
+'''
+import os
+import json
+import logging
+from http.server import ThreadingHTTPServer,BaseHTTPRequestHandler
+from threading import Thread
+from urllib.parse import urlsplit,parse_qs
+import numpy as np
+from resources.ColumnarDB import getDatabaseObject
+from resources.utils import getRankFromELO
+from ranking import ELO,MMR
+from ranking.GamesIndex import getGamesIndex
+from ranking.Simulation import simulateRace
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+# Published p99 latency of matchups and leaderboard requests, in milliseconds (local client, persistent connection)
+LATENCY_TARGET_P99_MS = 5
+# Default and maximum number of players of a leaderboard slice
+LEADERBOARD_COUNT = 50
+MAX_LEADERBOARD_COUNT = 1000
+# Default and maximum number of simulated races of a race prediction
+RACE_SIMULATIONS_COUNT = 10_000
+MAX_RACE_SIMULATIONS_COUNT = 1_000_000
+# Maximum number of requests of a batch
+MAX_BATCH_REQUESTS = 1000
+# Maximum request body size, in bytes
+MAX_BODY_SIZE = 16 * 2**20
+
+
+class PredictionError(Exception):
+    """
+    Invalid prediction request, answered with its HTTP status.
+
+    :ivar int status: HTTP status code.
+    """
+    def __init__(self,message,status=400):
+        """
+        Constructor for PredictionError.
+
+        :param str message: Error message returned to the client.
+        :param int status: HTTP status code.
+        """
+        super().__init__(message)
+        self.status = status
+
+
+class PredictionService:
+    """
+    In-memory predictions over the ratings of a sport category. Tables are never modified once the service is
+    created, requests can be answered concurrently.
+
+    :ivar dict elo_players_table: ELO Players table (1v1 games).
+    :ivar dict mmr_players_table: MMR Players table (free-for-all games).
+    :ivar float β: MMR performance deviation of the race simulations.
+    """
+    def __init__(self,elo_players_table,mmr_players_table,β):
+        """
+        Constructor for PredictionService, ranks the players once.
+
+        :param dict elo_players_table: ELO Players table (empty if the category has no 1v1 games).
+        :param dict mmr_players_table: MMR Players table (empty if the category has no free-for-all games).
+        :param float β: MMR performance deviation [0,inf[.
+        """
+        self.elo_players_table = elo_players_table
+        self.mmr_players_table = mmr_players_table
+        self.β = β
+        self.__leaderboards = {
+            'elo':getLeaderboard({player_id:player_dict['ELO'] for player_id,player_dict in elo_players_table.items()}),
+            # Conservative MMR rating, the one the players ranking page displays
+            'mmr':getLeaderboard({player_id:player_dict['SKILL'] - 3 * player_dict['SKILL_DEVIATION']
+                                  for player_id,player_dict in mmr_players_table.items()})
+        }
+        self.__routes = {
+            ('GET','/health'):self.getHealth,
+            ('GET','/leaderboard'):self.getLeaderboardSlice,
+            ('POST','/matchups'):self.predictMatchups,
+            ('POST','/race'):self.predictRace,
+            ('POST','/batch'):self.handleBatch
+        }
+
+
+    def handle(self,method,path,parameters):
+        """
+        Answers a request.
+
+        :param str method: HTTP method.
+        :param str path: Request path.
+        :param dict parameters: Query parameters (GET) or JSON body (POST).
+
+        :return: dict - JSON response, raises PredictionError if the request is invalid.
+        """
+        route = self.__routes.get((method,path)) if isinstance(path,str) else None
+        if route is None:
+            raise PredictionError(f"Unknown route {method} {path}",404)
+        if not isinstance(parameters,dict):
+            raise PredictionError('Request body must be a JSON object')
+        return route(parameters)
+
+
+    def getHealth(self,_):
+        """
+        :return: dict - Loaded players counts.
+        """
+        return {'status':'ok','elo_players':len(self.elo_players_table),'mmr_players':len(self.mmr_players_table)}
+
+
+    def getLeaderboardSlice(self,parameters):
+        """
+        Returns consecutive leaderboard rows.
+
+        :param dict parameters: algorithm ('elo' or 'mmr'), start (first rank - 1) and count.
+
+        :return: dict - Total number of ranked players and rows (rank, id, rating, division).
+        """
+        algorithm = parameters.get('algorithm','elo')
+        leaderboard = self.__leaderboards.get(algorithm) if isinstance(algorithm,str) else None
+        if leaderboard is None:
+            raise PredictionError(f"Unknown algorithm {algorithm}")
+        start = getIntegerParameter(parameters,'start',0,0,len(leaderboard))
+        count = getIntegerParameter(parameters,'count',LEADERBOARD_COUNT,0,MAX_LEADERBOARD_COUNT)
+        return {'algorithm':algorithm,'total':len(leaderboard),'rows':leaderboard[start:start + count]}
+
+
+    def predictMatchups(self,parameters):
+        """
+        Predicts 1v1 games from the ELO ratings, every pair in a single array operation.
+        Players missing from the table are rated like new players and listed as unknown.
+
+        :param dict parameters: pairs ([[player1_id,player2_id],...]).
+
+        :return: dict - Win probabilities of the first players and unknown players ids.
+        """
+        pairs = parameters.get('pairs')
+        if not isinstance(pairs,list) or not all(isinstance(pair,list) and len(pair) == 2 and isPlayersIds(pair) for pair in pairs):
+            raise PredictionError('pairs must be a list of [player1_id,player2_id] lists')
+        return {
+            'probabilities':ELO.predictMatchups(self.elo_players_table,pairs).tolist(),
+            'unknown':sorted({player_id for pair in pairs for player_id in pair if player_id not in self.elo_players_table})
+        }
+
+
+    def predictRace(self,parameters):
+        """
+        Predicts a free-for-all race from the MMR ratings by Monte-Carlo simulation.
+        Players missing from the table are rated like new players and listed as unknown.
+
+        :param dict parameters: players (ids list), simulations (number of simulated races) and seed.
+
+        :return: dict - Players ids, their win probabilities and expected finishing positions, unknown players ids.
+        """
+        players_ids = parameters.get('players')
+        if not isinstance(players_ids,list) or len(players_ids) < 2 or not isPlayersIds(players_ids) \
+        or len(set(players_ids)) != len(players_ids):
+            raise PredictionError('players must be a list of at least two distinct players ids')
+        n_simulations = getIntegerParameter(parameters,'simulations',RACE_SIMULATIONS_COUNT,1,MAX_RACE_SIMULATIONS_COUNT)
+        seed = parameters.get('seed')
+        if seed is not None and (not isinstance(seed,int) or isinstance(seed,bool) or seed < 0):
+            raise PredictionError('seed must be a non-negative integer')
+
+        positions_probabilities = simulateRace(self.mmr_players_table,players_ids,self.β,n_simulations,seed=seed)
+        return {
+            'players':players_ids,
+            'win_probabilities':positions_probabilities[:,0].tolist(),
+            'expected_positions':(positions_probabilities @ np.arange(1,len(players_ids) + 1)).tolist(),
+            'unknown':[player_id for player_id in players_ids if player_id not in self.mmr_players_table]
+        }
+
+
+    def handleBatch(self,parameters):
+        """
+        Answers several requests at once, saving a round-trip per request. A failed request does not fail the batch,
+        it gets an error response of its own.
+
+        :param dict parameters: requests ([{"path":..., "body":...},...], POST requests, or GET with the query
+        parameters as body).
+
+        :return: dict - Responses (status and body) in requests order.
+        """
+        requests = parameters.get('requests')
+        if not isinstance(requests,list) or len(requests) > MAX_BATCH_REQUESTS:
+            raise PredictionError(f"requests must be a list of at most {MAX_BATCH_REQUESTS} requests")
+        responses = []
+        for request in requests:
+            try:
+                if not isinstance(request,dict) or not isinstance(request.get('path'),str) or request['path'] == '/batch':
+                    raise PredictionError('Batched requests must be objects with a path other than /batch')
+                path = request['path']
+                method = 'GET' if ('GET',path) in self.__routes else 'POST'
+                responses.append({'status':200,'body':self.handle(method,path,request.get('body',{}))})
+            except PredictionError as error:
+                responses.append({'status':error.status,'body':{'error':str(error)}})
+            except Exception:
+                logging.exception(f"Batched prediction request {request.get('path') if isinstance(request,dict) else request!r} failed")
+                responses.append({'status':500,'body':{'error':'Internal server error'}})
+        return {'responses':responses}
+
+
+class PredictionRequestHandler(BaseHTTPRequestHandler):
+    """
+    JSON over HTTP/1.1 request handler, connections are kept alive between requests.
+    """
+    protocol_version = 'HTTP/1.1'
+    # Responses are written in two writes (headers, body), Nagle would delay the second one
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        parameters = {key:values[-1] for key,values in parse_qs(url.query).items()}
+        self.__answer('GET',url.path,parameters)
+
+
+    def do_POST(self):
+        try:
+            body_size = int(self.headers.get('Content-Length',0))
+        except ValueError:
+            body_size = -1
+        if not 0 <= body_size <= MAX_BODY_SIZE:
+            self.__sendJson(413,{'error':'Invalid request body size'})
+            self.close_connection = True
+            return
+        try:
+            parameters = json.loads(self.rfile.read(body_size) or b'{}')
+        except ValueError:
+            self.__sendJson(400,{'error':'Request body is not valid JSON'})
+            return
+        self.__answer('POST',urlsplit(self.path).path,parameters)
+
+
+    def __answer(self,method,path,parameters):
+        """
+        Answers a request with the server prediction service.
+
+        :param str method: HTTP method.
+        :param str path: Request path.
+        :param dict parameters: Request parameters.
+        """
+        try:
+            self.__sendJson(200,self.server.service.handle(method,path,parameters))
+        except PredictionError as error:
+            self.__sendJson(error.status,{'error':str(error)})
+        except Exception:
+            logging.exception(f"Prediction request {method} {path} failed")
+            self.__sendJson(500,{'error':'Internal server error'})
+
+
+    def __sendJson(self,status,response):
+        """
+        Sends a JSON response.
+
+        :param int status: HTTP status code.
+        :param dict response: JSON response.
+        """
+        body = json.dumps(response,separators=(',',':')).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type','application/json')
+        self.send_header('Content-Length',str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+    def log_message(self,format,*args):
+        # Access logs are debug logs, they would slow every request down
+        logging.debug(f"{self.address_string()} {format % args}")
+
+
+class PredictionServer(ThreadingHTTPServer):
+    """
+    Threaded prediction HTTP server, one thread per client connection.
+
+    :ivar PredictionService service: Answering prediction service.
+    """
+    daemon_threads = True
+
+    def __init__(self,service,host=DEFAULT_HOST,port=DEFAULT_PORT):
+        """
+        Constructor for PredictionServer, binds the server socket.
+
+        :param PredictionService service: Answering prediction service.
+        :param str host: Listening address.
+        :param int port: Listening port (0 for any free port).
+        """
+        super().__init__((host,port),PredictionRequestHandler)
+        self.service = service
+
+
+    def startInBackground(self):
+        """
+        Serves the requests from a daemon thread (shutdown() stops it).
+
+        :return: Thread - Serving thread.
+        """
+        thread = Thread(target=self.serve_forever,name='PredictionServer',daemon=True)
+        thread.start()
+        return thread
+
+
+def loadPredictionService(elo_db_path,mmr_db_path,elo_parameters,mmr_parameters):
+    """
+    Loads the ratings of a sport category and processes their new games in memory (neither the databases nor their
+    games indexes are written).
+    A missing database leaves the corresponding table empty.
+
+    :param path elo_db_path: Absolute path to the 1v1 games database (ELO).
+    :param path mmr_db_path: Absolute path to the free-for-all games database (MMR).
+    :param tuple[float,float,float] elo_parameters: (base_points,beginner_multiplier,low_elo_multiplier) configuration.
+    :param tuple[float,float,float] mmr_parameters: (γ,β,ρ) configuration.
+
+    :return: PredictionService - Loaded prediction service.
+    """
+    players_tables = []
+    for db_path,algorithm,parameters in ((elo_db_path,ELO,elo_parameters),(mmr_db_path,MMR,mmr_parameters)):
+        if db_path is None or not os.path.exists(db_path):
+            logging.warning(f"No database at {db_path}, {algorithm.__name__} predictions use default ratings")
+            players_tables.append({})
+            continue
+        database = getDatabaseObject(db_path)
+        games_table = database['GAMES']
+        algorithm.processGames(db_path,games_table,database['PLAYERS'],*parameters,False,
+                                 getGamesIndex(db_path,games_table,persist=False).games_ids)
+        players_tables.append(database['PLAYERS'])
+    return PredictionService(*players_tables,mmr_parameters[1])
+
+
+def getLeaderboard(ratings):
+    """
+    :param dict ratings: Ratings by player id.
+
+    :return: list[dict] - Leaderboard rows (rank, id, rating, division), by decreasing rating.
+    """
+    ranked_ratings = sorted(ratings.items(),key=lambda x: x[1],reverse=True)
+    return [{'rank':rank,'id':player_id,'rating':rating,'division':getRankFromELO(rating)}
+            for rank,(player_id,rating) in enumerate(ranked_ratings,1)]
+
+
+def isPlayersIds(players_ids):
+    """
+    :param list players_ids: Request players ids.
+
+    :return: bool - States if every id is a string.
+    """
+    return all(isinstance(player_id,str) for player_id in players_ids)
+
+
+def getIntegerParameter(parameters,name,default,minimum,maximum):
+    """
+    Returns an integer request parameter, clamped to its bounds.
+
+    :param dict parameters: Request parameters.
+    :param str name: Parameter name.
+    :param int default: Value of a missing parameter.
+    :param int minimum: Minimum value.
+    :param int maximum: Maximum value.
+
+    :return: int - Parameter value, raises PredictionError if it is not an integer.
+    """
+    value = parameters.get(name,default)
+    try:
+        value = int(value)
+    except (TypeError,ValueError,OverflowError):
+        raise PredictionError(f"{name} must be an integer")
+    return max(minimum,min(value,maximum))
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+'''
+Project : GamBible
+Package: tests
+Module:  __init__
+Version: 2.0
+Usage: Regression tests of the ranking engines. Run from the src folder with python -m unittest discover tests, or from
+the repository root with python -m pytest src/tests. The src folder and the GAMBIBLE root are set up here, like the
+entry points do.
+
+Author: BoxBoxJason
+Date: 17/10/2026
+'''
+import sys
+from os import environ
+from os.path import dirname,abspath
+
+SRC_PATH = dirname(dirname(abspath(__file__)))
+environ.setdefault('GAMBIBLE',dirname(SRC_PATH))
+if SRC_PATH not in sys.path:
+    sys.path.insert(0,SRC_PATH)
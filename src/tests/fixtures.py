@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+'''
+Project : GamBible
+Package: tests
+Module:  fixtures
+Version: 2.0
+Usage: Databases shared by the tests: the databases shipped in the results folder (tests are skipped if they are
+missing) and conversions between layouts.
+
+Author: BoxBoxJason
+Date: 17/10/2026
+'''
+import os
+import unittest
+from resources.PathEnum import getDBPath,getJsonObject
+from ranking import ELO
+
+def getShippedDatabase(sport,category,db_name):
+    """
+    Returns a database of the results folder, the calling test is skipped if it does not exist.
+
+    :param str sport: Sport name.
+    :param str category: Sport category.
+    :param str db_name: Database file name.
+
+    :return: dict - {'GAMES':games_table,'PLAYERS':players_table} database (a fresh copy on every call).
+    """
+    db_path = getDBPath(sport,category,db_name,False)
+    if not os.path.exists(db_path):
+        raise unittest.SkipTest(f"No database at {db_path}")
+    return getJsonObject(db_path)
+
+
+def toELODatabase(database):
+    """
+    Converts the 1v1 games of a free-for-all layout database into an ELO database, every player starts unrated.
+
+    :param dict database: {'GAMES':games_table,'PLAYERS':players_table} database with RANKING games.
+
+    :return: dict - ELO layout database, all games unprocessed.
+    """
+    games_table = {}
+    players_table = {}
+    for game_id,game_dict in database['GAMES'].items():
+        if len(game_dict['RANKING']) != 2:
+            continue
+        games_table[game_id] = {'ID':game_id,'DATE':game_dict['DATE'],'WINNER_ID':game_dict['RANKING'][0],
+                                'LOSER_ID':game_dict['RANKING'][1],'PROCESSED':False}
+        for player_id in game_dict['RANKING']:
+            if player_id not in players_table:
+                ELO.createPlayer(players_table,player_id)
+    return {'GAMES':games_table,'PLAYERS':players_table}
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+'''
+Project : GamBible
+Package: tests
+Module:  test_ColumnarDB
+Version: 2.0
+Usage: Checks the columnar databases round trip, their atomic replacement and the rejection of the fields they can
+not store.
+
+Author: BoxBoxJason
+Date: 17/10/2026
+'''
+import os
+import tempfile
+import unittest
+from benchmarks.generators import generateTennisDatabase,generateFreeForAllDatabase
+from resources.ColumnarDB import fromJsonObject,dumpColumnarObject,getColumnarObject,getDatabaseObject
+
+class TestColumnarDB(unittest.TestCase):
+    """
+    Columnar databases against their JSON layout.
+    """
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name,'default.gbdb')
+
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+
+    def testRoundTrip(self):
+        for database in (generateTennisDatabase(500,seed=1),generateFreeForAllDatabase(50,seed=1)):
+            dumpColumnarObject(fromJsonObject(database),self.db_path)
+            self.assertEqual(getDatabaseObject(self.db_path),database)
+
+
+    def testDumpReplacesDatabase(self):
+        dumpColumnarObject(fromJsonObject(generateTennisDatabase(500,seed=1)),self.db_path)
+        mapped_database = getColumnarObject(self.db_path)
+        games_ids = mapped_database.games_ids.tolist()
+        database = generateFreeForAllDatabase(50,seed=2)
+        dumpColumnarObject(fromJsonObject(database),self.db_path)
+
+        self.assertEqual(getDatabaseObject(self.db_path),database)
+        # Columns mapped before the dump still read the replaced database
+        self.assertEqual(mapped_database.games_ids.tolist(),games_ids)
+        self.assertEqual(sorted(os.listdir(self.temp_dir.name)),['default.gbdb'])
+
+
+    def testInterruptedSwapIsRecovered(self):
+        database = generateTennisDatabase(500,seed=1)
+        dumpColumnarObject(fromJsonObject(database),f"{self.db_path}.tmp")
+        # Crash after the old database was moved aside: the complete new database is moved in
+        self.assertEqual(getDatabaseObject(self.db_path),database)
+        self.assertFalse(os.path.exists(f"{self.db_path}.tmp"))
+
+
+    def testUnknownFieldsAreRejected(self):
+        database = generateTennisDatabase(500,seed=1)
+        next(iter(database['GAMES'].values()))['SCORE'] = '6-4 6-4'
+        with self.assertRaises(ValueError):
+            fromJsonObject(database)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+'''
+Project : GamBible
+Package: tests
+Module:  test_ELOEngine
+Version: 2.0
+Usage: Checks that the compiled ELO replays (ELOEngine.replay, replayBatch, columnar compile) give the ratings and
+success rates of ELO.processGames.
+
+Author: BoxBoxJason
+Date: 17/10/2026
+'''
+import os
+import tempfile
+import unittest
+import numpy as np
+from tests.fixtures import getShippedDatabase,toELODatabase
+from benchmarks.generators import generateTennisDatabase
+from resources.ColumnarDB import fromJsonObject,dumpColumnarObject,getColumnarObject
+from ranking import ELO
+from ranking.ELOEngine import ELOEngine
+from ranking.general import orderGamesTable
+
+# Configurations replayed by the tests: widgets default, beginners boost, large base points
+CONFIGURATIONS = ((28.163265306122447,3.33265306122449,1),(10,5,0.5),(45,1,3))
+
+class TestELOEngine(unittest.TestCase):
+    """
+    Compiled replays against the reference game by game replay.
+    """
+    def setUp(self):
+        self.databases = {'synthetic':generateTennisDatabase(5000,seed=3),
+                          'Tennis Men':toELODatabase(getShippedDatabase('Tennis','Men','defaultMMR.json'))}
+
+
+    def testReplayMatchesProcessGames(self):
+        for name,database in self.databases.items():
+            games_ordered_ids = orderGamesTable(database['GAMES'])
+            engine = ELOEngine(database['GAMES'],database['PLAYERS'],games_ordered_ids)
+            for configuration in CONFIGURATIONS:
+                with self.subTest(database=name,configuration=configuration):
+                    games_table,players_table = copyDatabase(database)
+                    success_rate = ELO.processGames(None,games_table,players_table,*configuration,False,games_ordered_ids)
+                    elos,engine_success_rate = engine.replay(*configuration)
+
+                    self.assertEqual(engine_success_rate,success_rate)
+                    np.testing.assert_allclose(elos,[players_table[player_id]['ELO'] for player_id in engine.players_ids],rtol=1e-12)
+
+
+    def testApplyMatchesProcessGames(self):
+        database = self.databases['synthetic']
+        engine = ELOEngine(database['GAMES'],database['PLAYERS'])
+        games_table,players_table = copyDatabase(database)
+        ELO.processGames(None,games_table,players_table,*CONFIGURATIONS[0])
+
+        engine_games_table,engine_players_table = copyDatabase(database)
+        engine.apply(engine_games_table,engine_players_table,engine.replay(*CONFIGURATIONS[0])[0])
+
+        self.assertEqual(engine_games_table,games_table)
+        for player_id,player_dict in players_table.items():
+            self.assertEqual(engine_players_table[player_id]['GAMES'],player_dict['GAMES'])
+            self.assertEqual(engine_players_table[player_id]['FAV_TERRAIN'],player_dict['FAV_TERRAIN'])
+            self.assertAlmostEqual(engine_players_table[player_id]['ELO'],player_dict['ELO'],places=9)
+
+
+    def testReplayBatchMatchesReplay(self):
+        for name,database in self.databases.items():
+            engine = ELOEngine(database['GAMES'],database['PLAYERS'])
+            with self.subTest(database=name):
+                batch_elos,batch_success_rates = engine.replayBatch(CONFIGURATIONS)
+                for configuration,elos,success_rate in zip(CONFIGURATIONS,batch_elos,batch_success_rates.tolist()):
+                    replay_elos,replay_success_rate = engine.replay(*configuration)
+                    # Vectorized and scalar powers round differently
+                    np.testing.assert_allclose(elos,replay_elos,rtol=1e-9)
+                    self.assertAlmostEqual(success_rate,replay_success_rate,places=3)
+
+
+    def testColumnarCompileMatchesTables(self):
+        database = self.databases['synthetic']
+        engine = ELOEngine(database['GAMES'],database['PLAYERS'])
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db_path = os.path.join(temp_dir,'defaultELO.gbdb')
+            dumpColumnarObject(fromJsonObject(database),db_path)
+            columnar_engine = ELOEngine.fromColumnarDatabase(getColumnarObject(db_path))
+
+            # Columnar engines identify players and games by their columnar indexes
+            self.assertEqual([engine.players_ids[player_index] for player_index in columnar_engine.players_ids],engine.players_ids)
+            self.assertEqual(len(columnar_engine.games_ids),len(engine.games_ids))
+            for array_name in ('winners','losers','start_elos','start_games_counts','winners_levels','losers_levels'):
+                np.testing.assert_array_equal(getattr(columnar_engine,array_name),getattr(engine,array_name))
+            elos,success_rate = engine.replay(*CONFIGURATIONS[0])
+            columnar_elos,columnar_success_rate = columnar_engine.replay(*CONFIGURATIONS[0])
+            np.testing.assert_array_equal(columnar_elos,elos)
+            self.assertEqual(columnar_success_rate,success_rate)
+
+
+def copyDatabase(database):
+    """
+    :param dict database: {'GAMES':games_table,'PLAYERS':players_table} database.
+
+    :return: tuple[dict,dict] - Independent copies of the Games and Players tables.
+    """
+    games_table = {game_id:dict(game_dict) for game_id,game_dict in database['GAMES'].items()}
+    players_table = {player_id:{key:value.copy() if isinstance(value,(list,dict)) else value for key,value in player_dict.items()}
+                     for player_id,player_dict in database['PLAYERS'].items()}
+    return games_table,players_table
+
+
+if __name__ == '__main__':
+    unittest.main()
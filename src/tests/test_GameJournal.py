@@ -0,0 +1,143 @@
+# -*- coding: utf-8 -*-
+'''
+Project : GamBible
+Package: tests
+Module:  test_GameJournal
+Version: 2.0
+Usage: Checks that the games journal gives the ratings of a full replay, after reopenings, compactions and
+compactions interrupted at every step.
+
+Author: BoxBoxJason
+Date: 17/10/2026
+'''
+import os
+import shutil
+import tempfile
+import unittest
+from benchmarks.generators import generateTennisDatabase
+from resources.PathEnum import getJsonObject,dumpJsonObject
+from ranking import ELO
+from ranking.GameJournal import GameJournal
+
+# Widgets default ELO configuration
+PARAMETERS = (28.163265306122447,3.33265306122449,1)
+# Number of games of the base database, the other games are appended to the journal
+BASE_GAMES = 2000
+
+class TestGameJournal(unittest.TestCase):
+    """
+    Journal ratings against ELO.processGames over the base and appended games.
+    """
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name,'defaultELO.json')
+        database = generateTennisDatabase(2500,seed=4)
+        games = list(database['GAMES'].values())
+        dumpJsonObject({'GAMES':{game_dict['ID']:game_dict for game_dict in games[:BASE_GAMES]},'PLAYERS':database['PLAYERS']},self.db_path)
+        self.appended_games = [dict(game_dict) for game_dict in games[BASE_GAMES:]]
+
+        ELO.processGames(None,database['GAMES'],database['PLAYERS'],*PARAMETERS)
+        self.expected_elos = {player_id:player_dict['ELO'] for player_id,player_dict in database['PLAYERS'].items()}
+
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+
+    def assertExpectedRatings(self,journal):
+        for player_id,elo in self.expected_elos.items():
+            self.assertAlmostEqual(journal.players_states[player_id].elo,elo,places=9)
+
+
+    def testReopening(self):
+        journal = GameJournal(self.db_path,'ELO',PARAMETERS,checkpoint_interval=200)
+        journal.appendGames(self.appended_games)
+        self.assertExpectedRatings(journal)
+        self.assertExpectedRatings(GameJournal(self.db_path,'ELO',PARAMETERS,checkpoint_interval=200))
+
+
+    def testCompaction(self):
+        journal = GameJournal(self.db_path,'ELO',PARAMETERS)
+        journal.appendGames(self.appended_games)
+        journal.compact()
+
+        self.assertEqual(os.path.getsize(journal.wal_path),0)
+        self.assertEqual(len(getJsonObject(self.db_path)['GAMES']),BASE_GAMES + len(self.appended_games))
+        self.assertExpectedRatings(GameJournal(self.db_path,'ELO',PARAMETERS))
+
+
+    def testCompactionInterruptedAfterDatabaseWrite(self):
+        journal = GameJournal(self.db_path,'ELO',PARAMETERS)
+        journal.appendGames(self.appended_games)
+        journal.checkpoint()
+        backups = self.backup(journal)
+        journal.compact()
+        # New base database, checkpoint and log of the previous base database
+        self.restore(journal,backups)
+
+        self.assertExpectedRatings(GameJournal(self.db_path,'ELO',PARAMETERS))
+
+
+    def testCompactionInterruptedAfterCheckpoint(self):
+        journal = GameJournal(self.db_path,'ELO',PARAMETERS)
+        journal.appendGames(self.appended_games)
+        wal_backup = self.backup(journal)[0]
+        journal.compact()
+        # Checkpoint of the new base database covering the whole log, log not emptied yet
+        checkpoint = getJsonObject(journal.checkpoint_path)
+        checkpoint['WAL_OFFSET'] = os.path.getsize(wal_backup)
+        dumpJsonObject(checkpoint,journal.checkpoint_path)
+        shutil.copyfile(wal_backup,journal.wal_path)
+        self.assertExpectedRatings(GameJournal(self.db_path,'ELO',PARAMETERS))
+
+        # Log emptied, offset checkpoint not reset yet
+        dumpJsonObject(checkpoint,journal.checkpoint_path)
+        open(journal.wal_path,'wb').close()
+        journal = GameJournal(self.db_path,'ELO',PARAMETERS)
+        self.assertExpectedRatings(journal)
+        self.assertEqual(getJsonObject(journal.checkpoint_path)['WAL_OFFSET'],0)
+
+
+    def testBaseDatabaseEdited(self):
+        journal = GameJournal(self.db_path,'ELO',PARAMETERS)
+        journal.appendGames(self.appended_games)
+        journal.checkpoint()
+
+        # Result of the first game reversed
+        database = getJsonObject(self.db_path)
+        game_dict = next(iter(database['GAMES'].values()))
+        game_dict['WINNER_ID'],game_dict['LOSER_ID'] = game_dict['LOSER_ID'],game_dict['WINNER_ID']
+        dumpJsonObject(database,self.db_path)
+        journal = GameJournal(self.db_path,'ELO',PARAMETERS)
+
+        for appended_game in self.appended_games:
+            database['GAMES'][appended_game['ID']] = dict(appended_game)
+        ELO.processGames(None,database['GAMES'],database['PLAYERS'],*PARAMETERS)
+        for player_id,player_dict in database['PLAYERS'].items():
+            self.assertAlmostEqual(journal.players_states[player_id].elo,player_dict['ELO'],places=9)
+
+
+    def backup(self,journal):
+        """
+        :param GameJournal journal: Journal to back up.
+
+        :return: tuple[path,path] - Copies of the log and of the checkpoint.
+        """
+        backups = (os.path.join(self.temp_dir.name,'wal.backup'),os.path.join(self.temp_dir.name,'checkpoint.backup'))
+        shutil.copyfile(journal.wal_path,backups[0])
+        if os.path.exists(journal.checkpoint_path):
+            shutil.copyfile(journal.checkpoint_path,backups[1])
+        return backups
+
+
+    def restore(self,journal,backups):
+        """
+        :param GameJournal journal: Journal to restore.
+        :param tuple[path,path] backups: Copies of the log and of the checkpoint.
+        """
+        shutil.copyfile(backups[0],journal.wal_path)
+        shutil.copyfile(backups[1],journal.checkpoint_path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+'''
+Project : GamBible
+Package: tests
+Module:  test_GameStream
+Version: 2.0
+Usage: Checks that games streams replays give the ratings and players games of the database replays.
+
+Author: BoxBoxJason
+Date: 17/10/2026
+'''
+import os
+import tempfile
+import unittest
+from benchmarks.generators import generateFreeForAllDatabase
+from ranking import MMR
+from ranking.GameStream import exportGamesStream,replayGamesStream
+
+# Default MMR configuration
+PARAMETERS = (MMR.START_DEVIATION,0.5,1)
+
+class TestGameStream(unittest.TestCase):
+    """
+    Streams replays against MMR.processGames.
+    """
+    def testMMRStreamMatchesProcessGames(self):
+        database = generateFreeForAllDatabase(100,seed=6)
+        stream_database = generateFreeForAllDatabase(100,seed=6)
+        success_rate = MMR.processGames(None,database['GAMES'],database['PLAYERS'],*PARAMETERS)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            stream_path = os.path.join(temp_dir,'games.jsonl')
+            exportGamesStream(stream_database['GAMES'],stream_path)
+            # Players games were listed by MMR.createGame, the replay does not list them again
+            players_table,stream_success_rate = replayGamesStream(stream_path,'MMR',PARAMETERS,stream_database['PLAYERS'])
+
+        self.assertEqual(stream_success_rate,success_rate)
+        self.assertEqual(players_table,database['PLAYERS'])
+
+
+if __name__ == '__main__':
+    unittest.main()
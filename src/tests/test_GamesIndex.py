@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+'''
+Project : GamBible
+Package: tests
+Module:  test_GamesIndex
+Version: 2.0
+Usage: Checks that the stored games indexes give the order of orderGamesTable once their database changed.
+
+Author: BoxBoxJason
+Date: 17/10/2026
+'''
+import os
+import tempfile
+import unittest
+from benchmarks.generators import generateTennisDatabase
+from ranking.general import orderGamesTable
+from ranking.GamesIndex import getGamesIndex
+
+class TestGamesIndex(unittest.TestCase):
+    """
+    Stored games indexes against orderGamesTable.
+    """
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name,'defaultELO.json')
+        self.games_table = generateTennisDatabase(500,seed=2)['GAMES']
+        getGamesIndex(self.db_path,self.games_table,True)
+
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+
+    def testAddedGames(self):
+        game_dict = dict(self.games_table['game-10'],ID='game-new')
+        self.games_table['game-new'] = game_dict
+        self.assertEqual(getGamesIndex(self.db_path,self.games_table).games_ids,orderGamesTable(self.games_table))
+
+
+    def testEditedDate(self):
+        self.games_table['game-0']['DATE'] = self.games_table['game-499']['DATE']
+        self.assertEqual(getGamesIndex(self.db_path,self.games_table).games_ids,orderGamesTable(self.games_table))
+
+
+    def testRemovedGame(self):
+        del self.games_table['game-250']
+        self.assertEqual(getGamesIndex(self.db_path,self.games_table).games_ids,orderGamesTable(self.games_table))
+
+
+if __name__ == '__main__':
+    unittest.main()
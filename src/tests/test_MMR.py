@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+'''
+Project : GamBible
+Package: tests
+Module:  test_MMR
+Version: 2.0
+Usage: Checks that MMR replays are exact by default and that compacted performance histories stay close to the
+exact replay.
+
+Author: BoxBoxJason
+Date: 17/10/2026
+'''
+import unittest
+from tests.fixtures import getShippedDatabase
+from ranking import MMR
+from ranking.general import orderGamesTable
+
+# Compaction limits checked against the exact replay
+COMPACTION = (500,1e-6)
+# Maximum skill difference between compacted and exact replays of Tennis Men (3.3e-5 measured)
+COMPACTION_SKILL_TOLERANCE = 1e-3
+
+class TestMMR(unittest.TestCase):
+    """
+    Compacted MMR replays against the exact replay.
+    """
+    def setUp(self):
+        self.exact_database = getShippedDatabase('Tennis','Men','defaultMMR.json')
+        self.games_ordered_ids = orderGamesTable(self.exact_database['GAMES'])
+        self.exact_success_rate = MMR.processGames(None,self.exact_database['GAMES'],self.exact_database['PLAYERS'],350,0.5,1,
+                                                   False,self.games_ordered_ids,None,None)
+
+
+    def testExactByDefault(self):
+        database = getShippedDatabase('Tennis','Men','defaultMMR.json')
+        success_rate = MMR.processGames(None,database['GAMES'],database['PLAYERS'],350,0.5,1,False,self.games_ordered_ids)
+
+        self.assertEqual(success_rate,self.exact_success_rate)
+        self.assertEqual(database['PLAYERS'],self.exact_database['PLAYERS'])
+
+
+    def testCompactionMatchesExactReplay(self):
+        database = getShippedDatabase('Tennis','Men','defaultMMR.json')
+        success_rate = MMR.processGames(None,database['GAMES'],database['PLAYERS'],350,0.5,1,False,self.games_ordered_ids,*COMPACTION)
+
+        # Skills moving by less than the tolerance may still break prediction ties differently
+        self.assertAlmostEqual(success_rate,self.exact_success_rate,places=3)
+        for player_id,player_dict in database['PLAYERS'].items():
+            self.assertLessEqual(abs(player_dict['SKILL'] - self.exact_database['PLAYERS'][player_id]['SKILL']),COMPACTION_SKILL_TOLERANCE)
+            self.assertEqual(player_dict['SKILL_DEVIATION'],self.exact_database['PLAYERS'][player_id]['SKILL_DEVIATION'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+'''
+Project : GamBible
+Package: tests
+Module:  test_Simulation
+Version: 2.0
+Usage: Checks the races and brackets simulations distributions and their arguments validation.
+
+Author: BoxBoxJason
+Date: 17/10/2026
+'''
+import unittest
+import numpy as np
+from ranking import MMR
+from ranking.Simulation import simulateRace,simulateBracket
+
+class TestSimulation(unittest.TestCase):
+    """
+    Races and brackets simulations.
+    """
+    def testRaceDistribution(self):
+        players_table = {'fast':{'SKILL':1800,'SKILL_DEVIATION':50},'slow':{'SKILL':1200,'SKILL_DEVIATION':50}}
+        positions_probabilities = simulateRace(players_table,['slow','fast','unrated'],MMR.DEFAULT_PARAMETERS[1],10_000,seed=1)
+
+        np.testing.assert_allclose(positions_probabilities.sum(axis=0),1)
+        np.testing.assert_allclose(positions_probabilities.sum(axis=1),1)
+        self.assertGreater(positions_probabilities[1,0],positions_probabilities[2,0])
+        self.assertGreater(positions_probabilities[2,0],positions_probabilities[0,0])
+
+
+    def testEmptyRaceIsRejected(self):
+        with self.assertRaises(ValueError):
+            simulateRace({},[],MMR.DEFAULT_PARAMETERS[1],100)
+
+
+    def testInvalidDrawIsRejected(self):
+        with self.assertRaises(ValueError):
+            simulateBracket({},['a','b','c'],100)
+
+
+if __name__ == '__main__':
+    unittest.main()
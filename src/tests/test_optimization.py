@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+'''
+Project : GamBible
+Package: tests
+Module:  test_optimization
+Version: 2.0
+Usage: Checks that the multi-process study execution (ranking.optimization) counts the trials finished in the study
+storage and reports failed workers.
+
+Author: BoxBoxJason
+Date: 17/10/2026
+'''
+import os
+import tempfile
+import unittest
+import optuna
+from ranking.optimization import optimizeStudy
+
+def runQuadraticTrials(study,n_trials):
+    """
+    Runs trials of a trivial objective.
+
+    :param optuna.Study study: Hyperparameters study.
+    :param int n_trials: Number of trials.
+    """
+    study.optimize(lambda trial: -trial.suggest_float('X',-1,1) ** 2,n_trials=n_trials)
+
+
+def runFailingTrials(study,n_trials):
+    """
+    Fails before running any trial.
+
+    :param optuna.Study study: Hyperparameters study.
+    :param int n_trials: Number of trials.
+    """
+    raise RuntimeError('Worker failure')
+
+
+class TestOptimization(unittest.TestCase):
+    """
+    Multi-process study execution.
+    """
+    def setUp(self):
+        optuna.logging.set_verbosity(optuna.logging.WARNING)
+        self.temporary_folder = tempfile.TemporaryDirectory()
+        self.storage_path = os.path.join(self.temporary_folder.name,'configuration.db')
+
+
+    def tearDown(self):
+        self.temporary_folder.cleanup()
+
+
+    def testWorkersRunAllTrials(self):
+        throughput = optimizeStudy('study',self.storage_path,runQuadraticTrials,6,2)
+
+        study = optuna.load_study(study_name='study',storage=f"sqlite:///{self.storage_path}")
+        self.assertEqual(len(study.trials),6)
+        self.assertGreater(throughput,0)
+
+
+    def testFailedWorkersRaise(self):
+        with self.assertRaises(RuntimeError):
+            optimizeStudy('study',self.storage_path,runFailingTrials,4,2)
+
+
+if __name__ == '__main__':
+    unittest.main()
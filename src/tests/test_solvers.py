@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+'''
+Project : GamBible
+Package: tests
+Module:  test_solvers
+Version: 2.0
+Usage: Checks that the Newton solvers (resources.solvers) return the root findZeroBisection returns, including on
+saturated equations whose root is not unique, and that MMR replays are unchanged by them.
+
+Author: BoxBoxJason
+Date: 17/10/2026
+'''
+import random
+import unittest
+from math import tanh
+from unittest import mock
+import numpy as np
+from tests.fixtures import getShippedDatabase
+from resources.solvers import findZeroNewton,findZerosNewton
+from resources.utils import findZeroBisection
+from ranking import MMR
+from ranking.general import orderGamesTable
+
+# Number of games replayed by the MMR regression checks
+REPLAYED_GAMES = 3000
+
+class TestSolvers(unittest.TestCase):
+    """
+    Newton solvers against the bisection.
+    """
+    def testNewtonMatchesBisection(self):
+        generator = random.Random(5)
+        for _ in range(500):
+            # tanh sums, small scales saturate and give flat regions (zero regions when the terms cancel)
+            terms = [(generator.uniform(0,3000),generator.choice((0.1,1,50,500)),generator.uniform(0.1,10)) for _ in range(generator.randint(1,6))]
+            shift = generator.uniform(-1,1) * sum(coefficient for _,_,coefficient in terms)
+
+            def f(x):
+                value = shift
+                derivative = 0
+                for center,scale,coefficient in terms:
+                    t = tanh((x - center) / scale)
+                    value += coefficient * t
+                    derivative += coefficient / scale * (1 - t * t)
+                return value,derivative
+
+            with self.subTest(terms=terms,shift=shift):
+                self.assertEqual(findZeroNewton(f,generator.uniform(0,3000)),findZeroBisection(lambda x: f(x)[0]))
+
+
+    def testSaturatedZeroRegion(self):
+        # f is 0 on [1000,2000]: Newton from any warm start returns the bisection root
+        def f(x):
+            if 1000 <= x <= 2000:
+                return 0,0
+            return x - (1000 if x < 1000 else 2000),1
+
+        expected = findZeroBisection(lambda x: f(x)[0])
+        for x0 in (0,999,1500,2001,9000):
+            with self.subTest(x0=x0):
+                self.assertEqual(findZeroNewton(f,x0),expected)
+
+
+    def testBatchedNewtonMatchesBisection(self):
+        generator = np.random.default_rng(7)
+        roots = generator.uniform(0,5000,200)
+        # Equations with a flat zero region of the given half width, slopes vary over several orders of magnitude
+        widths = np.where(generator.random(200) < 0.5,0,generator.uniform(0,100,200))
+        slopes = 10 ** generator.uniform(-3,3,200)
+
+        def f(values_x,indexes):
+            distances = values_x - roots[indexes]
+            flat = np.abs(distances) <= widths[indexes]
+            values = np.where(flat,0,(distances - np.sign(distances) * widths[indexes]) * slopes[indexes])
+            return values,np.where(flat,0,slopes[indexes])
+
+        results = findZerosNewton(f,roots + generator.uniform(-500,500,200))
+        for index in range(len(roots)):
+            with self.subTest(index=index):
+                self.assertEqual(results[index],findZeroBisection(lambda x: f(np.array([x]),np.array([index]))[0][0]))
+
+
+    def testPerfEstimationsMatchPerfEstimation(self):
+        generator = np.random.default_rng(11)
+        for _ in range(50):
+            players_count = generator.integers(MMR.VECTORIZED_MIN_PLAYERS,30)
+            skills = generator.normal(1500,300,players_count)
+            deviations = generator.uniform(1,350,players_count)
+            perfs = MMR.getPerfEstimations(skills,deviations)
+            # np.tanh and math.tanh may differ by one ulp, the roots are equal up to the solver tolerance
+            np.testing.assert_allclose(perfs,[MMR.getPerfEstimation(skills.tolist(),deviations.tolist(),i) for i in range(players_count)],atol=1e-4)
+
+
+    def testMMRReplayMatchesBisection(self):
+        database = getShippedDatabase('Tennis','Men','defaultMMR.json')
+        games_ordered_ids = orderGamesTable(database['GAMES'])[:REPLAYED_GAMES]
+        bisection_database = getShippedDatabase('Tennis','Men','defaultMMR.json')
+
+        success_rate = MMR.processGames(None,database['GAMES'],database['PLAYERS'],350,0.5,1,False,games_ordered_ids)
+        with mock.patch.object(MMR,'findZeroNewton',lambda f,x0: findZeroBisection(lambda x: f(x)[0])):
+            bisection_success_rate = MMR.processGames(None,bisection_database['GAMES'],bisection_database['PLAYERS'],350,0.5,1,
+                                                      False,games_ordered_ids)
+
+        self.assertEqual(success_rate,bisection_success_rate)
+        for player_id,player_dict in database['PLAYERS'].items():
+            self.assertEqual(player_dict['SKILL'],bisection_database['PLAYERS'][player_id]['SKILL'])
+
+
+if __name__ == '__main__':
+    unittest.main()